@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+HTML 항목 읽기 벤치마크 - BeautifulSoup 전체 파싱 vs 스트리밍 파서(iter_html_items)
+
+    python benchmarks/bench_html_loader.py            # 1천 / 1만 / 10만 줄
+    python benchmarks/bench_html_loader.py 500000
+
+먼저 작은 읽기 단위(chunk_size)로 나눠 읽어도 항목이 BeautifulSoup의 find_all('div') +
+get_text(strip=True)와 똑같은지 확인한다 (읽기 단위 경계가 div 안에 걸려도 글자가 바뀌면 안 됨).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import html_hwp_automation as hwp  # noqa: E402
+import 문제생성_자동화_통합 as gen  # noqa: E402
+from bench_tag_tokenizer import make_workbook  # noqa: E402
+
+CHUNK_SIZES = [1, 7, 100, 4096, 64 * 1024]
+
+# 생성기 HTML에는 없지만 손으로 고친 파일에 나올 수 있는 모양
+EXTRA_DIVS = [
+    '<div>앞 <b>굵게</b> 뒤 <br/> 끝 <!-- 주석 -->꼬리</div>',
+    '<div style="font-weight: bold">바깥 <div style="font-size: 14pt">안쪽</div> 뒤</div>',
+    '<div>  &lt;문자 참조&gt; &amp; 공백  </div>',
+    '<div>   </div>',
+]
+
+
+def make_html(lines, seed=0):
+    """합성 문제집 HTML (생성기 출력 + 지저분한 div 조금)"""
+    html = gen.태그텍스트를_HTML로_변환(gen.태그_수정(make_workbook(lines, seed)))
+    rng = random.Random(seed)
+    extra = ''.join(rng.choice(EXTRA_DIVS) for _ in range(max(1, lines // 20)))
+    return html.replace('</body>', extra + '</body>')
+
+
+def soup_items(path):
+    with open(path, encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    items = []
+    for div in soup.find_all('div'):
+        text = div.get_text(strip=True)
+        if text:
+            items.append((text, div.get('style', '')))
+    return items
+
+
+def stream_items(path, chunk_size=64 * 1024):
+    return [(item['text'], item['style']) for item in hwp.iter_html_items(path, chunk_size)]
+
+
+def check(path):
+    """읽기 단위마다 BeautifulSoup 결과와 비교"""
+    expected = soup_items(path)
+    for chunk_size in CHUNK_SIZES:
+        got = stream_items(path, chunk_size)
+        wrong = [i for i, (a, b) in enumerate(zip(got, expected), 1) if a != b]
+        assert len(got) == len(expected) and not wrong, (
+            f'chunk_size={chunk_size}: 항목 {len(got)}/{len(expected)}개, 다른 항목 {len(wrong)}개 '
+            f'(첫 번째 {wrong[:1]})')
+    return len(expected)
+
+
+def measure(fn, path):
+    """실행 시간 + 최대 메모리"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(path)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as folder:
+        for lines in sizes:
+            path = os.path.join(folder, f'workbook_{lines}.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(make_html(lines, seed=lines))
+            items = check(path) if lines <= 10_000 else len(stream_items(path))
+            soup_time, soup_peak = measure(soup_items, path)
+            stream_time, stream_peak = measure(stream_items, path)
+            print(f"{lines:>8}줄 ({items}개 항목, {os.path.getsize(path) / 1024:.0f} KiB): "
+                  f"BeautifulSoup {soup_time:.3f}초 / {soup_peak / 1024:.0f} KiB · "
+                  f"스트리밍 {stream_time:.3f}초 / {stream_peak / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [1_000, 10_000, 100_000])
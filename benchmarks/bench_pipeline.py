@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+생성 파이프라인 끝-끝 벤치마크 - 가짜 서버(mock_anthropic_server.py)로 지문 N개를 배치실행
+
+    python benchmarks/bench_pipeline.py                       # 지문 20개, 작업자 4명
+    python benchmarks/bench_pipeline.py -n 100 -j 8 --latency 1 --tokens-per-sec 200
+    python benchmarks/bench_pipeline.py --error-rate 0.05 --rpm 120 --json 결과.json
+
+처리량(지문/분, 출력 토큰/초), 지문별 지연 p50/p95/p99, 단계별 시간을 출력한다.
+단계 시간은 각 함수의 자기 시간(안에서 부른 다른 단계 시간 제외)의 합이라 동시 실행 중에는
+벽시계 시간보다 클 수 있다. 묶음(--pack)을 켜면 묶인 지문의 지연에는 생성 시간이 빠진다.
+"""
+
+import argparse
+import contextlib
+import functools
+import importlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import request_scheduler  # noqa: E402
+from bench_tag_tokenizer import sentence  # noqa: E402
+from mock_anthropic_server import MockServer, add_arguments, config_from_args  # noqa: E402
+
+# 시간을 재는 단계 (파이프라인 모듈의 함수 이름)
+# 다른 스레드로 작업을 나눠 주고 기다리기만 하는 함수(문제유형별_생성, 묶음_생성 등)는
+# 자기 시간이 기다린 시간이 되므로 넣지 않음
+STAGES = [
+    '유형_생성', '검증_후_보완', 'claude_호출', 'claude_구조화_호출', '헤지_요청',
+    '태그_수정', '전체내용_조립', '태그텍스트를_HTML로_변환', 'HWPX파일_저장',
+]
+
+
+class StageTimer:
+    """함수별 호출 수 / 자기 시간 (스레드마다 호출 스택을 따로 추적)"""
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.self_time = defaultdict(float)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def wrap(self, name, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            stack = self.local.__dict__.setdefault('stack', [])
+            stack.append(0.0)  # 자식 단계 시간 누적
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                with self.lock:
+                    self.calls[name] += 1
+                    self.self_time[name] += elapsed - children
+        return timed
+
+    def rows(self):
+        with self.lock:
+            return [(name, self.calls[name], self.self_time[name]) for name in self.calls]
+
+
+def percentile(values, p):
+    """최근접 순위 백분위"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(p / 100 * len(values))) - 1))]
+
+
+def make_passages(folder, count, chars, seed=0):
+    """합성 지문 파일 count개 (문단 여러 개, 지문마다 글자 수는 chars ±30%)"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        target = int(chars * rng.uniform(0.7, 1.3))
+        paragraphs, size = [], 0
+        while size < target:
+            paragraph = ' '.join(sentence(rng) + '.' for _ in range(rng.randint(3, 6)))
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+        path = os.path.join(folder, f'지문_{i + 1:04d}.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(paragraphs))
+        paths.append(path)
+    return paths
+
+
+def load_pipeline(args, base_url):
+    """파이프라인 모듈을 가짜 서버 기준 설정으로 불러옴"""
+    os.environ['ANTHROPIC_BASE_URL'] = base_url
+    pipeline = importlib.import_module('문제생성_자동화_통합')
+    pipeline.BASE_URL = base_url
+    pipeline.API_KEY = 'mock-key'
+    pipeline.응답캐시_사용 = args.cache
+    pipeline.응답캐시_경로 = os.path.join(args.workdir, '응답캐시.sqlite3')
+    # 가짜 서버 사용량이 실제 장부에 섞이지 않게 임시 폴더에 기록
+    pipeline.사용량_장부_경로 = os.path.join(args.workdir, '사용량_장부.jsonl')
+    pipeline.최대_동시호출 = args.concurrency
+    pipeline.짧은지문_묶음 = args.pack
+    pipeline.구조화_출력 = args.structured
+    pipeline.출력_방식 = 'hwpx' if args.hwpx else '한글자동화'
+    # 토큰 한도는 가짜 서버가 검사하지 않으므로 넉넉하게, 요청 한도는 서버와 같게
+    pipeline.분당_요청_한도 = args.rpm or 10_000
+    pipeline.분당_입력토큰_한도 = 10_000_000
+    pipeline.분당_출력토큰_한도 = 10_000_000
+    return pipeline
+
+
+def instrument(pipeline, timer):
+    for name in STAGES:
+        setattr(pipeline, name, timer.wrap(name, getattr(pipeline, name)))
+    # 한도 대기는 스케줄러 메서드
+    request_scheduler.RequestScheduler.acquire = timer.wrap(
+        '한도_대기', request_scheduler.RequestScheduler.acquire)
+
+
+def run(args):
+    with MockServer(config_from_args(args)) as server:
+        pipeline = load_pipeline(args, server.url)
+        timer = StageTimer()
+        instrument(pipeline, timer)
+        paths = make_passages(args.workdir, args.passages, args.chars, args.seed or 0)
+
+        start = time.perf_counter()
+        log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with log:
+            manifest = pipeline.배치실행(paths, os.path.join(args.workdir, '결과'), args.workers)
+        wall = time.perf_counter() - start
+        server_stats = server.summary()
+
+    latencies = [r['seconds'] for r in manifest['passages'] if 'seconds' in r]
+    usage = manifest['usage']
+    return {
+        'passages': manifest['total'],
+        'ok': manifest['ok'],
+        'failed': manifest['failed'],
+        'wall_seconds': round(wall, 3),
+        'passages_per_min': round(manifest['total'] / wall * 60, 2),
+        'output_tokens_per_sec': round(usage['output'] / wall, 1),
+        'latency': {f'p{p}': round(percentile(latencies, p), 3) for p in (50, 95, 99)},
+        'stages': {name: {'calls': calls, 'seconds': round(seconds, 3)}
+                   for name, calls, seconds in sorted(timer.rows(), key=lambda r: -r[2])},
+        'scheduler': manifest['scheduler'],
+        'hedging': manifest['hedging'],
+        'server': server_stats,
+        'usage': usage,
+    }
+
+
+def print_report(report):
+    print(f"지문 {report['passages']}개 (성공 {report['ok']}, 실패 {report['failed']}) - {report['wall_seconds']}초")
+    print(f"처리량: {report['passages_per_min']} 지문/분 · 출력 {report['output_tokens_per_sec']} 토큰/초")
+    lat = report['latency']
+    print(f"지문별 지연: p50 {lat['p50']:.2f}초 · p95 {lat['p95']:.2f}초 · p99 {lat['p99']:.2f}초")
+
+    total = sum(stage['seconds'] for stage in report['stages'].values()) or 1
+    print(f"\n{'단계':<22} {'호출':>6} {'자기 시간':>10} {'평균':>9} {'비율':>6}")
+    for name, stage in report['stages'].items():
+        mean = stage['seconds'] / stage['calls'] * 1000 if stage['calls'] else 0
+        print(f"{name:<22} {stage['calls']:>6} {stage['seconds']:>9.2f}s {mean:>7.1f}ms "
+              f"{stage['seconds'] / total:>6.1%}")
+
+    scheduler, server = report['scheduler'], report['server']
+    print(f"\n스케줄러: 호출 {scheduler['calls']} · 재시도 {scheduler['retries']} · 429 {scheduler['rate_limited']} · "
+          f"한도 대기 {scheduler['waited']}초")
+    print(f"서버: 요청 {server['requests']} · 429 {server['rate_limited']} · 529 {server['overloaded']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 서버로 생성 파이프라인 끝-끝 벤치마크")
+    parser.add_argument('-n', '--passages', type=int, default=20, help="지문 수 (기본 20)")
+    parser.add_argument('--chars', type=int, default=1500, help="지문 평균 글자 수 (기본 1500)")
+    parser.add_argument('-j', '--workers', type=int, default=4, help="동시에 처리할 지문 수 (기본 4)")
+    parser.add_argument('-c', '--concurrency', type=int, default=3, help="지문 하나의 유형별 동시 호출 수 (기본 3)")
+    parser.add_argument('--pack', action='store_true', help="짧은 지문 묶음 켜기")
+    parser.add_argument('--structured', action='store_true', help="JSON 스키마(도구 사용) 출력")
+    parser.add_argument('--hwpx', action='store_true', help="지문마다 HWPX 파일도 저장")
+    parser.add_argument('--cache', action='store_true', help="응답 캐시 사용 (기본은 끔)")
+    parser.add_argument('--json', help="결과를 JSON 파일로도 저장")
+    parser.add_argument('-v', '--verbose', action='store_true', help="파이프라인 출력 보이기")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        report = run(args)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+tag_tokenizer 벤치마크 - 기존 줄 단위 함수 체인 vs 한 번 순회 토크나이저
+
+    python benchmarks/bench_tag_tokenizer.py            # 1천 / 1만 / 10만 줄
+    python benchmarks/bench_tag_tokenizer.py 500000
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tag_tokenizer import GENERATOR_TAGS, tokenize  # noqa: E402
+
+CIRCLED = '①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳'
+WORDS = ('맹자는 인간의 본성이 선하다고 보았다 순자는 본성이 악하다고 주장했다 '
+         '양자역학 관찰 파동 입자 금리 정책 경제 성장 물가 기업 투자').split()
+
+
+def sentence(rng, n=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_workbook(lines, seed=0):
+    """모델 출력처럼 생긴 합성 문제집 (지저분한 줄 포함)"""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < lines:
+        kind = rng.random()
+        if kind < 0.1:
+            out.append(f'[지문또는문단] {sentence(rng, 30)}')
+        elif kind < 0.25:
+            out.append(f'[문제] {rng.randint(1, 20)}. {sentence(rng)}?')
+        elif kind < 0.35:
+            out.append(f'[보기] {sentence(rng)}')
+        elif kind < 0.6:
+            out.append(f'[선택지] {rng.choice(CIRCLED)} {sentence(rng, 8)}')
+        elif kind < 0.7:
+            out.append(f'[교사용정답] 정답) {rng.choice(CIRCLED)} 해설) {sentence(rng, 20)}')
+        elif kind < 0.74:
+            out.append(rng.choice(['[Odyssey]', '󰂼 잡음', '[세부 정보 보기]', '󰃛']))
+        elif kind < 0.8:
+            out.append(f'[지문또는문단] {rng.choice(CIRCLED)} {sentence(rng, 6)}')
+        elif kind < 0.84:
+            out.append(f'[지문또는문단] [해설] {sentence(rng)}')
+        elif kind < 0.88:
+            out.append(f'[지문또는문단] [문제] {sentence(rng)}')
+        elif kind < 0.92:
+            out.append('[지문또는문단] 짧은 줄')
+        else:
+            out.append('')
+    return '\n'.join(out)
+
+
+# ========== 기존 구현 (비교용) ==========
+def legacy_문제번호_제거(텍스트):
+    결과 = []
+    for line in 텍스트.split('\n'):
+        if line.strip().startswith('[문제]'):
+            line = re.sub(r'^\[문제\]\s*\d+\.\s*', '[문제] ', line)
+        결과.append(line)
+    return '\n'.join(결과)
+
+
+def legacy_태그_수정(텍스트):
+    결과 = []
+    for line in 텍스트.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if any(x in line for x in ['[Odyssey]', '󰂼', '󰃛', '[세부 정보', '[세부 내용']):
+            continue
+        if '[지문또는문단]' in line and '[문제]' in line:
+            line = line.replace('[지문또는문단]', '').strip()
+        elif '[지문또는문단]' in line and '[선택지]' in line:
+            line = line.replace('[지문또는문단]', '').strip()
+        elif '[지문또는문단]' in line and '[보기]' in line:
+            line = line.replace('[지문또는문단]', '').strip()
+        elif '[지문또는문단]' in line and ('[교사용정답]' in line or '[해설]' in line):
+            line = line.replace('[지문또는문단]', '').replace('[해설]', '[교사용정답]').strip()
+        elif '[지문또는문단]' in line and re.search(r'[①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳]', line):
+            line = line.replace('[지문또는문단]', '[선택지]')
+        elif line.startswith('[지문또는문단]'):
+            if len(line.replace('[지문또는문단]', '').strip()) > 30:
+                결과.append(line)
+            continue
+        결과.append(line)
+    return '\n'.join(결과)
+
+
+def legacy_get_style_shortcut(text):
+    if text.startswith('[문제]'):
+        return 'ctrl+3'
+    elif text.startswith('[교사용정답]'):
+        return 'ctrl+5'
+    elif text.startswith('[선택지]'):
+        return 'ctrl+4'
+    elif text.startswith('[보기]'):
+        return 'ctrl+7'
+    elif text.startswith('[지문또는문단]'):
+        return 'ctrl+2'
+    return 'ctrl+1'
+
+
+def legacy_get_content_type(text):
+    if text.startswith('[지문또는문단]'):
+        return 'content'
+    elif text.startswith('[문제]'):
+        return 'question'
+    elif text.startswith('[보기]'):
+        return 'choice'
+    elif text.startswith('[선택지]'):
+        return 'option'
+    elif text.startswith('[교사용정답]'):
+        return 'answer'
+    return 'other'
+
+
+def legacy_clean_text_content(text):
+    return re.sub(r'^\[[^\]]+\]\s*', '', text).strip()
+
+
+def legacy_chain(text):
+    정리 = legacy_태그_수정(legacy_문제번호_제거(text))
+    return [
+        (legacy_get_style_shortcut(line), legacy_get_content_type(line), legacy_clean_text_content(line))
+        for line in 정리.split('\n') if line.strip()
+    ]
+
+
+def tokenizer(text):
+    return [(t.style, t.type, t.text) for t in tokenize(text, GENERATOR_TAGS, repair=True)]
+
+
+def best_of(fn, arg, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    print(f"{'줄 수':>8}  {'기존 체인':>10}  {'토크나이저':>10}  {'배속':>6}")
+    for n in sizes:
+        text = make_workbook(n)
+        assert legacy_chain(text) == tokenizer(text), '결과가 기존 구현과 다릅니다'
+        repeat = 5 if n <= 100_000 else 2
+        old = best_of(legacy_chain, text, repeat)
+        new = best_of(tokenizer, text, repeat)
+        print(f"{n:>8}  {old * 1000:>8.1f}ms  {new * 1000:>8.1f}ms  {old / new:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+텍스트 처리 함수 마이크로 벤치마크 - 초당 실행 수(ops/sec) + 최대 메모리(tracemalloc)
+
+    python benchmarks/bench_text_processing.py                  # 10 ~ 10만 줄, 기준과 비교
+    python benchmarks/bench_text_processing.py --sizes 10 1000  # 일부 크기만
+    python benchmarks/bench_text_processing.py --save-baseline  # 지금 결과를 기준으로 저장
+    python benchmarks/bench_text_processing.py -k 태그_수정       # 이름에 '태그_수정'이 들어간 것만
+
+합성 문제집(모델 출력 모양, [Odyssey] / 사용자 영역 글자 / '[지문또는문단] ①' 같은 지저분한 줄 포함)을
+크기별로 만들어 함수마다 잰다. 줄 단위 함수(get_style_shortcut 등)는 문제집의 모든 줄을 한 번
+처리하는 것이 1회다. 기준 파일이 있으면 ops/sec가 --tolerance보다 많이 떨어지거나 최대 메모리가
+그만큼 늘어난 항목을 보여 주고 종료 코드 1로 끝난다 (기준은 같은 컴퓨터에서 저장한 것과 비교).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import html_hwp_automation as hwp  # noqa: E402
+import 문제생성_자동화_통합 as gen  # noqa: E402
+from bench_tag_tokenizer import make_workbook, sentence  # noqa: E402
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+BASELINE = os.path.join(BENCH_DIR, 'baseline_text_processing.json')
+
+
+def make_passage(lines, seed=0):
+    """문단 lines개짜리 지문 (빈 줄로 구분, 가끔 줄바꿈만 있는 문단)"""
+    rng = random.Random(seed)
+    paragraphs = [' '.join(sentence(rng) + '.' for _ in range(rng.randint(2, 5))) for _ in range(lines)]
+    return ''.join(p + ('\n' if rng.random() < 0.1 else '\n\n') for p in paragraphs).strip()
+
+
+def make_corpus(lines, folder):
+    """크기 하나의 입력 모음"""
+    workbook = make_workbook(lines, seed=lines)
+    repaired = gen.태그_수정(workbook)
+    html = gen.태그텍스트를_HTML로_변환(repaired)
+    html_path = os.path.join(folder, f'workbook_{lines}.html')
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return {
+        'passage': make_passage(lines, seed=lines),
+        'workbook': workbook,
+        'repaired': repaired,
+        'lines': repaired.split('\n'),
+        'html': html,
+        'html_path': html_path,
+    }
+
+
+def per_line(fn):
+    """줄 단위 함수 → 문제집의 모든 줄을 한 번 처리하는 함수 (줄 나누기는 측정에서 뺌)"""
+    def run(lines):
+        for line in lines:
+            fn(line)
+    return run
+
+
+# 이름 → (함수, 입력 이름)
+CASES = {
+    '지문_문단별_태그': (gen.지문_문단별_태그, 'passage'),
+    '태그_수정': (gen.태그_수정, 'workbook'),
+    '태그텍스트를_HTML로_변환': (gen.태그텍스트를_HTML로_변환, 'repaired'),
+    'analyze_html_content': (gen.analyze_html_content, 'html'),
+    'analyze_html': (hwp.analyze_html, 'html_path'),
+    'clean_text_content': (per_line(gen.clean_text_content), 'lines'),
+    'get_content_type': (per_line(gen.get_content_type), 'lines'),
+    'get_style_shortcut': (per_line(gen.get_style_shortcut), 'lines'),
+    'html_hwp.clean_text_content': (per_line(hwp.clean_text_content), 'lines'),
+    'html_hwp.get_content_type': (per_line(hwp.get_content_type), 'lines'),
+    'html_hwp.get_style_shortcut': (per_line(hwp.get_style_shortcut), 'lines'),
+}
+
+
+def ops_per_sec(fn, arg, min_time=0.2, repeat=3):
+    """min_time초 이상 걸리도록 횟수를 늘려 재고, repeat번 중 가장 빠른 값"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(arg)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return number / best
+
+
+def peak_memory(fn, arg):
+    """한 번 실행하는 동안 새로 할당된 최대 바이트"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(arg)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, names, min_time):
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for lines in sizes:
+            corpus = make_corpus(lines, folder)
+            for name in names:
+                fn, source = CASES[name]
+                # analyze_html은 파일 크기 / 항목 수를 출력하므로 숨김
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ops = ops_per_sec(fn, corpus[source], min_time)
+                    peak = peak_memory(fn, corpus[source])
+                key = f'{name}[{lines}]'
+                results[key] = {'ops_per_sec': round(ops, 3), 'peak_bytes': peak}
+                print(f"{key:<40} {ops:>12.1f} ops/s {ops * lines:>14.0f} 줄/s {peak / 1024:>10.1f} KiB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """기준 대비 느려졌거나 메모리가 늘어난 항목 목록"""
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if now['ops_per_sec'] < before['ops_per_sec'] * (1 - tolerance):
+            regressions.append(f"{key}: {before['ops_per_sec']:.1f} → {now['ops_per_sec']:.1f} ops/s")
+        # 아주 작은 할당은 흔들림이 커서 4KiB 여유
+        if now['peak_bytes'] > before['peak_bytes'] * (1 + tolerance) + 4096:
+            regressions.append(f"{key}: 메모리 {before['peak_bytes'] / 1024:.1f} → {now['peak_bytes'] / 1024:.1f} KiB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="텍스트 처리 함수 마이크로 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="문제집 줄 수 (기본 10 ~ 100000)")
+    parser.add_argument('-k', '--filter', help="이름에 이 문자열이 들어간 함수만")
+    parser.add_argument('--min-time', type=float, default=0.2, help="측정 한 번의 최소 시간 (초)")
+    parser.add_argument('--baseline', default=BASELINE, help="기준 파일 (기본 benchmarks/baseline_text_processing.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 기준으로 저장 (기존 항목은 덮어씀)")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="허용 비율 (기본 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if not args.filter or args.filter in name]
+    results = run(args.sizes, names, args.min_time)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\n기준 저장: {args.baseline} ({len(results)}개 항목)")
+        return 0
+
+    if not baseline:
+        print("\n기준 파일이 없습니다 (--save-baseline으로 저장)")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ 기준보다 나빠진 항목 {len(regressions)}개 (허용 {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\n✓ 기준 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 가짜 Anthropic 서버 (Messages API) - 돈/네트워크 없이 생성 파이프라인 측정용
+
+    python benchmarks/mock_anthropic_server.py --port 8765 --latency 0.5 --tokens-per-sec 300
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python 문제생성_자동화_통합.py 지문.txt
+
+- POST /v1/messages: 일반 / 스트리밍(SSE), 텍스트 / 도구 사용(tool_use) 응답
+- 첫 토큰 지연(latency, jitter), 출력 속도(tokens-per-sec), 과부하 오류(529) 비율,
+  분당 요청 한도(rpm → 429 + retry-after + anthropic-ratelimit-* 헤더), 무작위 429 비율
+- 출력은 요청의 유형/문제 수/묶음 구분줄에 맞춰 지문 내용으로 만들거나,
+  --replay 폴더(*.txt, 파일 이름이 유형으로 시작) 또는 응답캐시 .sqlite3의 기록을 그대로 돌려줌
+- 토큰 수는 글자 수로 셈 (한글은 글자당 약 1토큰)
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CIRCLED = '①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳'
+TYPES = ('보기형', 'OX', '최다선지')
+SHAPES = {'보기형': (3, 5), 'OX': (15, 0), '최다선지': (1, 20)}  # (문제 수, 선택지 수)
+
+TYPE_RE = re.compile(r'(보기형|OX|최다선지) 문제')
+EXACT_RE = re.compile(r'정확히 (\d+)개')
+MARKER_RE = re.compile(r'^\s*\[\[지문 (P\d+)\]\]\s*$', re.M)
+SENTENCE_RE = re.compile(r'[^.?!\n]+[.?!]?')
+
+
+class MockConfig:
+    def __init__(self, latency=0.3, jitter=0.2, tokens_per_sec=1000.0, chunk=20,
+                 error_rate=0.0, rate_limit_rate=0.0, rpm=0, retry_after=1.0,
+                 replay=None, seed=None):
+        self.latency = latency                  # 첫 토큰까지 초
+        self.jitter = jitter                    # latency에 곱하는 ±비율
+        self.tokens_per_sec = tokens_per_sec    # 출력 속도 (0이면 바로)
+        self.chunk = chunk                      # 스트리밍 이벤트 하나의 글자 수
+        self.error_rate = error_rate            # 529 overloaded 비율
+        self.rate_limit_rate = rate_limit_rate  # 한도와 상관없는 429 비율
+        self.rpm = rpm                          # 분당 요청 한도 (0이면 없음)
+        self.retry_after = retry_after          # 무작위 429의 retry-after 초
+        self.replay = replay
+        self.seed = seed
+
+
+def load_replay(path):
+    """기록된 출력 → 유형 → 텍스트 목록 ('' 키는 유형을 모르는 것)
+
+    폴더: *.txt (파일 이름이 보기형 / OX / 최다선지로 시작하면 그 유형)
+    .sqlite3: 응답캐시의 responses(question_type, text)
+    """
+    recorded = defaultdict(list)
+    if os.path.isdir(path):
+        for file in sorted(glob.glob(os.path.join(path, '*.txt'))):
+            name = os.path.basename(file)
+            kind = next((t for t in TYPES if name.startswith(t)), '')
+            with open(file, encoding='utf-8') as f:
+                recorded[kind].append(f.read().strip())
+    else:
+        conn = sqlite3.connect(path)
+        try:
+            for kind, text in conn.execute('SELECT question_type, text FROM responses ORDER BY created'):
+                recorded[kind or ''].append(text)
+        finally:
+            conn.close()
+    if not recorded:
+        raise ValueError(f'기록된 출력이 없습니다: {path}')
+    return recorded
+
+
+# ========== 출력 만들기 ==========
+def _sentences(passage):
+    found = [s.strip() for s in SENTENCE_RE.findall(passage) if len(s.strip()) > 5]
+    return found or [passage.strip()[:60] or '지문 내용']
+
+
+def _questions(kind, passage, count, n_choices):
+    """지문 문장으로 만든 유형별 문제 목록 (dict: stem, bogi, choices, answer, explanation)"""
+    sentences = itertools.cycle(_sentences(passage))
+    questions = []
+    for _ in range(count):
+        q = {'stem': '', 'bogi': [], 'choices': [], 'answer': '', 'explanation': next(sentences)[:60]}
+        if kind == 'OX':
+            q['stem'] = f'{next(sentences)[:80]} (O/X)'
+            q['answer'] = 'O'
+        elif kind == '보기형':
+            q['stem'] = '윗글을 바탕으로 <보기>를 이해한 내용으로 적절한 것은?'
+            q['bogi'] = [next(sentences)[:80], next(sentences)[:80]]
+            q['choices'] = [next(sentences)[:50] for _ in range(n_choices)]
+            q['answer'] = CIRCLED[2]
+        else:
+            q['stem'] = '윗글의 내용과 일치하는 것을 모두 고르시오.'
+            q['choices'] = [next(sentences)[:50] for _ in range(n_choices)]
+            q['answer'] = ', '.join(CIRCLED[i] for i in range(0, n_choices, 4))
+        questions.append(q)
+    return questions
+
+
+def _tagged(questions):
+    lines = []
+    for q in questions:
+        lines.append(f"[문제] {q['stem']}")
+        lines += [f'[보기] {line}' for line in q['bogi']]
+        lines += [f'[선택지] {CIRCLED[i]} {c}' for i, c in enumerate(q['choices'])]
+        lines.append(f"[교사용정답] 정답) {q['answer']} 해설) {q['explanation']}")
+    return '\n'.join(lines)
+
+
+def parse_request(body):
+    """요청 → (유형, 지문, 문제 수, 선택지 수, 도구 이름)"""
+    blocks = body['messages'][0]['content']
+    if isinstance(blocks, str):
+        blocks = [{'type': 'text', 'text': blocks}]
+    texts = [b.get('text', '') for b in blocks if b.get('type') == 'text']
+    prompt = texts[0] if texts else ''
+    passage = next((t.split('\n', 1)[1] for t in texts if t.startswith('===지문===')), '')
+    extra = '\n'.join(texts[2:])
+
+    match = TYPE_RE.search(prompt)
+    kind = match.group(1) if match else TYPES[0]
+    count, n_choices = SHAPES[kind]
+    exact = EXACT_RE.search(extra)
+    if exact and kind == '최다선지' and '선택지는' in extra:
+        n_choices = int(exact.group(1))
+    elif exact:
+        count = int(exact.group(1))
+
+    tool = None
+    if body.get('tools'):
+        tool = body['tools'][0]
+        schema = tool['input_schema']['properties']['questions']
+        count = schema.get('minItems', count)
+        choices = schema['items']['properties'].get('choices')
+        n_choices = choices['minItems'] if choices else 0
+        tool = tool['name']
+    return kind, passage, count, n_choices, tool
+
+
+def generate(kind, passage, count, n_choices, tool=None):
+    """텍스트 출력 (묶음 구분줄이 있으면 지문마다) 또는 도구 입력 dict"""
+    if tool:
+        return {'questions': _questions(kind, passage, count, n_choices)}
+    markers = MARKER_RE.findall(passage)
+    if not markers:
+        return _tagged(_questions(kind, passage, count, n_choices))
+    sections = MARKER_RE.split(passage)[1:]  # [이름, 내용, 이름, 내용, ...]
+    return '\n'.join(f'[[지문 {name}]]\n{_tagged(_questions(kind, text, count, n_choices))}'
+                     for name, text in zip(sections[::2], sections[1::2]))
+
+
+class MockAnthropic:
+    """서버 상태 (한도 창, 기록 재생 순서, 통계) - 요청 처리 스레드들이 공유"""
+
+    def __init__(self, config):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.recorded = load_replay(config.replay) if config.replay else None
+        self.replay_index = defaultdict(int)
+        self.window = deque()  # 최근 60초 요청 시각
+        self.cached_prefixes = set()
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'streamed': 0, 'rate_limited': 0, 'overloaded': 0, 'output_tokens': 0}
+
+    def admit(self):
+        """요청 받기 → (상태 코드, 헤더) (200이 아니면 오류 응답)"""
+        config = self.config
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            while self.window and now - self.window[0] >= 60:
+                self.window.popleft()
+            headers = {}
+            if config.rpm:
+                reset = 60 - (now - self.window[0]) if self.window else 60
+                reset_at = datetime.now(timezone.utc) + timedelta(seconds=reset)
+                headers.update({
+                    'anthropic-ratelimit-requests-limit': str(config.rpm),
+                    'anthropic-ratelimit-requests-remaining': str(max(0, config.rpm - len(self.window) - 1)),
+                    'anthropic-ratelimit-requests-reset': reset_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                })
+                if len(self.window) >= config.rpm:
+                    self.stats['rate_limited'] += 1
+                    headers['retry-after'] = f'{reset:.0f}'
+                    return 429, headers
+            roll = self.random.random()
+            if roll < config.rate_limit_rate:
+                self.stats['rate_limited'] += 1
+                headers['retry-after'] = f'{config.retry_after:g}'
+                return 429, headers
+            if roll < config.rate_limit_rate + config.error_rate:
+                self.stats['overloaded'] += 1
+                return 529, headers
+            self.window.append(now)
+            return 200, headers
+
+    def first_token_delay(self):
+        with self.lock:
+            spread = self.random.uniform(-self.config.jitter, self.config.jitter)
+        return max(0.0, self.config.latency * (1 + spread))
+
+    def output(self, kind, passage, count, n_choices, tool):
+        if self.recorded is None:
+            return generate(kind, passage, count, n_choices, tool)
+        with self.lock:
+            # 구조화 요청은 JSON 기록, 텍스트 요청은 태그 기록만
+            choices = [t for t in self.recorded.get(kind) or self.recorded.get('', [])
+                       if t.startswith('{') == bool(tool)]
+            if not choices:
+                return generate(kind, passage, count, n_choices, tool)
+            text = choices[self.replay_index[kind] % len(choices)]
+            self.replay_index[kind] += 1
+        return json.loads(text) if tool else text
+
+    def usage(self, body, output_tokens):
+        """글자 수 기준 usage (cache_control 블록은 처음엔 캐시 쓰기, 다음부터 캐시 읽기)"""
+        cached = uncached = 0
+        for block in body['messages'][0]['content']:
+            if not isinstance(block, dict):
+                continue
+            size = len(block.get('text', ''))
+            if block.get('cache_control'):
+                cached += size + sum(len(b.get('text', '')) for b in body.get('system') or [] if isinstance(b, dict))
+            else:
+                uncached += size
+        with self.lock:
+            prefix = hash((body.get('model'), cached))
+            hit = prefix in self.cached_prefixes
+            self.cached_prefixes.add(prefix)
+            self.stats['output_tokens'] += output_tokens
+        return {
+            'input_tokens': uncached,
+            'output_tokens': output_tokens,
+            'cache_creation_input_tokens': 0 if hit else cached,
+            'cache_read_input_tokens': cached if hit else 0,
+        }
+
+    def summary(self):
+        with self.lock:
+            return dict(self.stats)
+
+
+def _finish(text, stop_sequences):
+    """stop sequence가 나오면 거기서 자름 → (텍스트, stop_reason, stop_sequence)"""
+    for stop in stop_sequences or []:
+        if stop in text:
+            return text[:text.index(stop)], 'stop_sequence', stop
+    return text, 'end_turn', None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mock = None  # serve()에서 MockAnthropic을 붙임
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # 클라이언트 예열용 models.list
+        if self.path.startswith('/v1/models'):
+            self._send_json(200, {'data': [], 'has_more': False, 'first_id': None, 'last_id': None})
+        else:
+            self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+    def do_POST(self):
+        length = int(self.headers.get('content-length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if not self.path.startswith('/v1/messages'):
+            self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+            return
+
+        mock = self.mock
+        status, headers = mock.admit()
+        if status == 429:
+            self._send_json(429, {'type': 'error', 'error': {'type': 'rate_limit_error', 'message': '요청 한도 초과'}},
+                            headers)
+            return
+        if status == 529:
+            self._send_json(529, {'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'Overloaded'}},
+                            headers)
+            return
+
+        kind, passage, count, n_choices, tool = parse_request(body)
+        output = mock.output(kind, passage, count, n_choices, tool)
+        if tool:
+            text, stop_reason, stop_sequence = json.dumps(output, ensure_ascii=False), 'tool_use', None
+        else:
+            text, stop_reason, stop_sequence = _finish(output + '\n[끝]\n', body.get('stop_sequences'))
+        usage = mock.usage(body, len(text))
+        message = {
+            'id': f'msg_mock_{mock.stats["requests"]}', 'type': 'message', 'role': 'assistant',
+            'model': body.get('model', 'mock'), 'stop_reason': stop_reason, 'stop_sequence': stop_sequence,
+        }
+
+        time.sleep(mock.first_token_delay())
+        if body.get('stream'):
+            with mock.lock:
+                mock.stats['streamed'] += 1
+            self._stream(message, text, tool, usage, headers)
+            return
+
+        if mock.config.tokens_per_sec:
+            time.sleep(len(text) / mock.config.tokens_per_sec)
+        if tool:
+            content = [{'type': 'tool_use', 'id': 'toolu_mock', 'name': tool, 'input': output}]
+        else:
+            content = [{'type': 'text', 'text': text}]
+        self._send_json(200, dict(message, content=content, usage=usage), headers)
+
+    def _stream(self, message, text, tool, usage, headers):
+        """SSE (chunked) - 클라이언트가 중간에 끊으면(조기 종료, 헤지 취소) 그대로 멈춤"""
+        self.send_response(200)
+        self.send_header('content-type', 'text/event-stream')
+        self.send_header('transfer-encoding', 'chunked')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        def event(name, data):
+            payload = f'event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'.encode('utf-8')
+            self.wfile.write(f'{len(payload):x}\r\n'.encode() + payload + b'\r\n')
+            self.wfile.flush()
+
+        config = self.mock.config
+        if tool:
+            block = {'type': 'tool_use', 'id': 'toolu_mock', 'name': tool, 'input': {}}
+            delta = lambda piece: {'type': 'input_json_delta', 'partial_json': piece}  # noqa: E731
+        else:
+            block = {'type': 'text', 'text': ''}
+            delta = lambda piece: {'type': 'text_delta', 'text': piece}  # noqa: E731
+        start_usage = dict(usage, output_tokens=1)
+        try:
+            event('message_start', {'type': 'message_start', 'message': dict(
+                message, content=[], stop_reason=None, stop_sequence=None, usage=start_usage)})
+            event('content_block_start', {'type': 'content_block_start', 'index': 0, 'content_block': block})
+            for i in range(0, len(text), config.chunk):
+                piece = text[i:i + config.chunk]
+                event('content_block_delta', {'type': 'content_block_delta', 'index': 0, 'delta': delta(piece)})
+                if config.tokens_per_sec:
+                    time.sleep(len(piece) / config.tokens_per_sec)
+            event('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+            event('message_delta', {'type': 'message_delta',
+                                    'delta': {'stop_reason': message['stop_reason'],
+                                              'stop_sequence': message['stop_sequence']},
+                                    'usage': {'output_tokens': usage['output_tokens']}})
+            event('message_stop', {'type': 'message_stop'})
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class MockServer:
+    """백그라운드 스레드에서 도는 가짜 서버 (with 문으로 사용)
+
+        with MockServer(MockConfig(latency=0.5)) as server:
+            os.environ['ANTHROPIC_BASE_URL'] = server.url
+    """
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.mock = MockAnthropic(config or MockConfig())
+        handler = type('BoundHandler', (Handler,), {'mock': self.mock})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def summary(self):
+        return self.mock.summary()
+
+
+def add_arguments(parser):
+    """서버 설정 옵션 (벤치마크 명령과 공유)"""
+    parser.add_argument('--latency', type=float, default=0.3, help="첫 토큰까지 초 (기본 0.3)")
+    parser.add_argument('--jitter', type=float, default=0.2, help="latency ±비율 (기본 0.2)")
+    parser.add_argument('--tokens-per-sec', type=float, default=1000.0, help="출력 속도, 0이면 바로 (기본 1000)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="529 overloaded 비율")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="한도와 상관없는 429 비율")
+    parser.add_argument('--rpm', type=int, default=0, help="분당 요청 한도 (넘으면 429, 0이면 없음)")
+    parser.add_argument('--replay', help="기록된 출력 폴더(*.txt) 또는 응답캐시 .sqlite3")
+    parser.add_argument('--seed', type=int, help="오류/지연 난수 시드")
+
+
+def config_from_args(args):
+    return MockConfig(latency=args.latency, jitter=args.jitter, tokens_per_sec=args.tokens_per_sec,
+                      error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, rpm=args.rpm,
+                      replay=args.replay, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 가짜 Anthropic Messages API 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockServer(config_from_args(args), args.host, args.port)
+    print(f"가짜 서버: {server.url}  (ANTHROPIC_BASE_URL={server.url}, Ctrl+C로 종료)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"요청 통계: {server.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+헤지(hedged) 요청 + 호출별 마감 시간
+
+첫 토큰이 최근 첫 토큰 시간의 p 백분위까지 오지 않으면 같은 요청을 하나 더 보내고,
+먼저 끝난 쪽 결과를 쓴다 (진 쪽은 취소). 추가 요청 수는 예산(전체 호출 대비 비율)으로 제한한다.
+마감 시간까지 결과가 없으면 모두 취소하고 DeadlineExceeded (재시도 대상).
+
+취소 신호(CancelToken)에는 reason('lost': 다른 요청이 이김, 'deadline': 마감 초과)이 붙고,
+on_cancel()로 등록한 정리 함수(스트림 닫기)를 취소하는 즉시 부른다 - 다음 이벤트를 기다리지 않고
+연결을 풀에 돌려줌. 진 쪽이나 마감 뒤에 끝난 요청도 과금되므로, 쓰지 않게 된 결과는
+discard(결과, reason)로 넘긴다.
+"""
+
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+
+class DeadlineExceeded(TimeoutError):
+    """마감 시간 안에 결과 없음"""
+
+
+class Cancelled(Exception):
+    """다른 요청이 먼저 끝나서 취소됨"""
+
+
+class CancelToken:
+    """취소 신호 (threading.Event처럼 is_set() + 이유 + 취소 즉시 부를 정리 함수)"""
+
+    def __init__(self):
+        self.reason = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def on_cancel(self, callback):
+        """취소되면 callback() (이미 취소됐으면 바로)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self, reason):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # 정리 실패는 무시 (시도 쪽에서 오류로 끝남)
+
+
+class LatencyTracker:
+    """라벨(문제 유형)별 최근 첫 토큰 시간"""
+
+    def __init__(self, window=50, min_samples=5, default=8.0):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.min_samples = min_samples
+        self.default = default  # 표본이 적을 때 쓰는 값 (초)
+        self.lock = threading.Lock()
+
+    def record(self, label, seconds):
+        with self.lock:
+            self.samples[label].append(seconds)
+
+    def percentile(self, label, p):
+        with self.lock:
+            values = sorted(self.samples[label])
+        if len(values) < self.min_samples:
+            return self.default
+        index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+        return values[index]
+
+
+class HedgeBudget:
+    """추가 요청 수 ≤ 전체 호출 수 × ratio (+ burst)"""
+
+    def __init__(self, ratio=0.1, burst=1):
+        self.ratio = ratio
+        self.burst = burst
+        self.calls = 0
+        self.hedges = 0
+        self.lock = threading.Lock()
+
+    def count_call(self):
+        with self.lock:
+            self.calls += 1
+
+    def try_spend(self):
+        with self.lock:
+            if self.hedges + 1 > self.calls * self.ratio + self.burst:
+                return False
+            self.hedges += 1
+            return True
+
+
+def run_hedged(attempt, hedge_after=None, deadline=None, allow_hedge=None, discard=None):
+    """attempt(first_token, cancel) 실행 → (결과, 헤지 여부, 헤지가 이겼는지)
+
+    attempt는 첫 토큰을 받으면 first_token.set(), cancel.is_set()이면 Cancelled를 던지고 멈춘다
+    (cancel.reason으로 이유 확인, cancel.on_cancel(스트림.close)로 취소 즉시 끊기게 할 수 있음).
+    hedge_after초 안에 첫 토큰이 없고 allow_hedge()가 True면 같은 attempt를 하나 더 실행.
+    이긴 뒤나 마감 뒤에 성공한 결과는 discard(결과, reason).
+    """
+    results = queue.Queue()
+    cancels = []
+    lock = threading.Lock()
+    closed = []  # 결과를 더 받지 않는 이유 (먼저 성공한 쪽이 'lost'를, 마감이 'deadline'을 넣음)
+
+    def stop(reason):
+        for cancel in cancels:
+            cancel.cancel(reason)
+
+    def launch(name):
+        first_token, cancel = threading.Event(), CancelToken()
+        cancels.append(cancel)
+
+        def target():
+            try:
+                result = attempt(first_token, cancel)
+            except BaseException as e:
+                results.put((name, None, e))
+                return
+            finally:
+                first_token.set()  # 빨리 실패해도 헤지 대기를 끝냄
+            with lock:
+                late = closed[0] if closed else None
+                if late is None:
+                    closed.append('lost')  # 이 결과를 씀 → 나머지는 진 쪽
+            if late is None:
+                results.put((name, result, None))
+            elif discard is not None:
+                discard(result, late)
+
+        threading.Thread(target=target, daemon=True).start()
+        return first_token
+
+    start = time.monotonic()
+    first_token = launch('primary')
+    running = 1
+    hedged = False
+    if hedge_after is not None:
+        wait = hedge_after if deadline is None else min(hedge_after, deadline)
+        if not first_token.wait(wait) and (allow_hedge is None or allow_hedge()):
+            launch('hedge')
+            running += 1
+            hedged = True
+
+    error = None
+    expired = False
+    while running:
+        timeout = None if deadline is None or expired else max(0.0, deadline - (time.monotonic() - start))
+        try:
+            name, result, exc = results.get(timeout=timeout)
+        except queue.Empty:
+            with lock:
+                expired = bool(closed)  # 방금 성공한 쪽이 있으면 그 결과를 기다림
+                if not expired:
+                    closed.append('deadline')
+            if expired:
+                continue
+            stop('deadline')
+            raise DeadlineExceeded(f'{deadline:.0f}초 안에 응답 없음') from error
+        running -= 1
+        if exc is None:
+            stop('lost')
+            return result, hedged, name == 'hedge'
+        error = exc
+    raise error
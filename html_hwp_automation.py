@@ -1,13 +1,41 @@
-import pyautogui
+"""
+HTML -> 한글 자동화
+
+    python html_hwp_automation.py                         파일 선택 대화상자 (대화형)
+    python html_hwp_automation.py 문제.html -y            확인 없이 한글에 입력
+    python html_hwp_automation.py "결과/*.html" --hwpx -o hwpx -j 4   HWPX 파일로 저장
+    python html_hwp_automation.py 문제.html --dry-run     키 입력 수 / 예상 시간만
+    python html_hwp_automation.py --resume                중단된 입력을 마지막 항목 다음부터
+
+tkinter / pyautogui는 대화상자·한글 입력 경로에서만 불러온다.
+"""
+import argparse
+import glob
 import time
-from bs4 import BeautifulSoup
-import tkinter as tk
-from tkinter import filedialog
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+import os
 import re
-import pyperclip
+from hwp_keystroke_plan import PlanCompiler, PyAutoGuiExecutor, RecordingExecutor, run_actions
+from hwp_pacing import Pacer, wait_for_window
+from hwpx_writer import STYLE_NAMES, build_paragraphs, write_hwpx
+from tag_tokenizer import HWP_TAGS, make_token, split_tag
+from tracing import configure as configure_tracing, span, traced
+from typing_journal import TypingJournal, describe, fingerprint, is_failsafe
+
+# 고정 sleep 대신 붙여넣기 성공 여부에 따라 대기 시간 조절 (hwp_pacing.py로 보정)
+ADAPTIVE_PACING = True
+# True면 앞 문단과 같은 스타일은 다시 누르지 않음 (템플릿의 '다음 스타일'이 같은 스타일일 때만)
+INHERIT_STYLE = False
+# 입력 체크포인트 (중단되면 --resume으로 이어서 입력, None이면 안 남김)
+JOURNAL_FILE = '한글입력_기록.json'
 
 def select_html_file():
     """HTML 파일 선택 대화상자"""
+    import tkinter as tk
+    from tkinter import filedialog
+    
     root = tk.Tk()
     root.withdraw()
     
@@ -21,205 +49,212 @@ def select_html_file():
     return file_path
 
 def get_style_shortcut(text):
-    """텍스트 내용에 따라 한글 스타일 단축키 반환"""
-    if text.startswith('[문제]'):
-        return 'ctrl+3'  # a.문제
-    elif text.startswith('[교사용정답]') or text.startswith('[정답해설]'):
-        return 'ctrl+5'  # a.교사용정답  
-    elif text.startswith('[선택지]'):
-        return 'ctrl+4'  # a.문항제시문
-    elif text.startswith('[보기]'):
-        return 'ctrl+6'  # a.보기내어쓰기
-    elif text.startswith('[지문또는문단]') or text.startswith('[지문]') or text.startswith('[문단]'):
-        return 'ctrl+2'  # a.본문
-    elif text.startswith('[희곡지문]'):
-        return 'ctrl+8'  # a.박스안희곡
-    elif text.startswith('[밑줄]'):
-        return 'ctrl+9'  # a.밑줄_노랑
-    elif text.startswith('[학생용]'):
-        return 'ctrl+0'  # a.학생용정답
-    else:
-        return 'ctrl+1'  # 바탕글
+    """텍스트 내용에 따라 한글 스타일 단축키 반환 (tag_tokenizer.HWP_TAGS 표)"""
+    return HWP_TAGS.lookup(split_tag(text)[0])[1]
 
 def clean_text_content(text):
     """태그를 제거하고 순수 내용만 반환"""
-    cleaned_text = re.sub(r'^\[[^\]]+\]\s*', '', text)
-    return cleaned_text.strip()
+    return split_tag(text)[1]
 
 def get_content_type(text):
     """텍스트 유형 판단"""
-    if text.startswith('[지문또는문단]') or text.startswith('[지문]') or text.startswith('[문단]'):
-        return 'content'
-    elif text.startswith('[문제]'):
-        return 'question'
-    elif text.startswith('[보기]'):
-        return 'choice'
-    elif text.startswith('[선택지]'):
-        return 'option'
-    elif text.startswith('[교사용정답]') or text.startswith('[정답해설]'):
-        return 'answer'
-    else:
-        return 'other'
+    return HWP_TAGS.lookup(split_tag(text)[0])[0]
+
+# 공백줄 상태(prev_type, boxgi_started, option_started)는 컴파일러가 관리
+formatter = PlanCompiler(INHERIT_STYLE)
+_executor = None
+
+def get_executor():
+    """pyautogui 실행기 (처음 사용할 때 생성)"""
+    global _executor
+    if _executor is None:
+        _executor = PyAutoGuiExecutor(pacer=Pacer.load() if ADAPTIVE_PACING else None)
+        _executor.pyautogui.FAILSAFE = True  # 마우스를 화면 모서리로 옮기면 중단
+        _executor.pyautogui.PAUSE = 0.1
+    return _executor
 
+def plan_entry(text):
+    """태그 텍스트 → (내용, 유형, 단축키)"""
+    token = make_token(text, HWP_TAGS)
+    return token.text, token.type, token.style
+
+@traced('apply_hwp_formatting')
 def apply_hwp_formatting(text, font_weight, font_size):
     """한글에서 스타일 단축키를 사용하여 서식 적용 - 완전한 간격 제어"""
     try:
-        clean_content = clean_text_content(text)
-        
-        # 현재 항목 유형 판단
-        current_type = get_content_type(text)
-        
-        # 새로운 문제 시작시 플래그 초기화
-        if current_type == 'question':
-            apply_hwp_formatting.boxgi_started = False
-            apply_hwp_formatting.option_started = False
-            print("    새 문제 시작 - 플래그 초기화")
-        
-        # 이전 항목과의 관계에 따른 공백 처리
-        if hasattr(apply_hwp_formatting, 'prev_type') and apply_hwp_formatting.prev_type:
-            prev_type = apply_hwp_formatting.prev_type
-            
-            # 공백줄이 필요한 상황들
-            need_blank_line = False
-            
-            # 1. 지문 → 문제
-            if prev_type == 'content' and current_type == 'question':
-                need_blank_line = True
-                print("    지문→문제 공백줄 추가")
-            
-            # 2. 문제 → 보기 (첫 번째 보기만)
-            elif prev_type == 'question' and current_type == 'choice' and not apply_hwp_formatting.boxgi_started:
-                need_blank_line = True
-                apply_hwp_formatting.boxgi_started = True
-                print("    문제→보기 공백줄 추가")
-            
-            # 3. 보기 → 선택지 (첫 번째 선택지만)
-            elif prev_type == 'choice' and current_type == 'option' and not apply_hwp_formatting.option_started:
-                need_blank_line = True
-                apply_hwp_formatting.option_started = True
-                print("    보기→선택지 공백줄 추가")
-            
-            # 공백줄 삽입 (교사용정답 스타일로 변경)
-            if need_blank_line:
-                pyautogui.hotkey('ctrl', '5')  # 교사용정답 스타일
-                time.sleep(0.1)
-                pyautogui.press('enter')
-                time.sleep(0.1)
-        
-        # 내용 입력
-        pyperclip.copy(clean_content)
-        time.sleep(0.1)
-        
-        pyautogui.hotkey('ctrl', 'v')
-        time.sleep(0.4)
-        
-        # 안정적인 선택: Shift+Home (현재 줄만)
-        pyautogui.hotkey('shift', 'home')
-        time.sleep(0.1)
-        
-        style_shortcut = get_style_shortcut(text)
-        print(f"    스타일 적용: {style_shortcut}")
-        
-        if '+' in style_shortcut:
-            keys = style_shortcut.split('+')
-            pyautogui.hotkey(*keys)
-        else:
-            pyautogui.press(style_shortcut)
-        
-        time.sleep(0.3)
-        
-        pyautogui.press('end')
-        
-        # 개별 항목별 간격 처리 (수정됨)
-        if current_type in ['choice', 'option']:
-            # 보기와 선택지는 1번 엔터 (붙어서 나옴)
-            pyautogui.press('enter', presses=1)
-        else:
-            # 나머지는 2번 엔터 (구분됨)
-            pyautogui.press('enter', presses=2)
-        
-        time.sleep(0.1)
-        
-        # 현재 유형을 다음 처리를 위해 저장
-        apply_hwp_formatting.prev_type = current_type
-        
+        actions = formatter.compile_item(*plan_entry(text))
+        styles = [a.arg for a in actions if a.kind == 'style']
+        if styles:
+            print(f"    스타일 적용: {'+'.join(styles[-1])}")
+        run_actions(actions, get_executor())
         return True
         
     except Exception as e:
+        if is_failsafe(e):
+            raise  # 남은 항목도 모두 실패하므로 입력을 멈춤
         print(f"서식 적용 중 오류: {e}")
         return False
 
-def analyze_html(file_path):
-    """HTML 파일 분석하여 항목들 추출 - 순서 보장"""
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
+def dry_run(items):
+    """키 입력 없이 동작 수 / 예상 소요 시간 계산"""
+    plan = PlanCompiler(INHERIT_STYLE).compile([plan_entry(item['text']) for item in items])
+    executor = RecordingExecutor()
+    for actions in plan:
+        run_actions(actions, executor)
+    
+    # main()의 항목 사이 0.3초 대기 포함
+    report = executor.report(len(plan))
+    report['projected_seconds'] = round(report['projected_seconds'] + 0.3 * len(plan), 2)
+    
+    print(f"\n[드라이런] 동작 {report['actions']}개, pyautogui 호출 {report['round_trips']}회")
+    print(f"  동작별: {report['counts']}")
+    print(f"  예상 소요 시간: {report['projected_seconds']}초")
+    return report
+
+FONT_SIZE_RE = re.compile(r'font-size:\s*(\d+(?:\.\d+)?)pt')
+
+class _DivParser(HTMLParser):
+    """div를 닫는 즉시 항목으로 내보내는 SAX 방식 파서 (문서 순서 유지)"""
     
-    print(f"HTML 파일 크기: {len(content)} 문자")
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.open_divs = []  # 현재 열려 있는 div (중첩 포함)
+        self.pending = deque()  # 연 순서대로 대기 중인 div
+        self.ready = []
+        self.text = []  # 아직 끝나지 않은 텍스트 노드 (읽기 단위 경계에서 나뉘어 들어옴)
     
-    soup = BeautifulSoup(content, 'html.parser')
-    items = []
+    def flush_text(self):
+        """텍스트 노드 하나를 strip해서 열린 div에 붙임 (get_text(strip=True)와 같은 단위)"""
+        piece = ''.join(self.text).strip()
+        self.text = []
+        if piece:
+            for entry in self.open_divs:
+                entry['parts'].append(piece)
     
-    # HTML div 요소들을 순서대로 처리
-    divs = soup.find_all('div')
-    print(f"발견된 div 요소: {len(divs)}개")
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        if tag == 'div':
+            entry = {'parts': [], 'style': dict(attrs).get('style') or '', 'closed': False}
+            self.open_divs.append(entry)
+            self.pending.append(entry)
     
-    for div in divs:
-        text = div.get_text(strip=True)
-        if text:  # 텍스트가 있는 div만 처리
-            style = div.get('style', '')
-            font_weight = 'bold' if 'font-weight: bold' in style else 'normal'
-            font_size = '12pt'
-            
-            # 폰트 크기 추출
-            if 'font-size:' in style:
-                size_match = re.search(r'font-size:\s*(\d+(?:\.\d+)?)pt', style)
-                if size_match:
-                    font_size = f"{size_match.group(1)}pt"
-            
-            items.append({
-                'text': text,
-                'font_weight': font_weight,
-                'font_size': font_size,
-                'style': style,
-                'tag': 'div'
-            })
+    def handle_startendtag(self, tag, attrs):
+        self.flush_text()
+    
+    def handle_endtag(self, tag):
+        self.flush_text()
+        if tag == 'div' and self.open_divs:
+            self.open_divs.pop()['closed'] = True
+            # 바깥 div가 먼저 열렸으면 닫힐 때까지 기다려서 find_all 순서와 맞춤
+            while self.pending and self.pending[0]['closed']:
+                self.ready.append(self.pending.popleft())
+    
+    def handle_data(self, data):
+        self.text.append(data)
     
+    def handle_comment(self, data):
+        self.flush_text()
+    
+    def finish(self):
+        self.close()
+        self.flush_text()
+        for entry in self.open_divs:
+            entry['closed'] = True
+        self.open_divs = []
+        self.ready.extend(self.pending)
+        self.pending.clear()
+
+def make_item(text, style):
+    font_weight = 'bold' if 'font-weight: bold' in style else 'normal'
+    font_size = '12pt'
+    
+    # 폰트 크기 추출
+    if 'font-size:' in style:
+        size_match = FONT_SIZE_RE.search(style)
+        if size_match:
+            font_size = f"{size_match.group(1)}pt"
+    
+    return {
+        'text': text,
+        'font_weight': font_weight,
+        'font_size': font_size,
+        'style': style,
+        'tag': 'div'
+    }
+
+def iter_html_items(file_path, chunk_size=64 * 1024):
+    """HTML 파일을 조금씩 읽으며 항목을 하나씩 내보냄 (전체를 메모리에 올리지 않음)"""
+    parser = _DivParser()
+    
+    def drain():
+        for entry in parser.ready:
+            text = ''.join(entry['parts'])
+            if text:  # 텍스트가 있는 div만 처리
+                yield make_item(text, entry['style'])
+        parser.ready = []
+    
+    with open(file_path, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from drain()
+    
+    parser.finish()
+    yield from drain()
+
+@traced('analyze_html')
+def analyze_html(file_path):
+    """HTML 파일 분석하여 항목들 추출 - 순서 보장"""
+    print(f"HTML 파일 크기: {os.path.getsize(file_path)} 바이트")
+    items = list(iter_html_items(file_path))
     print(f"최종 추출된 항목: {len(items)}개")
     return items
 
 def preview_items(items):
-    """분석된 항목들 미리보기"""
-    print(f"\n분석 결과: {len(items)}개 항목")
+    """분석된 항목들 미리보기 - 처음 10개는 읽히는 대로 바로 출력
+
+    반환: 전체 항목 수
+    """
+    print("\n분석 결과 미리보기")
     print("=" * 70)
     
-    for i, item in enumerate(items, 1):
+    count = 0
+    for count, item in enumerate(items, 1):
+        if count > 10:
+            continue  # 나머지는 개수만 셈
+        
         style_shortcut = get_style_shortcut(item['text'])
-        style_name = {
-            'ctrl+1': '바탕글',
-            'ctrl+2': 'a.본문', 
-            'ctrl+3': 'a.문제',
-            'ctrl+4': 'a.문항제시문',
-            'ctrl+5': 'a.교사용정답',
-            'ctrl+6': 'a.보기내어쓰기',
-            'ctrl+7': 'a.보기들여쓰기',
-            'ctrl+8': 'a.박스안희곡',
-            'ctrl+9': 'a.밑줄_노랑',
-            'ctrl+0': 'a.학생용정답'
-        }.get(style_shortcut, '알 수 없음')
+        style_name = STYLE_NAMES.get(style_shortcut, '알 수 없음')
         
         clean_content = clean_text_content(item['text'])
         preview_text = clean_content[:40] + "..." if len(clean_content) > 40 else clean_content
         
         content_type = get_content_type(item['text'])
-        print(f"{i:2d}. [{style_name}] ({content_type}) {preview_text}")
-        
-        if i >= 10:
-            if len(items) > 10:
-                print(f"    ... 외 {len(items) - 10}개 항목")
-            break
+        print(f"{count:2d}. [{style_name}] ({content_type}) {preview_text}")
+    
+    if count > 10:
+        print(f"    ... 외 {count - 10}개 항목")
     
     print("=" * 70)
+    print(f"전체 {count}개 항목")
+    return count
+
+@traced('export_hwpx')
+def export_hwpx(items, output_path, template_path=None):
+    """키 입력 없이 HWPX 파일로 바로 저장"""
+    entries = []
+    for item in items:
+        token = make_token(item['text'], HWP_TAGS)
+        entries.append((token.text, token.type, STYLE_NAMES[token.style]))
+    missing = write_hwpx(build_paragraphs(entries), output_path, template_path)
+    if missing:
+        print(f"템플릿에 없는 스타일 (바탕글로 대체): {', '.join(sorted(missing))}")
+    print(f"HWPX 저장 완료: {output_path}")
+    return output_path
 
+@traced('countdown')
 def countdown(seconds):
     """카운트다운 표시"""
     for i in range(seconds, 0, -1):
@@ -233,9 +268,7 @@ def main():
     print("=" * 60)
     
     # 상태 플래그 초기화
-    apply_hwp_formatting.prev_type = None
-    apply_hwp_formatting.boxgi_started = False
-    apply_hwp_formatting.option_started = False
+    formatter.reset()
     
     html_file = select_html_file()
     
@@ -243,36 +276,78 @@ def main():
         print("파일이 선택되지 않았습니다.")
         return
     
-    items = analyze_html(html_file)
+    # 미리보기는 읽히는 대로 출력하고, 실제 처리 때 파일을 다시 스트리밍
+    total = preview_items(iter_html_items(html_file))
     
-    if not items:
+    if not total:
         print("분석할 항목이 없습니다.")
         return
     
-    preview_items(items)
+    response = input(f"\n{total}개 항목을 자동 처리하시겠습니까? (y/n, h=HWPX 파일로 저장, d=드라이런): ").lower().strip()
+    
+    if response == 'd':
+        dry_run(iter_html_items(html_file))
+        return
     
-    response = input(f"\n{len(items)}개 항목을 자동 처리하시겠습니까? (y/n): ").lower().strip()
+    if response == 'h':
+        template = input("HWPX 템플릿 경로 (없으면 Enter): ").strip() or None
+        export_hwpx(iter_html_items(html_file), html_file.rsplit('.', 1)[0] + '.hwpx', template)
+        return
     
     if response != 'y':
         print("자동화를 취소했습니다.")
         return
     
-    try:
-        windows = pyautogui.getWindowsWithTitle('한글')
-        if windows:
-            windows[0].activate()
-            time.sleep(1)
-    except:
-        print("한글 창을 활성화할 수 없습니다.")
+    type_items(html_file, total)
+
+def type_items(html_file, total, resume=None):
+    """HTML 파일의 항목을 한글 창에 입력 (resume: 남은 기록이면 그 다음 항목부터)"""
+    formatter.reset()
     
-    countdown(5)
+    entries = [plan_entry(item['text']) for item in iter_html_items(html_file)]
+    journal = TypingJournal(JOURNAL_FILE) if JOURNAL_FILE else None
+    done = 0
+    if resume:
+        if resume['fingerprint'] != fingerprint(entries):
+            print(f"기록 이후 파일 내용이 바뀌었습니다: {html_file}")
+            return 0
+        done = resume['done']
+        if done:
+            formatter.restore(resume['state'])
+        if journal:
+            journal.resume(resume)
+    elif journal:
+        journal.begin(entries, os.path.abspath(html_file))
     
+    with span('한글창_준비'):
+        if ADAPTIVE_PACING:
+            # 한글 창이 활성화되면 바로 시작 (최대 5초)
+            print("한글 창을 활성화하세요...")
+            wait_for_window('한글', timeout=5)
+            print("시작!")
+        else:
+            import pyautogui
+            try:
+                windows = pyautogui.getWindowsWithTitle('한글')
+                if windows:
+                    windows[0].activate()
+                    time.sleep(1)
+            except:
+                print("한글 창을 활성화할 수 없습니다.")
+        
+            countdown(5)
+    
+    pacer = get_executor().pacer
     success_count = 0
+    stopped = False
     
-    for i, item in enumerate(items, 1):
+    for i, item in enumerate(iter_html_items(html_file), 1):
+        if i <= done:
+            continue
+        success = False
         try:
             content_type = get_content_type(item['text'])
-            print(f"처리 중 ({i}/{len(items)}) [{content_type}]: {item['text'][:20]}...")
+            print(f"처리 중 ({i}/{total}) [{content_type}]: {item['text'][:20]}...")
             
             success = apply_hwp_formatting(
                 item['text'], 
@@ -286,30 +361,144 @@ def main():
             else:
                 print(f"  ❌ 실패")
             
-            time.sleep(0.3)
+            if pacer:
+                pacer.wait('item')
+            else:
+                time.sleep(0.3)
             
         except KeyboardInterrupt:
             print("\n사용자가 중단했습니다.")
+            stopped = True
             break
         except Exception as e:
+            if is_failsafe(e):
+                print("\nFAILSAFE로 중단했습니다.")
+                stopped = True
+                break
             print(f"  오류: {e}")
+        if journal:
+            journal.confirm(i, formatter.state(), not success)
     
-    print(f"\n🎉 자동화 완료! ({success_count}/{len(items)}개 성공)")
+    print(f"\n🎉 자동화 완료! ({success_count}/{total - done}개 성공)")
+    if journal and stopped:
+        print(f"→ {describe(journal.data)} - 마지막 항목이 일부만 입력됐으면 지운 뒤 --resume으로 이어서 입력")
+    elif journal:
+        journal.finish()
+    if pacer:
+        pacer.print_summary()
+    return success_count
 
-# 상태 관리용 플래그들
-apply_hwp_formatting.prev_type = None
-apply_hwp_formatting.boxgi_started = False
-apply_hwp_formatting.option_started = False
+def resume_typing(yes=False):
+    """남은 체크포인트의 파일을 이어서 입력"""
+    resume = TypingJournal.load(JOURNAL_FILE) if JOURNAL_FILE else None
+    if resume is None:
+        print(f"이어서 입력할 기록이 없습니다: {JOURNAL_FILE}")
+        return
+    html_file = resume.get('source')
+    if not html_file or not os.path.exists(html_file):
+        print(f"기록의 HTML 파일을 찾을 수 없습니다: {html_file} (생성 결과 입력은 문제생성_자동화_통합.py --resume)")
+        return
+    print(f"[이어서 입력] {html_file} - {describe(resume)}")
+    if not yes:
+        input("한글 문서에서 일부만 입력된 항목을 지우고, 입력이 멈춘 빈 줄에 커서를 둔 채 Enter를 누르세요...")
+    type_items(html_file, resume['total'], resume)
 
-if __name__ == "__main__":
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.1
+def expand_inputs(patterns):
+    """파일 / glob 패턴 목록 → HTML 파일 목록 (순서 유지, 중복 제거)"""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"일치하는 파일이 없습니다: {pattern}")
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+def hwpx_path(html_file, output_dir=None):
+    base = os.path.splitext(os.path.basename(html_file))[0] + '.hwpx'
+    return os.path.join(output_dir or os.path.dirname(html_file), base)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="HTML -> 한글 자동화 (인자 없이 실행하면 파일 선택 대화상자)")
+    parser.add_argument('files', nargs='*', help="HTML 파일 또는 glob 패턴 (\"결과/*.html\")")
+    parser.add_argument('-o', '--output-dir', help="HWPX 저장 폴더 (기본: HTML과 같은 폴더)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="동시에 변환할 파일 수 (--hwpx)")
+    parser.add_argument('--hwpx', action='store_true', help="키 입력 없이 HWPX 파일로 저장")
+    parser.add_argument('--template', help="HWPX 스타일 템플릿 (.hwpx)")
+    parser.add_argument('--dry-run', action='store_true', help="한글에 입력하지 않고 키 입력 수 / 예상 시간만")
+    parser.add_argument('--no-adaptive', action='store_true', help="적응형 대기 대신 고정 대기")
+    parser.add_argument('--inherit-style', action='store_true',
+                        help="앞 문단과 같은 스타일은 다시 누르지 않음 (Enter 뒤 문단이 같은 스타일을 이어받는 템플릿만)")
+    parser.add_argument('-y', '--yes', action='store_true', help="확인 없이 바로 입력")
+    parser.add_argument('--resume', action='store_true', help="중단된 입력을 체크포인트 다음 항목부터 이어서")
+    parser.add_argument('--journal', help=f"입력 체크포인트 파일 (기본 {JOURNAL_FILE})")
+    parser.add_argument('--trace', help="단계별 시간 기록 파일 (.jsonl 또는 Chrome trace .json)")
+    parser.add_argument('--profile', metavar='STAGE',
+                        help="이 단계만 cProfile로 측정 (analyze_html, 한글창_준비, apply_hwp_formatting, export_hwpx)")
+    parser.add_argument('--profile-out', help="프로파일 결과 파일 (기본 profile_<STAGE>.prof)")
+    return parser
+
+def cli(argv=None):
+    """명령행 실행 - 파일이 없으면 대화형 main()"""
+    global ADAPTIVE_PACING, JOURNAL_FILE, INHERIT_STYLE
+    args = build_parser().parse_args(argv)
+    if args.no_adaptive:
+        ADAPTIVE_PACING = False
+    if args.inherit_style:
+        INHERIT_STYLE = formatter.inherit_style = True
+    if args.journal:
+        JOURNAL_FILE = args.journal
+    if args.trace or args.profile:
+        configure_tracing(args.trace, args.profile, args.profile_out)
     
-    try:
+    if args.resume:
+        resume_typing(args.yes)
+        return
+    
+    if not args.files:
         main()
+        if not args.yes:
+            input("\nEnter를 눌러 종료하세요...")
+        return
+    
+    files = expand_inputs(args.files)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    
+    if args.dry_run:
+        for html_file in files:
+            print(f"\n[{html_file}]")
+            dry_run(iter_html_items(html_file))
+        return
+    
+    if args.hwpx:
+        # 키 입력이 없으므로 파일끼리 동시에 변환
+        def convert(html_file):
+            return export_hwpx(iter_html_items(html_file), hwpx_path(html_file, args.output_dir), args.template)
+        
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            list(pool.map(convert, files))
+        return
+    
+    # 한글 입력은 창이 하나이므로 파일 순서대로
+    for html_file in files:
+        print(f"\n[{html_file}]")
+        total = preview_items(iter_html_items(html_file))
+        if not total:
+            print("분석할 항목이 없습니다.")
+            continue
+        if not args.yes:
+            response = input(f"\n{total}개 항목을 자동 처리하시겠습니까? (y/n): ").lower().strip()
+            if response != 'y':
+                print("건너뜁니다.")
+                continue
+        type_items(html_file, total)
+
+if __name__ == "__main__":
+    try:
+        cli()
     except KeyboardInterrupt:
         print("\n프로그램이 중단되었습니다.")
     except Exception as e:
-        print(f"\n오류: {e}")
-    
-    input("\nEnter를 눌러 종료하세요...")
\ No newline at end of file
+        print(f"\n오류: {e}")
\ No newline at end of file
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+한글 키 입력 계획(plan) 컴파일러 + 실행기
+
+항목 목록을 먼저 동작 목록(붙여넣기, 줄 선택, 스타일 단축키, End, Enter)으로 바꾼 뒤 실행기로 실행한다.
+inherit_style=True면 이미 적용된 스타일은 다시 누르지 않는다 (Enter로 만든 문단이 앞 문단 스타일을
+이어받는 템플릿에서만 켤 것 - 오늘 스타일의 '다음 스타일' 설정에 따라 다름).
+RecordingExecutor는 pyautogui 없이 동작 수와 예상 소요 시간만 계산한다 (리눅스용).
+"""
+
+import time
+from collections import Counter
+from typing import NamedTuple
+
+# 동작 뒤 대기 시간 (기존 apply_hwp_formatting의 sleep 값)
+DEFAULT_DELAYS = {
+    'copy': 0.1,    # 클립보드 복사 후
+    'paste': 0.4,   # Ctrl+V 후
+    'select': 0.1,  # Shift+Home
+    'style': 0.3,   # 스타일 단축키
+    'end': 0.0,
+    'enter': 0.1,
+}
+
+# 동작 하나가 pyautogui/클립보드를 몇 번 호출하는지 (pyautogui.PAUSE가 호출마다 붙음)
+ROUND_TRIPS = {'paste': 2, 'select': 1, 'style': 1, 'end': 1, 'enter': 1}
+
+BLANK_STYLE_KEYS = ('ctrl', '5')  # 공백줄은 교사용정답 스타일
+
+
+class Action(NamedTuple):
+    kind: str  # 'paste' | 'select' | 'style' | 'end' | 'enter'
+    arg: object = None  # 붙여넣을 텍스트 / 단축키 튜플 / Enter 횟수
+
+
+def style_keys(shortcut):
+    """'ctrl+3' → ('ctrl', '3')"""
+    return tuple(shortcut.split('+'))
+
+
+class BlankLineRules:
+    """공백줄 / 항목 뒤 Enter 규칙 (한글 자동화와 HWPX 저장이 함께 씀)
+
+    - 지문 → 문제, 문제 → 첫 보기, 보기 → 첫 선택지 사이에 공백줄 (교사용정답 스타일)
+    - 보기/선택지 뒤는 Enter 1번, 나머지는 Enter 2번 (= 같은 스타일의 빈 문단)
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.prev_type = None
+        self.choice_started = False
+        self.option_started = False
+
+    def blank_before(self, content_type):
+        """이 항목 앞에 공백줄이 필요한지 (상태 갱신)"""
+        if content_type == 'question':
+            self.choice_started = False
+            self.option_started = False
+
+        need_blank = False
+        if self.prev_type == 'content' and content_type == 'question':
+            need_blank = True
+        elif self.prev_type == 'question' and content_type == 'choice' and not self.choice_started:
+            need_blank = True
+            self.choice_started = True
+        elif self.prev_type == 'choice' and content_type == 'option' and not self.option_started:
+            need_blank = True
+            self.option_started = True
+
+        self.prev_type = content_type
+        return need_blank
+
+    @staticmethod
+    def enters_after(content_type):
+        return 1 if content_type in ('choice', 'option') else 2
+
+
+class PlanCompiler(BlankLineRules):
+    """항목 → 동작 목록 (공백줄 규칙과 현재 문단 스타일을 추적)
+
+    inherit_style: 같은 스타일 재적용 생략 (기본은 기존처럼 항목마다 스타일 적용)
+    """
+
+    def __init__(self, inherit_style=False):
+        self.inherit_style = inherit_style
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.current_style = None  # 커서가 있는 문단의 스타일 (모르면 None)
+
+    def state(self):
+        """체크포인트용 상태 (JSON으로 저장 가능)"""
+        return {
+            'prev_type': self.prev_type,
+            'choice_started': self.choice_started,
+            'option_started': self.option_started,
+            'current_style': list(self.current_style) if self.current_style else None,
+        }
+
+    def restore(self, state):
+        """state()로 저장한 상태로 되돌림 (중단된 곳부터 이어서 입력)"""
+        self.prev_type = state['prev_type']
+        self.choice_started = state['choice_started']
+        self.option_started = state['option_started']
+        self.current_style = tuple(state['current_style']) if state['current_style'] else None
+
+    def _needs_style(self, keys):
+        return not self.inherit_style or self.current_style != keys
+
+    def _set_style(self, actions, keys):
+        if self._needs_style(keys):
+            actions.append(Action('style', keys))
+            self.current_style = keys
+
+    def compile_item(self, text, content_type, shortcut):
+        """항목 하나의 동작 목록 (상태 갱신)"""
+        actions = []
+        keys = style_keys(shortcut)
+
+        if self.blank_before(content_type):
+            self._set_style(actions, BLANK_STYLE_KEYS)
+            actions.append(Action('enter', 1))
+
+        actions.append(Action('paste', text))
+        # inherit_style이면 Enter로 만든 문단이 앞 문단 스타일을 이어받으므로 같으면 다시 적용하지 않음
+        if self._needs_style(keys):
+            actions.append(Action('select'))
+            self._set_style(actions, keys)
+            actions.append(Action('end'))
+
+        actions.append(Action('enter', self.enters_after(content_type)))
+        return actions
+
+    def compile(self, entries, states=None):
+        """(text, content_type, shortcut) 목록 → 항목별 동작 목록
+
+        states에 목록을 주면 항목마다 컴파일 후 상태(state())를 덧붙임
+        """
+        plan = []
+        for text, content_type, shortcut in entries:
+            plan.append(self.compile_item(text, content_type, shortcut))
+            if states is not None:
+                states.append(self.state())
+        return plan
+
+
+class PyAutoGuiExecutor:
+    """실제 한글 창에 키 입력
+
+    pacer(hwp_pacing.Pacer)를 주면 고정 sleep 대신 적응형 대기를 쓰고,
+    줄 선택 직후 Ctrl+C로 붙여넣기 결과를 확인해 성공/실패를 알려준다.
+    """
+
+    def __init__(self, delays=None, pacer=None):
+        import pyautogui
+        import pyperclip
+        self.pyautogui = pyautogui
+        self.pyperclip = pyperclip
+        self.delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.pacer = pacer
+        self._last_paste = None
+
+    def _wait(self, step):
+        if self.pacer:
+            self.pacer.wait(step)
+        else:
+            time.sleep(self.delays[step])
+
+    def _verify_paste(self):
+        """선택된 줄을 복사해서 붙여넣은 내용과 비교"""
+        self.pyautogui.hotkey('ctrl', 'c')
+        self._wait('copy')
+        selected = self.pyperclip.paste().strip()
+        # Shift+Home은 화면상 마지막 줄만 선택하므로 끝부분 일치로 판단
+        ok = bool(selected) and self._last_paste.endswith(selected)
+        self.pacer.result(ok)
+        self._last_paste = None
+
+    def run(self, action):
+        gui = self.pyautogui
+        start = time.perf_counter()
+        if self.pacer:
+            gui.PAUSE = self.pacer.delay('pause')
+        if action.kind == 'paste':
+            self.pyperclip.copy(action.arg)
+            self._wait('copy')
+            gui.hotkey('ctrl', 'v')
+            self._last_paste = action.arg.strip()
+        elif action.kind == 'select':
+            gui.hotkey('shift', 'home')
+        elif action.kind == 'style':
+            gui.hotkey(*action.arg)
+        elif action.kind == 'end':
+            gui.press('end')
+        elif action.kind == 'enter':
+            gui.press('enter', presses=action.arg)
+        self._wait(action.kind)
+
+        if action.kind == 'select' and self.pacer and self.pacer.verify and self._last_paste:
+            self._verify_paste()
+        if self.pacer:
+            self.pacer.record(action.kind, time.perf_counter() - start)
+
+
+class RecordingExecutor:
+    """키 입력 없이 동작을 기록하고 예상 소요 시간을 계산 (드라이런)"""
+
+    def __init__(self, delays=None, pause=0.1):
+        self.delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.pause = pause  # pyautogui.PAUSE
+        self.actions = []
+        self.counts = Counter()
+        self.round_trips = 0
+        self.projected_seconds = 0.0
+
+    def run(self, action):
+        self.actions.append(action)
+        self.counts[action.kind] += 1
+        trips = ROUND_TRIPS[action.kind]
+        self.round_trips += trips
+        self.projected_seconds += self.delays[action.kind] + trips * self.pause
+        if action.kind == 'paste':
+            self.projected_seconds += self.delays['copy']
+
+    def report(self, items=None):
+        result = {
+            'actions': len(self.actions),
+            'counts': dict(self.counts),
+            'round_trips': self.round_trips,
+            'projected_seconds': round(self.projected_seconds, 2),
+        }
+        if items:
+            result['items'] = items
+            result['seconds_per_item'] = round(self.projected_seconds / items, 3)
+        return result
+
+
+def run_actions(actions, executor):
+    for action in actions:
+        executor.run(action)
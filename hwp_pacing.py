@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+한글 자동 입력 속도 조절 (적응형 대기)
+
+- 붙여넣기가 계속 성공하면 대기 시간을 줄이고, 실패하면 늘린다.
+- 컴퓨터마다 보정(calibration) 결과를 hwp_pacing.json에 저장해 두고 다음 실행 때 쓴다.
+- 단계별 실제 소요 시간을 기록해서 어떤 대기가 가장 큰지 보여준다.
+
+보정 실행: 빈 한글 문서를 열어 두고  python hwp_pacing.py
+"""
+
+import json
+import os
+import platform
+import time
+from collections import defaultdict
+
+from hwp_keystroke_plan import DEFAULT_DELAYS
+
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hwp_pacing.json')
+
+# item: 항목 사이 대기 (html_hwp_automation.main의 0.3초), pause: pyautogui.PAUSE
+BASE_DELAYS = dict(DEFAULT_DELAYS, item=0.3, pause=0.1)
+
+
+class Pacer:
+    """단계별 대기 시간 = 기본값 × 배율 (성공하면 줄이고 실패하면 늘림)"""
+
+    def __init__(self, delays=None, scale=1.0, min_scale=0.2, max_scale=3.0,
+                 shrink=0.9, grow=1.5, verify=True):
+        self.delays = dict(BASE_DELAYS, **(delays or {}))
+        self.scale = scale
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.shrink = shrink
+        self.grow = grow
+        self.verify = verify  # 붙여넣기 결과를 Ctrl+C로 확인할지
+        self.successes = 0
+        self.failures = 0
+        self.timings = defaultdict(lambda: [0, 0.0])  # 단계 → [횟수, 총 초]
+
+    @classmethod
+    def load(cls, path=CALIBRATION_FILE, **kwargs):
+        """이 컴퓨터의 보정 결과가 있으면 불러옴"""
+        delays = None
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                delays = json.load(f).get(platform.node())
+        return cls(delays=delays, **kwargs)
+
+    def delay(self, step):
+        return self.delays.get(step, 0.0) * self.scale
+
+    def wait(self, step):
+        seconds = self.delay(step)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def result(self, ok):
+        """붙여넣기 확인 결과 반영"""
+        if ok:
+            self.successes += 1
+            self.scale = max(self.min_scale, self.scale * self.shrink)
+        else:
+            self.failures += 1
+            self.scale = min(self.max_scale, self.scale * self.grow)
+
+    def record(self, step, seconds):
+        entry = self.timings[step]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def summary(self):
+        """단계별 소요 시간 (총 시간이 큰 순서)"""
+        steps = sorted(self.timings.items(), key=lambda kv: kv[1][1], reverse=True)
+        return {
+            'scale': round(self.scale, 3),
+            'successes': self.successes,
+            'failures': self.failures,
+            'steps': {
+                step: {'count': count, 'total': round(total, 3), 'avg': round(total / count, 4)}
+                for step, (count, total) in steps
+            },
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"[속도 조절] 배율 {s['scale']} · 확인 성공 {s['successes']} · 실패 {s['failures']}")
+        for step, t in s['steps'].items():
+            print(f"   {step:<7} {t['count']:>4}회  총 {t['total']:>7.2f}초  평균 {t['avg']:.3f}초")
+
+
+def wait_for_window(title='한글', timeout=5.0, poll=0.1):
+    """한글 창이 활성화될 때까지 대기 (확인할 수 없으면 timeout 동안 카운트다운)
+
+    반환: 창을 확인했으면 True
+    """
+    import pyautogui
+
+    try:
+        windows = pyautogui.getWindowsWithTitle(title)
+        if windows:
+            windows[0].activate()
+    except Exception:
+        pass
+
+    deadline = time.perf_counter() + timeout
+    shown = None
+    while time.perf_counter() < deadline:
+        try:
+            active = pyautogui.getActiveWindow()
+            if active is not None and title in (active.title or ''):
+                time.sleep(poll)  # 활성화 직후 입력이 씹히지 않도록 잠깐 대기
+                return True
+        except Exception:
+            pass  # 창 정보를 못 읽는 환경: 남은 시간만큼 기다림
+        seconds_left = int(deadline - time.perf_counter()) + 1
+        if seconds_left != shown:
+            shown = seconds_left
+            print(f"   {seconds_left}초...")
+        time.sleep(poll)
+    return False
+
+
+def calibrate(trials=3, probe='자동 입력 속도 보정 문장 ①', path=CALIBRATION_FILE):
+    """빈 한글 문서에 시험 문장을 붙여넣으며 안정적으로 되는 가장 짧은 대기를 찾음"""
+    import pyautogui
+    import pyperclip
+
+    pyautogui.PAUSE = 0.05
+    candidates = [0.4, 0.3, 0.2, 0.15, 0.1, 0.05]
+    best = candidates[0]
+
+    for paste_delay in candidates:
+        ok = True
+        for _ in range(trials):
+            pyperclip.copy(probe)
+            time.sleep(0.05)
+            pyautogui.hotkey('ctrl', 'v')
+            time.sleep(paste_delay)
+            pyautogui.hotkey('shift', 'home')
+            pyautogui.hotkey('ctrl', 'c')
+            time.sleep(0.05)
+            copied = pyperclip.paste().strip()
+            pyautogui.press('delete')  # 시험 문장 지우기
+            if copied != probe:
+                ok = False
+                break
+        if not ok:
+            break
+        best = paste_delay
+        print(f"   붙여넣기 대기 {paste_delay}초: 성공")
+
+    # 여유를 두고 저장 (다른 단계는 붙여넣기 대비 비율로)
+    ratio = min(1.0, best * 1.5 / BASE_DELAYS['paste'])
+    delays = {step: round(value * ratio, 3) for step, value in BASE_DELAYS.items()}
+
+    data = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    data[platform.node()] = delays
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    print(f"보정 완료: {delays}")
+    print(f"저장: {path}")
+    return delays
+
+
+if __name__ == '__main__':
+    print("빈 한글 문서를 열어 두세요. 보정을 시작합니다.")
+    wait_for_window('한글', timeout=5)
+    calibrate()
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+HWPX(OWPML) 파일 직접 생성 - pyautogui 키 입력 없이 문서 작성
+
+HWPX는 zip 안에 XML(header.xml = 스타일, section0.xml = 본문)이 들어있는 형식이다.
+템플릿(.hwpx)을 주면 그 안의 스타일 정의를 그대로 쓰고, 이름으로 스타일을 찾는다.
+"""
+
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+from hwp_keystroke_plan import BlankLineRules
+
+# 단축키 → 템플릿(오늘 스타일)의 스타일 이름
+STYLE_NAMES = {
+    'ctrl+1': '바탕글',
+    'ctrl+2': 'a.본문',
+    'ctrl+3': 'a.문제',
+    'ctrl+4': 'a.문항제시문',
+    'ctrl+5': 'a.교사용정답',
+    'ctrl+6': 'a.보기내어쓰기',
+    'ctrl+7': 'a.보기들여쓰기',
+    'ctrl+8': 'a.박스안희곡',
+    'ctrl+9': 'a.밑줄_노랑',
+    'ctrl+0': 'a.학생용정답',
+}
+
+# 공백줄에 쓰는 스타일 (자동화에서 Ctrl+5 후 Enter)
+BLANK_STYLE = STYLE_NAMES['ctrl+5']
+
+NS = {
+    'ha': 'http://www.hancom.co.kr/hwpml/2011/app',
+    'hp': 'http://www.hancom.co.kr/hwpml/2011/paragraph',
+    'hs': 'http://www.hancom.co.kr/hwpml/2011/section',
+    'hc': 'http://www.hancom.co.kr/hwpml/2011/core',
+    'hh': 'http://www.hancom.co.kr/hwpml/2011/head',
+    'hv': 'http://www.hancom.co.kr/hwpml/2011/version',
+}
+
+XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>'
+
+
+def build_paragraphs(entries):
+    """(text, content_type, style_name) 목록 → 문단 목록 [(style_name, text)]
+
+    한글 자동화와 같은 공백줄 규칙(hwp_keystroke_plan.BlankLineRules)을 따른다.
+    공백줄은 교사용정답 스타일의 빈 문단, 항목 뒤 Enter 2번은 같은 스타일의 빈 문단 하나.
+    """
+    paragraphs = []
+    rules = BlankLineRules()
+
+    for text, current_type, style_name in entries:
+        if rules.blank_before(current_type):
+            # 직전 Enter로 생긴 빈 문단에 교사용정답 스타일을 입히고 Enter
+            paragraphs.append((BLANK_STYLE, ''))
+
+        paragraphs.append((style_name, text))
+        for _ in range(rules.enters_after(current_type) - 1):
+            paragraphs.append((style_name, ''))
+
+    return paragraphs
+
+
+# ========== 기본 스타일 정의 (템플릿이 없을 때) ==========
+_DEFAULT_STYLES = [
+    # (이름, 글자 크기(1/100pt), 굵게, 글자색, 왼쪽 여백(HWPUNIT), 첫 줄 들여쓰기)
+    ('바탕글', 1000, False, '#000000', 0, 0),
+    ('a.본문', 1000, False, '#000000', 0, 1000),
+    ('a.문제', 1000, True, '#000000', 0, 0),
+    ('a.문항제시문', 1000, False, '#000000', 1500, -1500),
+    ('a.교사용정답', 900, False, '#0000FF', 0, 0),
+    ('a.보기내어쓰기', 950, False, '#000000', 2000, -1000),
+    ('a.보기들여쓰기', 950, False, '#000000', 2000, 1000),
+    ('a.박스안희곡', 950, False, '#000000', 1000, 0),
+    ('a.밑줄_노랑', 1000, False, '#000000', 0, 0),
+    ('a.학생용정답', 900, False, '#FF0000', 0, 0),
+]
+
+_LANGS = ('HANGUL', 'LATIN', 'HANJA', 'JAPANESE', 'OTHER', 'SYMBOL', 'USER')
+
+
+def _default_header():
+    fontfaces = ''.join(
+        f'<hh:fontface lang="{lang}" fontCnt="1">'
+        f'<hh:font id="0" face="함초롬바탕" type="TTF" isEmbedded="0"/></hh:fontface>'
+        for lang in _LANGS
+    )
+    border = ''.join(
+        f'<hh:{side} type="NONE" width="0.1 mm" color="#000000"/>'
+        for side in ('leftBorder', 'rightBorder', 'topBorder', 'bottomBorder')
+    )
+    char_prs = []
+    para_prs = []
+    styles = []
+    for i, (name, height, bold, color, left, indent) in enumerate(_DEFAULT_STYLES):
+        char_prs.append(
+            f'<hh:charPr id="{i}" height="{height}" textColor="{color}" shadeColor="none" '
+            f'useFontSpace="0" useKerning="0" symMark="NONE" borderFillIDRef="1">'
+            f'<hh:fontRef hangul="0" latin="0" hanja="0" japanese="0" other="0" symbol="0" user="0"/>'
+            f'<hh:ratio hangul="100" latin="100" hanja="100" japanese="100" other="100" symbol="100" user="100"/>'
+            f'<hh:spacing hangul="0" latin="0" hanja="0" japanese="0" other="0" symbol="0" user="0"/>'
+            f'<hh:relSz hangul="100" latin="100" hanja="100" japanese="100" other="100" symbol="100" user="100"/>'
+            f'<hh:offset hangul="0" latin="0" hanja="0" japanese="0" other="0" symbol="0" user="0"/>'
+            f'{"<hh:bold/>" if bold else ""}'
+            f'</hh:charPr>'
+        )
+        para_prs.append(
+            f'<hh:paraPr id="{i}" tabPrIDRef="0" condense="0" fontLineHeight="0" snapToGrid="1" '
+            f'suppressLineNumbers="0" checked="0">'
+            f'<hh:align horizontal="JUSTIFY" vertical="BASELINE"/>'
+            f'<hh:heading type="NONE" idRef="0" level="0"/>'
+            f'<hh:breakSetting breakLatinWord="KEEP_WORD" breakNonLatinWord="KEEP_WORD" widowOrphan="0" '
+            f'keepWithNext="0" keepLines="0" pageBreakBefore="0" lineWrap="BREAK"/>'
+            f'<hh:autoSpacing eAsianEng="0" eAsianNum="0"/>'
+            f'<hh:margin><hc:intent value="{indent}" unit="HWPUNIT"/><hc:left value="{left}" unit="HWPUNIT"/>'
+            f'<hc:right value="0" unit="HWPUNIT"/><hc:prev value="0" unit="HWPUNIT"/>'
+            f'<hc:next value="0" unit="HWPUNIT"/></hh:margin>'
+            f'<hh:lineSpacing type="PERCENT" value="160" unit="HWPUNIT"/>'
+            f'<hh:border borderFillIDRef="1" offsetLeft="0" offsetRight="0" offsetTop="0" offsetBottom="0" '
+            f'connect="0" ignoreMargin="0"/>'
+            f'</hh:paraPr>'
+        )
+        styles.append(
+            f'<hh:style id="{i}" type="PARA" name={quoteattr(name)} engName="" paraPrIDRef="{i}" '
+            f'charPrIDRef="{i}" nextStyleIDRef="{i}" langID="1042" lockForm="0"/>'
+        )
+
+    n = len(_DEFAULT_STYLES)
+    return (
+        f'{XML_DECL}<hh:head xmlns:hh="{NS["hh"]}" xmlns:hc="{NS["hc"]}" version="1.4" secCnt="1">'
+        f'<hh:beginNum page="1" footnote="1" endnote="1" pic="1" tbl="1" equation="1"/>'
+        f'<hh:refList>'
+        f'<hh:fontfaces itemCnt="{len(_LANGS)}">{fontfaces}</hh:fontfaces>'
+        f'<hh:borderFills itemCnt="1"><hh:borderFill id="1" threeD="0" shadow="0" centerLine="NONE" '
+        f'breakCellSeparateLine="0"><hh:slash type="NONE" Crooked="0" isCounter="0"/>'
+        f'<hh:backSlash type="NONE" Crooked="0" isCounter="0"/>{border}'
+        f'<hh:diagonal type="SOLID" width="0.1 mm" color="#000000"/></hh:borderFill></hh:borderFills>'
+        f'<hh:charProperties itemCnt="{n}">{"".join(char_prs)}</hh:charProperties>'
+        f'<hh:tabProperties itemCnt="1"><hh:tabPr id="0" autoTabLeft="0" autoTabRight="0"/></hh:tabProperties>'
+        f'<hh:paraProperties itemCnt="{n}">{"".join(para_prs)}</hh:paraProperties>'
+        f'<hh:styles itemCnt="{n}">{"".join(styles)}</hh:styles>'
+        f'</hh:refList></hh:head>'
+    )
+
+
+_DEFAULT_SECPR = (
+    '<hp:secPr id="" textDirection="HORIZONTAL" spaceColumns="1134" tabStop="8000" tabStopVal="4000" '
+    'tabStopUnit="HWPUNIT" outlineShapeIDRef="1" memoShapeIDRef="0" textVerticalWidthHead="0" masterPageCnt="0">'
+    '<hp:grid lineGrid="0" charGrid="0" wonggojiFormat="0"/>'
+    '<hp:startNum pageStartsOn="BOTH" page="0" pic="0" tbl="0" equation="0"/>'
+    '<hp:visibility hideFirstHeader="0" hideFirstFooter="0" hideFirstMasterPage="0" border="SHOW_ALL" '
+    'fill="SHOW_ALL" hideFirstPageNum="0" hideFirstEmptyLine="0" showLineNumber="0"/>'
+    '<hp:pagePr landscape="WIDELY" width="59528" height="84186" gutterType="LEFT_ONLY">'
+    '<hp:margin header="4252" footer="4252" gutter="0" left="8504" right="8504" top="5668" bottom="4252"/>'
+    '</hp:pagePr></hp:secPr>'
+)
+
+_VERSION_XML = (
+    f'{XML_DECL}<hv:HCFVersion xmlns:hv="{NS["hv"]}" tagetApplication="WORDPROCESSOR" major="5" minor="1" '
+    'micro="0" buildNumber="1" os="1" xmlVersion="1.4" application="Hancom Office Hangul" appVersion="11, 0, 0, 0"/>'
+)
+
+_CONTAINER_XML = (
+    f'{XML_DECL}<ocf:container xmlns:ocf="urn:oasis:names:tc:opendocument:xmlns:container" '
+    'xmlns:hpf="http://www.hancom.co.kr/schema/2011/hpf"><ocf:rootfiles>'
+    '<ocf:rootfile full-path="Contents/content.hpf" media-type="application/hwpml-package+xml"/>'
+    '</ocf:rootfiles></ocf:container>'
+)
+
+_MANIFEST_XML = (
+    f'{XML_DECL}<odf:manifest xmlns:odf="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0"/>'
+)
+
+_CONTENT_HPF = (
+    f'{XML_DECL}<opf:package xmlns:opf="http://www.idpf.org/2007/opf/" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" version="" unique-identifier="" id="">'
+    '<opf:metadata><opf:title/><opf:language>ko</opf:language></opf:metadata>'
+    '<opf:manifest>'
+    '<opf:item id="header" href="Contents/header.xml" media-type="application/xml"/>'
+    '<opf:item id="section0" href="Contents/section0.xml" media-type="application/xml"/>'
+    '<opf:item id="settings" href="settings.xml" media-type="application/xml"/>'
+    '</opf:manifest>'
+    '<opf:spine><opf:itemref idref="header" linear="yes"/><opf:itemref idref="section0" linear="yes"/></opf:spine>'
+    '</opf:package>'
+)
+
+_SETTINGS_XML = (
+    f'{XML_DECL}<ha:HWPApplicationSetting xmlns:ha="{NS["ha"]}" xmlns:config="urn:oasis:names:tc:opendocument:xmlns:config:1.0">'
+    '<ha:CaretPosition listIDRef="0" paraIDRef="0" pos="0"/></ha:HWPApplicationSetting>'
+)
+
+
+def read_styles(header_xml):
+    """header.xml → {스타일 이름: (style id, paraPr id, charPr id)}"""
+    root = ET.fromstring(header_xml)
+    styles = {}
+    for style in root.iter(f'{{{NS["hh"]}}}style'):
+        styles[style.get('name')] = (
+            style.get('id'), style.get('paraPrIDRef'), style.get('charPrIDRef')
+        )
+    return styles
+
+
+def _load_template(template_path):
+    """템플릿 .hwpx → (zip 항목들, 스타일 표, secPr XML)"""
+    if not template_path.lower().endswith('.hwpx'):
+        raise ValueError(
+            f"HWPX 템플릿만 지원합니다: {template_path}\n"
+            "한글에서 '다른 이름으로 저장 → HWPX'로 변환한 파일을 지정하세요."
+        )
+    with zipfile.ZipFile(template_path) as z:
+        files = {name: z.read(name) for name in z.namelist()}
+
+    header = files.get('Contents/header.xml')
+    if header is None:
+        raise ValueError(f"header.xml이 없는 HWPX 파일입니다: {template_path}")
+
+    section = files.get('Contents/section0.xml', b'').decode('utf-8')
+    match = re.search(r'<hp:secPr\b.*?</hp:secPr>', section, re.S)
+    sec_pr = match.group(0) if match else _DEFAULT_SECPR
+    return files, read_styles(header), sec_pr
+
+
+def _section_xml(paragraphs, styles, sec_pr):
+    fallback = styles.get('바탕글') or next(iter(styles.values()))
+    parts = [
+        f'{XML_DECL}<hs:sec xmlns:hs="{NS["hs"]}" xmlns:hp="{NS["hp"]}" '
+        f'xmlns:hc="{NS["hc"]}" xmlns:hh="{NS["hh"]}">'
+    ]
+    for i, (style_name, text) in enumerate(paragraphs):
+        style_id, para_pr, char_pr = styles.get(style_name, fallback)
+        head = sec_pr if i == 0 else ''
+        body = f'<hp:t>{escape(text)}</hp:t>' if text else ''
+        parts.append(
+            f'<hp:p id="{i}" paraPrIDRef="{para_pr}" styleIDRef="{style_id}" pageBreak="0" '
+            f'columnBreak="0" merged="0"><hp:run charPrIDRef="{char_pr}">{head}{body}</hp:run></hp:p>'
+        )
+    if not paragraphs:
+        style_id, para_pr, char_pr = fallback
+        parts.append(
+            f'<hp:p id="0" paraPrIDRef="{para_pr}" styleIDRef="{style_id}" pageBreak="0" '
+            f'columnBreak="0" merged="0"><hp:run charPrIDRef="{char_pr}">{sec_pr}</hp:run></hp:p>'
+        )
+    parts.append('</hs:sec>')
+    return ''.join(parts)
+
+
+def write_hwpx(paragraphs, output_path, template_path=None):
+    """문단 목록 [(style_name, text)] → .hwpx 파일
+
+    반환: 템플릿에 없어서 바탕글로 대체된 스타일 이름 집합
+    """
+    if template_path:
+        files, styles, sec_pr = _load_template(template_path)
+    else:
+        header = _default_header()
+        files = {
+            'version.xml': _VERSION_XML.encode('utf-8'),
+            'Contents/header.xml': header.encode('utf-8'),
+            'Contents/content.hpf': _CONTENT_HPF.encode('utf-8'),
+            'META-INF/container.xml': _CONTAINER_XML.encode('utf-8'),
+            'META-INF/manifest.xml': _MANIFEST_XML.encode('utf-8'),
+            'settings.xml': _SETTINGS_XML.encode('utf-8'),
+        }
+        styles = read_styles(header)
+        sec_pr = _DEFAULT_SECPR
+
+    files['Contents/section0.xml'] = _section_xml(paragraphs, styles, sec_pr).encode('utf-8')
+    files.pop('mimetype', None)
+
+    with zipfile.ZipFile(output_path, 'w') as z:
+        # mimetype은 압축 없이 맨 앞에 있어야 함
+        z.writestr('mimetype', 'application/hwp+zip', compress_type=zipfile.ZIP_STORED)
+        for name, data in files.items():
+            z.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+
+    return {name for name, _ in paragraphs if name not in styles}
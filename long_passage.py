@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+긴 지문 나누어 생성 (map-reduce)
+
+지문을 문단 경계에서 구간으로 나누고, 유형별 문제 수를 구간 길이에 비례해 나눠서
+구간마다 따로(동시에) 생성한 뒤 합친다. 합칠 때 비슷한 발문은 하나만 남기고,
+최다선지는 구간별 선택지를 이어 붙여 번호와 정답·해설 번호를 다시 매긴다.
+"""
+
+import re
+from difflib import SequenceMatcher
+
+from question_schema import CIRCLED, Question
+
+NORMALIZE_RE = re.compile(r'[\s\W_]+')
+DUPLICATE_RATIO = 0.85  # 정규화한 문제 내용이 이 이상 비슷하면 중복으로 봄
+
+
+def split_sections(paragraphs, max_chars):
+    """문단 목록 → 구간 목록 (각 구간은 문단 목록, 문단은 쪼개지 않음)"""
+    sections = []
+    current, length = [], 0
+    for paragraph in paragraphs:
+        if current and length + len(paragraph) > max_chars:
+            sections.append(current)
+            current, length = [], 0
+        current.append(paragraph)
+        length += len(paragraph)
+    if current:
+        sections.append(current)
+    return sections
+
+
+def allocate(total, weights):
+    """total개를 weights 비율로 나눔 (최대 나머지 방식, 합은 항상 total)"""
+    weight_sum = sum(weights) or 1
+    shares = [total * w / weight_sum for w in weights]
+    counts = [int(s) for s in shares]
+    by_remainder = sorted(range(len(weights)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def _normalize(q):
+    """발문 + 보기 + 선택지 (발문은 '윗글의 내용과 일치하는 것은?'처럼 구간마다 같을 수 있음)"""
+    return NORMALIZE_RE.sub('', ''.join([q.stem, *q.bogi, *q.choices]))
+
+
+def dedup(questions, ratio=DUPLICATE_RATIO):
+    """내용이 (거의) 같은 문제는 처음 것만 남김"""
+    kept, seen = [], []
+    for q in questions:
+        key = _normalize(q)
+        if any(key == other or SequenceMatcher(None, key, other).ratio() >= ratio for other in seen):
+            continue
+        seen.append(key)
+        kept.append(q)
+    return kept
+
+
+def merge_multi_choice(parts, limit=len(CIRCLED)):
+    """구간별 최다선지 문제 → 선택지를 이어 붙인 문제 하나 (번호/정답/해설 번호 다시 매김)"""
+    parts = [q for q in parts if q.choices]
+    if not parts:
+        return None
+
+    choices, correct, explanations = [], [], []
+    for q in parts:
+        table = {}
+        for i, choice in enumerate(q.choices):
+            if len(choices) >= limit:
+                break
+            table[ord(CIRCLED[i])] = CIRCLED[len(choices)]
+            if CIRCLED[i] in q.answer:
+                correct.append(CIRCLED[len(choices)])
+            choices.append(choice)
+        if q.explanation:
+            explanations.append(q.explanation.translate(table))
+
+    return Question(parts[0].stem, [], choices, ', '.join(correct), ' '.join(explanations))
+
+
+def merge(question_type, section_questions):
+    """구간별 Question 목록들 → 유형 하나의 Question 목록"""
+    if question_type == '최다선지':
+        merged = merge_multi_choice([q for questions in section_questions for q in questions[:1]])
+        return [merged] if merged else []
+    return dedup([q for questions in section_questions for q in questions])
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+짧은 지문 묶어서 생성 - 예시(few-shot) 블록이 지문보다 긴 경우 여러 지문을 한 요청으로
+
+지문마다 [[지문 P1]] 같은 구분줄을 붙여 보내고, 결과도 같은 구분줄로 나눠 지문별로 돌려준다.
+구분줄이 없거나 겹치거나, 결과 내용이 다른 지문과 더 많이 겹치면(글자 2-gram 기준)
+잘못 배정된 것으로 보고 그 지문만 따로 다시 생성하게 한다.
+"""
+
+import re
+
+MARKER_RE = re.compile(r'^\s*\[\[지문 (P\d+)\]\]\s*$')
+TAG_RE = re.compile(r'\[[^\]]*\]|정답\)|해설\)|[①-⑳]')
+ATTRIBUTION_MARGIN = 1.2  # 다른 지문과의 겹침이 이 배 이상 크면 잘못 배정으로 봄
+
+
+def label(index):
+    return f'P{index + 1}'
+
+
+def marker(name):
+    return f'[[지문 {name}]]'
+
+
+def pack(passages, budget, max_count):
+    """(key, 지문) 목록 → 묶음 목록 (묶음 하나의 지문 글자 수 합 ≤ budget, 개수 ≤ max_count)"""
+    groups = []
+    current, size = [], 0
+    for key, passage in passages:
+        if current and (size + len(passage) > budget or len(current) >= max_count):
+            groups.append(current)
+            current, size = [], 0
+        current.append((key, passage))
+        size += len(passage)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def join_passages(passages):
+    """지문 목록 → 구분줄을 붙여 이은 텍스트"""
+    return '\n\n'.join(f'{marker(label(i))}\n{passage.strip()}' for i, passage in enumerate(passages))
+
+
+def split_output(text, count):
+    """묶음 결과 → (지문 번호별 텍스트 목록, 구분줄 문제가 있는 번호 집합)"""
+    sections = [[] for _ in range(count)]
+    seen = set()
+    broken = set()
+    current = None
+
+    for line in text.split('\n'):
+        match = MARKER_RE.match(line)
+        if match is None:
+            if current is not None:
+                sections[current].append(line)
+            continue
+        index = int(match.group(1)[1:]) - 1
+        if not 0 <= index < count or index in seen:
+            # 없는 번호 / 같은 번호가 또 나옴 → 이어지는 내용은 어디 것인지 알 수 없음
+            if 0 <= index < count:
+                broken.add(index)
+            current = None
+            continue
+        seen.add(index)
+        current = index
+
+    texts = ['\n'.join(lines).strip() for lines in sections]
+    broken |= {i for i, t in enumerate(texts) if not t}
+    return texts, broken
+
+
+def _bigrams(text):
+    text = re.sub(r'\s+', '', TAG_RE.sub('', text))
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def misattributed(texts, passages, margin=ATTRIBUTION_MARGIN):
+    """결과 내용이 자기 지문보다 다른 지문과 뚜렷하게 더 겹치는 번호 집합"""
+    passage_grams = [_bigrams(p) for p in passages]
+    wrong = set()
+    for i, text in enumerate(texts):
+        grams = _bigrams(text)
+        if not grams:
+            continue
+        overlaps = [len(grams & pg) for pg in passage_grams]
+        best = max(range(len(overlaps)), key=overlaps.__getitem__)
+        if best != i and overlaps[best] > overlaps[i] * margin:
+            wrong.add(i)
+    return wrong
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+문제 구조(JSON 스키마) - 도구 사용(tool use) 출력 모드
+
+모델이 태그 텍스트 대신 정해진 JSON(발문, 보기, 선택지, 정답, 해설)으로 답하게 하고,
+태그는 렌더링할 때만 붙인다. 태그 수정 같은 후처리가 필요 없다.
+"""
+
+import re
+from typing import List, NamedTuple
+
+from tag_tokenizer import GENERATOR_TAGS, make_token
+
+CIRCLED = '①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳'
+LEADING_NUMBER_RE = re.compile(r'^\s*(?:[①-⑳]|\d+[.)])\s*')
+
+TOOL_NAME = 'submit_questions'
+
+
+class Question(NamedTuple):
+    stem: str                 # 발문
+    bogi: List[str]           # <보기> 줄들 (없으면 [])
+    choices: List[str]        # 선택지 (번호 없이, 없으면 [])
+    answer: str               # 정답 ('③', 'O', '①, ③, ⑤' 등)
+    explanation: str          # 해설
+
+
+# 유형별 (문제 수, 보기 필요 여부, 선택지 수)
+TYPE_SHAPES = {
+    '보기형': (3, True, 5),
+    'OX': (15, False, 0),
+    '최다선지': (1, False, 20),
+}
+
+
+def tool_for(question_type, count=None):
+    """유형별 도구 정의 (input_schema로 모양을 강제, count로 문제 수 변경)"""
+    default_count, needs_bogi, n_choices = TYPE_SHAPES[question_type]
+    count = count or default_count
+
+    item = {
+        'type': 'object',
+        'properties': {
+            'stem': {'type': 'string', 'description': '발문 (문제 번호 없이)'},
+            'answer': {'type': 'string', 'description': '정답만 (예: ③ / O / ①, ③, ⑤)'},
+            'explanation': {'type': 'string', 'description': '해설 (지문 근거 포함, 한 줄)'},
+        },
+        'required': ['stem', 'answer', 'explanation'],
+    }
+    if needs_bogi:
+        item['properties']['bogi'] = {
+            'type': 'array', 'items': {'type': 'string'}, 'minItems': 1,
+            'description': '<보기> 내용 (줄 단위)',
+        }
+        item['required'].append('bogi')
+    if n_choices:
+        item['properties']['choices'] = {
+            'type': 'array', 'items': {'type': 'string'},
+            'minItems': n_choices, 'maxItems': n_choices,
+            'description': '선택지 내용 (①② 같은 번호 없이)',
+        }
+        item['required'].append('choices')
+    if question_type == 'OX':
+        item['properties']['answer'] = {'type': 'string', 'enum': ['O', 'X']}
+
+    return {
+        'name': TOOL_NAME,
+        'description': f'{question_type} 문제 {count}개를 제출합니다.',
+        'input_schema': {
+            'type': 'object',
+            'properties': {
+                'questions': {'type': 'array', 'items': item, 'minItems': count, 'maxItems': count},
+            },
+            'required': ['questions'],
+        },
+    }
+
+
+def _strip_number(text):
+    return LEADING_NUMBER_RE.sub('', text).strip()
+
+
+def parse_tool_input(data):
+    """도구 입력(dict) → Question 목록"""
+    questions = []
+    for raw in data.get('questions', []):
+        questions.append(Question(
+            stem=_strip_number(raw.get('stem', '')),
+            bogi=[line.strip() for line in raw.get('bogi') or [] if line.strip()],
+            choices=[_strip_number(c) for c in raw.get('choices') or [] if c.strip()],
+            answer=raw.get('answer', '').strip(),
+            explanation=raw.get('explanation', '').strip(),
+        ))
+    return questions
+
+
+def render_lines(questions):
+    """Question 목록 → 태그 줄 목록"""
+    lines = []
+    for q in questions:
+        lines.append(f'[문제] {q.stem}')
+        lines.extend(f'[보기] {line}' for line in q.bogi)
+        lines.extend(f'[선택지] {CIRCLED[i]} {c}' for i, c in enumerate(q.choices[:len(CIRCLED)]))
+        if q.explanation:
+            lines.append(f'[교사용정답] 정답) {q.answer} 해설) {q.explanation}')
+        else:
+            lines.append(f'[교사용정답] 정답) {q.answer}')
+    return lines
+
+
+def render_tags(questions):
+    """Question 목록 → 태그 텍스트 (기존 결과와 같은 모양)"""
+    return '\n'.join(render_lines(questions))
+
+
+def to_tokens(questions, registry=GENERATOR_TAGS):
+    """Question 목록 → Token 목록"""
+    return [make_token(line, registry) for line in render_lines(questions)]
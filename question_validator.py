@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+생성 결과 검증 - 유형별 문제 수, 선택지 번호(①~⑳), 정답 범위 확인
+
+프롬프트가 요구하는 모양: 보기형 3문제(보기 + 선택지 5개), OX 15문제, 최다선지 1문제(선택지 20개).
+모양이 맞는 문제만 남기고, 모자란 개수를 알려줘서 그만큼만 다시 요청할 수 있게 한다.
+"""
+
+import re
+from typing import List, NamedTuple
+
+from question_schema import CIRCLED, TYPE_SHAPES, Question
+from tag_tokenizer import GENERATOR_TAGS, iter_tokens
+
+ANSWER_RE = re.compile(r'^정답\)\s*(.*?)\s*(?:해설\)\s*(.*))?$')
+CHOICE_NUMBER_RE = re.compile(r'^([①-⑳])\s*')
+
+
+class ParsedQuestion(NamedTuple):
+    question: Question
+    numbers: List[str]  # 선택지에 실제로 붙어 있던 번호 (구조화 출력이면 순서대로 채움)
+
+
+class Report(NamedTuple):
+    valid: List[Question]   # 모양이 맞는 문제 (최대 요구 개수까지)
+    problems: List[str]     # 사람이 읽을 문제점
+    missing: int            # 더 필요한 문제 수
+
+
+def parse_tagged(text):
+    """태그 텍스트 → ParsedQuestion 목록 ([문제]마다 새 문제)"""
+    parsed = []
+    current = None
+
+    for token in iter_tokens(text, GENERATOR_TAGS):
+        if token.type == 'question':
+            current = {'stem': token.text, 'bogi': [], 'choices': [], 'numbers': [],
+                       'answer': '', 'explanation': ''}
+            parsed.append(current)
+        elif current is None:
+            continue  # 첫 [문제] 앞의 줄은 무시
+        elif token.type == 'choice':
+            current['bogi'].append(token.text)
+        elif token.type == 'option':
+            match = CHOICE_NUMBER_RE.match(token.text)
+            current['numbers'].append(match.group(1) if match else '')
+            current['choices'].append(token.text[match.end():].strip() if match else token.text)
+        elif token.type == 'answer':
+            match = ANSWER_RE.match(token.text)
+            if match:
+                current['answer'], current['explanation'] = match.group(1), match.group(2) or ''
+            else:
+                current['answer'] = token.text
+
+    return [
+        ParsedQuestion(
+            Question(p['stem'], p['bogi'], p['choices'], p['answer'], p['explanation']),
+            p['numbers'],
+        )
+        for p in parsed
+    ]
+
+
+def from_questions(questions):
+    """구조화 출력(Question 목록)을 검증용으로 (번호는 렌더링 순서대로)"""
+    return [ParsedQuestion(q, list(CIRCLED[:len(q.choices)])) for q in questions]
+
+
+def check_question(question_type, parsed):
+    """문제 하나의 모양 검사 → 문제점 목록 (비어 있으면 통과)"""
+    _, needs_bogi, n_choices = TYPE_SHAPES[question_type]
+    q, numbers = parsed
+    problems = []
+
+    if not q.stem:
+        problems.append('발문 없음')
+    if not q.answer:
+        problems.append('정답 없음')
+    if needs_bogi and not q.bogi:
+        problems.append('보기 없음')
+
+    if n_choices:
+        if len(q.choices) != n_choices:
+            problems.append(f'선택지 {len(q.choices)}개 (필요 {n_choices}개)')
+        elif numbers != list(CIRCLED[:n_choices]):
+            problems.append('선택지 번호가 ①부터 차례대로가 아님')
+        answers = [c for c in q.answer if c in CIRCLED]
+        if not answers:
+            problems.append('정답에 선택지 번호 없음')
+        elif any(CIRCLED.index(c) >= n_choices for c in answers):
+            problems.append('정답이 선택지 범위를 벗어남')
+    else:
+        if q.choices:
+            problems.append('OX 문제에 선택지가 있음')
+        if q.answer[:1] not in ('O', 'X'):
+            problems.append('정답이 O/X가 아님')
+
+    return problems
+
+
+def validate(question_type, parsed_questions, expected=None):
+    """유형별 검증 - 통과한 문제와 모자란 개수 계산"""
+    if expected is None:
+        expected = TYPE_SHAPES[question_type][0]
+
+    valid = []
+    problems = []
+    for i, parsed in enumerate(parsed_questions, 1):
+        issues = check_question(question_type, parsed)
+        if issues:
+            problems.append(f'{i}번: ' + ', '.join(issues))
+        else:
+            valid.append(parsed.question)
+
+    if len(valid) > expected:
+        problems.append(f'문제 수 초과 ({len(valid)}개 → {expected}개만 사용)')
+        valid = valid[:expected]
+    missing = expected - len(valid)
+    if missing:
+        problems.append(f'{missing}문제 부족 (통과 {len(valid)}/{expected})')
+
+    return Report(valid, problems, missing)
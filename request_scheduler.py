@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+요청 스케줄러 - 분당 요청/토큰 한도 안에서 호출, 실패하면 지터 백오프로 재시도
+
+- 요청 수(RPM), 입력 토큰(ITPM), 출력 토큰(OTPM)을 각각 토큰 버킷으로 관리한다.
+- 응답의 anthropic-ratelimit-* 헤더로 남은 한도를 맞추고, 429의 retry-after 동안은 모든 작업을 멈춘다.
+- 재시도를 다 쓴 작업은 버리지 않고 재시도 큐에 모았다가 나머지 작업이 끝난 뒤 다시 실행한다.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import anthropic
+
+# 다시 시도할 만한 상태 코드 (529: overloaded)
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# 헤더 이름 → 버킷 이름
+HEADER_BUCKETS = {
+    'requests': 'requests',
+    'input-tokens': 'input',
+    'output-tokens': 'output',
+}
+
+
+class TokenBucket:
+    """분당 한도 버킷 (headroom 비율만큼만 사용해서 한도 바로 아래를 유지)"""
+
+    def __init__(self, per_minute, headroom=0.9):
+        self.headroom = headroom
+        self.capacity = per_minute * headroom
+        self.rate = self.capacity / 60.0  # 초당 회복량
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """amount만큼 미리 차감 → 기다려야 하는 초 (한 번에 capacity보다 많이는 차감하지 않음)"""
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def available(self, amount, now):
+        self._refill(now)
+        return self.tokens >= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """예상치와 실제 사용량의 차이 반영 (양수면 추가 차감)"""
+        self.tokens -= amount
+
+    def sync(self, limit, remaining, now):
+        """응답 헤더의 한도/남은 양에 맞춤"""
+        self._refill(now)
+        self.capacity = limit * self.headroom
+        self.rate = self.capacity / 60.0
+        # headroom 밖의 몫은 남겨 둠
+        self.tokens = min(self.tokens, remaining - limit * (1 - self.headroom))
+
+
+def _parse_reset(value):
+    """'2025-01-01T00:00:30Z' → 지금부터 남은 초"""
+    try:
+        reset = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after(exc):
+    """오류 응답의 retry-after(-ms) 헤더 → 초 (없으면 None)"""
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+
+def is_retryable(exc):
+    if isinstance(exc, (anthropic.APIConnectionError, TimeoutError)):  # 시간 초과, 마감 초과 포함
+        return True
+    return getattr(exc, 'status_code', None) in RETRY_STATUS
+
+
+class RetriesExhausted(Exception):
+    """재시도를 다 써도 실패 (마지막 오류는 __cause__)"""
+
+
+class RequestScheduler:
+    """호출 전 버킷에서 한도를 확보하고, 실패하면 지터 지수 백오프로 재시도"""
+
+    def __init__(self, rpm=50, input_tpm=30000, output_tpm=8000, max_retries=5,
+                 base_delay=1.0, max_delay=60.0, headroom=0.9, output_estimate=2000):
+        self.buckets = {
+            'requests': TokenBucket(rpm, headroom),
+            'input': TokenBucket(input_tpm, headroom),
+            'output': TokenBucket(output_tpm, headroom),
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.output_estimate = output_estimate
+        self.output_average = {}  # 라벨(문제 유형) → 최근 출력 토큰 평균
+        self.paused_until = 0.0   # 429 retry-after 동안 모든 작업 정지
+        self.lock = threading.Lock()
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'failed': 0, 'waited': 0.0}
+
+    def estimate_output(self, label):
+        return self.output_average.get(label, self.output_estimate)
+
+    def acquire(self, input_tokens=0, output_tokens=0):
+        """요청 1개 + 토큰만큼 한도 확보 (필요하면 기다림) → 기다린 초"""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(
+                self.paused_until - now,
+                self.buckets['requests'].reserve(1, now),
+                self.buckets['input'].reserve(input_tokens, now),
+                self.buckets['output'].reserve(output_tokens, now),
+            )
+            self.stats['waited'] += max(0.0, wait)
+        if wait > 0:
+            time.sleep(wait)
+        return max(0.0, wait)
+
+    def try_acquire(self, input_tokens=0, output_tokens=0):
+        """기다리지 않고 한도를 확보할 수 있을 때만 확보 (헤지 요청용) → 확보했으면 True"""
+        need = {'requests': 1, 'input': input_tokens, 'output': output_tokens}
+        with self.lock:
+            now = time.monotonic()
+            if self.paused_until > now:
+                return False
+            if not all(self.buckets[name].available(amount, now) for name, amount in need.items()):
+                return False
+            for name, amount in need.items():
+                self.buckets[name].reserve(amount, now)
+            self.stats['calls'] += 1
+            return True
+
+    def observe(self, headers):
+        """응답의 anthropic-ratelimit-* 헤더로 버킷 맞추기"""
+        with self.lock:
+            now = time.monotonic()
+            for name, bucket in HEADER_BUCKETS.items():
+                prefix = f'anthropic-ratelimit-{name}-'
+                limit = headers.get(prefix + 'limit')
+                remaining = headers.get(prefix + 'remaining')
+                if limit is None or remaining is None:
+                    continue
+                try:
+                    self.buckets[bucket].sync(int(limit), int(remaining), now)
+                except ValueError:
+                    continue
+                if int(remaining) == 0:
+                    reset = _parse_reset(headers.get(prefix + 'reset'))
+                    if reset:
+                        self.paused_until = max(self.paused_until, now + reset)
+
+    def settle(self, label, reserved_output, usage):
+        """실제 출력 토큰으로 버킷 보정 + 라벨별 평균 갱신"""
+        if usage is None:
+            return
+        actual = getattr(usage, 'output_tokens', 0) or 0
+        with self.lock:
+            self.buckets['output'].adjust(actual - reserved_output)
+            previous = self.output_average.get(label)
+            self.output_average[label] = actual if previous is None else int(previous * 0.7 + actual * 0.3)
+
+    def backoff(self, attempt, exc):
+        """attempt번째 재시도 전 대기 (retry-after가 있으면 그 값, 없으면 full jitter)"""
+        delay = retry_after(exc)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if getattr(exc, 'status_code', None) == 429:
+            with self.lock:
+                self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+    def call(self, fn, label='', input_tokens=0, can_retry=None):
+        """fn() 실행 (한도 확보 → 호출 → 실패 시 재시도)
+
+        fn은 usage 속성이 있는 응답을 돌려주면 출력 토큰 보정에 쓰인다.
+        can_retry(): 재시도해도 되는지 (스트리밍에서 이미 줄을 내보낸 뒤면 False)
+        """
+        output_tokens = self.estimate_output(label)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(input_tokens, output_tokens)
+            with self.lock:
+                self.stats['calls'] += 1
+            try:
+                result = fn()
+            except Exception as e:
+                response = getattr(e, 'response', None)
+                if response is not None:
+                    self.observe(response.headers)  # 429 응답에도 한도 헤더가 있음
+                if getattr(e, 'status_code', None) == 429:
+                    with self.lock:
+                        self.stats['rate_limited'] += 1
+                retryable = is_retryable(e) and (can_retry is None or can_retry())
+                if not retryable:
+                    raise
+                if attempt == self.max_retries:
+                    with self.lock:
+                        self.stats['failed'] += 1
+                    raise RetriesExhausted(f'{label} 재시도 {self.max_retries}회 실패: {e}') from e
+                delay = self.backoff(attempt, e)
+                with self.lock:
+                    self.stats['retries'] += 1
+                print(f"   [{label}] {type(e).__name__} → {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                continue
+            self.settle(label, output_tokens, getattr(result, 'usage', None))
+            return result
+
+    def summary(self):
+        with self.lock:
+            return dict(self.stats, waited=round(self.stats['waited'], 2),
+                        output_average=dict(self.output_average))
+
+
+def run_with_retry_queue(jobs, workers=4, retry_rounds=1, cooldown=5.0):
+    """(key, fn) 목록을 동시에 실행, 실패한 작업은 재시도 큐에 모았다가 끝난 뒤 다시 실행
+
+    반환: (results, errors) - key → 결과 / key → 마지막 예외 (순서는 jobs 순서)
+    """
+    jobs = list(jobs)
+    results, errors = {}, {}
+    pending = jobs
+
+    for round_number in range(retry_rounds + 1):
+        if round_number:
+            print(f"   [재시도 큐] {len(pending)}개 작업 {cooldown:.0f}초 후 다시 실행 ({round_number}/{retry_rounds})")
+            time.sleep(cooldown)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [(key, fn, pool.submit(fn)) for key, fn in pending]
+        retry_queue = []
+        for key, fn, future in futures:
+            try:
+                results[key] = future.result()
+                errors.pop(key, None)
+            except Exception as e:
+                errors[key] = e
+                if isinstance(e, RetriesExhausted) or is_retryable(e):
+                    retry_queue.append((key, fn))
+        pending = retry_queue
+        if not pending:
+            break
+
+    order = [key for key, _ in jobs]
+    return ({k: results[k] for k in order if k in results},
+            {k: errors[k] for k in order if k in errors})
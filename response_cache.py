@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Claude 응답 디스크 캐시 (SQLite, 내용 주소 기반)
+
+같은 지문 + 문제 유형 + 모델 + 프롬프트 + temperature 조합이면
+API를 다시 호출하지 않고 저장된 응답을 돌려준다.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_passage(text):
+    """캐시 키용 지문 정규화 (NFC, 줄 끝 공백, 과도한 빈 줄 정리)"""
+    text = unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n')
+    text = '\n'.join(line.rstrip() for line in text.split('\n'))
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def make_key(passage, question_type, model, prompt, temperature, system=''):
+    """캐시 키 = 정규화된 입력 전체의 SHA-256"""
+    payload = json.dumps(
+        [normalize_passage(passage), question_type, model, prompt, system, temperature],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """크기/기간 제한이 있는 LRU 응답 캐시"""
+
+    EVICT_EVERY = 20  # put 몇 번마다 정리할지
+
+    def __init__(self, path, max_bytes=200 * 1024 * 1024, max_age_days=30):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' question_type TEXT,'
+            ' text TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' created REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)')
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key):
+        """저장된 응답 반환 (없거나 만료면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text, created FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, text, question_type=''):
+        """응답 저장 (빈 응답은 저장하지 않음)"""
+        if not text:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (key, question_type, text, len(text.encode('utf-8')), now, now),
+            )
+            self._conn.commit()
+            self._puts += 1
+            evict_now = self._puts % self.EVICT_EVERY == 0
+        if evict_now:
+            self.evict()
+
+    def evict(self):
+        """만료 항목 삭제 후, 용량 초과 시 오래 안 쓴 항목부터 삭제"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE created < ?', (time.time() - self.max_age,))
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute('SELECT key, size FROM responses ORDER BY last_access').fetchall()
+                victims = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((key,))
+                    total -= size
+                self._conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+            self._conn.commit()
+
+    def stats(self):
+        """적중/실패 통계"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+태그 텍스트 토크나이저 - 한 번의 줄 순회로 태그/유형/스타일/내용을 뽑음
+
+기존에는 문제번호_제거 → 태그_수정 → HTML 변환 → get_content_type / get_style_shortcut
+→ clean_text_content 순으로 같은 줄을 여러 번 훑었다. 여기서는 미리 컴파일한 정규식과
+태그 표(registry)로 한 번에 처리한다.
+"""
+
+import re
+from typing import NamedTuple
+
+TAG_RE = re.compile(r'^\[([^\]]+)\]\s*')
+QUESTION_NUMBER_RE = re.compile(r'^\[문제\]\s*\d+\.\s*')
+JUNK_RE = re.compile(r'\[Odyssey\]|󰂼|󰃛|\[세부 정보|\[세부 내용')
+CIRCLED_RE = re.compile(r'[①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳]')
+REAL_TAG_RE = re.compile(r'\[(?:문제|선택지|보기)\]')
+ANSWER_TAG_RE = re.compile(r'\[(?:교사용정답|해설)\]')
+
+PASSAGE_TAG = '[지문또는문단]'
+MIN_PASSAGE_LENGTH = 30  # 이보다 짧은 [지문또는문단] 줄은 모델이 만든 찌꺼기로 보고 버림
+
+
+class Token(NamedTuple):
+    tag: str    # 대괄호 안 태그 이름 (태그가 없으면 '')
+    type: str   # content / question / choice / option / answer / other
+    style: str  # 한글 스타일 단축키 ('ctrl+3' 등)
+    text: str   # 태그를 뗀 내용
+
+    def tagged(self):
+        """다시 태그 텍스트로"""
+        return f'[{self.tag}] {self.text}' if self.tag else self.text
+
+
+class TagRegistry:
+    """태그 이름 → (유형, 스타일 단축키) 표"""
+
+    def __init__(self, entries, default=('other', 'ctrl+1')):
+        self.table = {tag: (content_type, style) for tag, content_type, style in entries}
+        self.default = default
+
+    def lookup(self, tag):
+        return self.table.get(tag, self.default)
+
+
+# 문제생성_자동화_통합.py
+GENERATOR_TAGS = TagRegistry([
+    ('문제', 'question', 'ctrl+3'),
+    ('교사용정답', 'answer', 'ctrl+5'),
+    ('선택지', 'option', 'ctrl+4'),
+    ('보기', 'choice', 'ctrl+7'),
+    ('지문또는문단', 'content', 'ctrl+2'),
+])
+
+# html_hwp_automation.py
+HWP_TAGS = TagRegistry([
+    ('문제', 'question', 'ctrl+3'),         # a.문제
+    ('교사용정답', 'answer', 'ctrl+5'),     # a.교사용정답
+    ('정답해설', 'answer', 'ctrl+5'),
+    ('선택지', 'option', 'ctrl+4'),         # a.문항제시문
+    ('보기', 'choice', 'ctrl+6'),           # a.보기내어쓰기
+    ('지문또는문단', 'content', 'ctrl+2'),  # a.본문
+    ('지문', 'content', 'ctrl+2'),
+    ('문단', 'content', 'ctrl+2'),
+    ('희곡지문', 'other', 'ctrl+8'),        # a.박스안희곡
+    ('밑줄', 'other', 'ctrl+9'),            # a.밑줄_노랑
+    ('학생용', 'other', 'ctrl+0'),          # a.학생용정답
+])
+
+
+def split_tag(line):
+    """'[문제] 내용' → ('문제', '내용')"""
+    match = TAG_RE.match(line)
+    if match is None:
+        return '', line.strip()
+    return match.group(1), line[match.end():].strip()
+
+
+def repair_line(line):
+    """모델 출력 한 줄 정리 (문제 번호 제거 + 잘못된 태그 수정)
+
+    반환: 정리된 줄, 버릴 줄이면 None
+    """
+    line = line.strip()
+    if not line or JUNK_RE.search(line):
+        return None
+
+    if line.startswith('[문제]'):
+        line = QUESTION_NUMBER_RE.sub('[문제] ', line)
+
+    if PASSAGE_TAG not in line:
+        return line
+
+    if REAL_TAG_RE.search(line):
+        # [지문또는문단] [문제] → [문제] (선택지, 보기도 같음)
+        return line.replace(PASSAGE_TAG, '').strip()
+    if ANSWER_TAG_RE.search(line):
+        return line.replace(PASSAGE_TAG, '').replace('[해설]', '[교사용정답]').strip()
+    if CIRCLED_RE.search(line):
+        # [지문또는문단] ① → [선택지] ①
+        return line.replace(PASSAGE_TAG, '[선택지]')
+    if line.startswith(PASSAGE_TAG):
+        # 실제 지문 문단만 유지 (충분히 긴 경우만)
+        if len(line.replace(PASSAGE_TAG, '').strip()) > MIN_PASSAGE_LENGTH:
+            return line
+        return None
+    return line
+
+
+def make_token(line, registry):
+    tag, text = split_tag(line)
+    content_type, style = registry.lookup(tag)
+    return Token(tag, content_type, style, text)
+
+
+def iter_tokens(text, registry=GENERATOR_TAGS, repair=False):
+    """태그 텍스트 → Token (한 번의 순회, repair=True면 모델 출력 정리도 함께)"""
+    for line in text.split('\n'):
+        if repair:
+            line = repair_line(line)
+            if line is None:
+                continue
+        else:
+            line = line.strip()
+            if not line:
+                continue
+        yield make_token(line, registry)
+
+
+def tokenize(text, registry=GENERATOR_TAGS, repair=False):
+    return list(iter_tokens(text, registry, repair))
+
+
+def repair_text(text):
+    """모델 출력 전체 정리 (문제번호_제거 + 태그_수정을 한 번에)"""
+    return '\n'.join(line for line in map(repair_line, text.split('\n')) if line is not None)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 시간 기록(span) + 선택한 단계만 cProfile
+
+    from tracing import span
+    with span('claude_호출', type=종류) as info:
+        ...
+        info['output_tokens'] = usage.output_tokens   # span에 값 추가
+
+configure(path)를 부르기 전에는 span이 아무것도 하지 않는다 (기본은 꺼짐).
+- path가 .jsonl이면 span이 끝날 때마다 한 줄씩 덧붙임 (중간에 죽어도 남음)
+- 그 밖(.json)이면 Chrome trace 형식으로 모았다가 close()에서 저장 (chrome://tracing, Perfetto에서 열기)
+- profile_stage를 주면 그 이름(또는 '이름:…')의 span 안에서 cProfile을 켜고, close()에서 .prof 저장 +
+  누적 시간 상위 함수 출력. cProfile은 한 번에 하나만 켤 수 있어서 같은 단계가 여러 스레드에서
+  동시에 돌면 먼저 시작한 것만 잰다.
+"""
+
+import atexit
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Tracer:
+    def __init__(self):
+        self.path = None
+        self.chrome = False
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.profile_stage = None
+        self.profile_path = None
+        self.profiler = None
+        self.profiler_lock = threading.Lock()
+        self.profiled = 0
+
+    @property
+    def enabled(self):
+        return self.path is not None or self.profile_stage is not None
+
+    def configure(self, path=None, profile_stage=None, profile_path=None):
+        self.path = path
+        self.chrome = bool(path) and not path.endswith('.jsonl')
+        self.profile_stage = profile_stage
+        if profile_stage:
+            self.profile_path = profile_path or f'profile_{profile_stage}.prof'
+            self.profiler = cProfile.Profile()
+        atexit.register(self.close)
+
+    def _profiles(self, name):
+        stage = self.profile_stage
+        return stage is not None and (name == stage or name.startswith(stage + ':'))
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return nullcontext({})
+        return self._span(name, args)
+
+    @contextmanager
+    def _span(self, name, args):
+        profiling = self._profiles(name) and self.profiler_lock.acquire(blocking=False)
+        if profiling:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield args  # 안에서 args에 결과 값(토큰 수 등)을 추가할 수 있음
+        finally:
+            end = time.perf_counter()
+            if profiling:
+                self.profiler.disable()
+                self.profiled += 1
+                self.profiler_lock.release()
+            if self.path:
+                self._record(name, start, end, args)
+
+    def _record(self, name, start, end, args):
+        thread = threading.current_thread()
+        if self.chrome:
+            event = {'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': thread.ident,
+                     'ts': round((start - self.origin) * 1e6), 'dur': round((end - start) * 1e6),
+                     'args': args}
+            with self.lock:
+                self.events.append(event)
+            return
+        line = json.dumps({'name': name, 'start': round(start - self.origin, 6),
+                           'seconds': round(end - start, 6), 'thread': thread.name, **args},
+                          ensure_ascii=False, default=str)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def close(self, top=15):
+        """Chrome trace 저장 + 프로파일 저장/출력 (여러 번 불러도 한 번만)"""
+        with self.lock:
+            events, self.events = self.events, []
+        if self.chrome and events:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False, default=str)
+            print(f"✓ trace 저장: {self.path} (span {len(events)}개)")
+        if self.profiler is not None and self.profiled:
+            self.profiler.dump_stats(self.profile_path)
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(top)
+            print(f"\n[프로파일: {self.profile_stage} {self.profiled}회] {self.profile_path}")
+            print(out.getvalue())
+            self.profiler = None
+
+
+tracer = Tracer()
+
+
+def configure(path=None, profile_stage=None, profile_path=None):
+    tracer.configure(path, profile_stage, profile_path)
+
+
+def span(name, **args):
+    """단계 하나의 시간 기록 (꺼져 있으면 아무것도 안 하는 컨텍스트)"""
+    return tracer.span(name, **args)
+
+
+def close():
+    tracer.close()
+
+
+def traced(name):
+    """함수 전체를 span 하나로 기록하는 데코레이터"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+한글 입력 체크포인트 (중단된 곳부터 다시 입력)
+
+입력을 시작할 때 항목 목록((내용, 유형, 단축키))을 저장하고, 항목 하나를 입력할 때마다 입력이 끝난 항목 수와
+공백줄 상태(PlanCompiler.state(): prev_type, choice_started, option_started, current_style)를
+덮어쓴다. 끝까지 입력하면 파일을 지운다. FAILSAFE(마우스를 화면 모서리로) / Ctrl+C / 창 전환으로
+중단되면 파일이 남고, --resume이 그 다음 항목부터 이어서 입력한다.
+항목은 뒤따르는 Enter까지 입력한 뒤에 기록하므로, 이어서 입력할 때 커서는 입력이 멈춘 빈 줄에
+있어야 한다 (일부만 입력된 항목은 지운 뒤).
+
+파일은 임시 파일에 쓴 뒤 바꿔치기하므로 쓰는 도중 중단돼도 깨지지 않는다.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+def fingerprint(entries):
+    """항목 목록의 SHA-256 앞 16자 (같은 문서인지 확인용)"""
+    payload = json.dumps([list(entry) for entry in entries], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def is_failsafe(exc):
+    """pyautogui.FailSafeException인지 (pyautogui를 불러오지 않고 확인)"""
+    return type(exc).__name__ == 'FailSafeException'
+
+
+class TypingJournal:
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+
+    def begin(self, entries, source=None):
+        """새 입력 시작 (기존 기록은 덮어씀)"""
+        self.data = {
+            'source': source,
+            'fingerprint': fingerprint(entries),
+            'total': len(entries),
+            'done': 0,
+            'state': None,
+            'failed': [],
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'entries': [list(entry) for entry in entries],
+        }
+        self._write()
+
+    def resume(self, data):
+        """load()로 읽은 기록에 이어서 씀"""
+        self.data = data
+
+    def confirm(self, done, state, failed=False):
+        """done개 항목 입력 완료 (failed: 방금 항목은 오류가 났지만 넘어감)"""
+        self.data['done'] = done
+        self.data['state'] = state
+        if failed:
+            self.data['failed'].append(done)
+        self.data['updated'] = datetime.now().isoformat(timespec='seconds')
+        self._write()
+
+    def finish(self):
+        """끝까지 입력함 → 기록 삭제"""
+        self.data = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write(self):
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(temp, self.path)
+
+    @staticmethod
+    def load(path):
+        """기록 읽기 (없거나 깨졌으면 None)"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != fingerprint(data.get('entries', [])):
+            return None
+        data['entries'] = [tuple(entry) for entry in data['entries']]
+        return data
+
+
+def describe(data):
+    """재개 안내 문구"""
+    text = f"{data['done']}/{data['total']}개 입력됨"
+    if data.get('updated'):
+        text += f" ({data['updated']})"
+    if data.get('failed'):
+        text += f", 오류로 넘어간 항목: {', '.join(map(str, data['failed']))}번"
+    return text
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+토큰 / 비용 장부 (추가 전용 JSONL) + 실행별 예산
+
+호출마다 지문 해시, 유형, 모델, 입력/출력/캐시 토큰, 지연 시간, stop_reason, 비용을 한 줄씩 덧붙인다.
+결과를 쓰지 않은 시도도 과금되므로 기록하고 status로 표시한다 ('hedge': 헤지 경쟁에서 진 쪽,
+'aborted': 마감 초과 / 오류로 중단, 결과를 쓴 호출은 None).
+장부는 고치지 않고 덧붙이기만 하므로 여러 실행이 같은 파일을 써도 된다.
+
+    python usage_ledger.py                       # 사용량_장부.jsonl 유형별 요약
+    python usage_ledger.py 장부.jsonl --by model --since 2026-10-01
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from response_cache import normalize_passage
+
+# 백만 토큰당 달러 (입력, 출력, 캐시 쓰기, 캐시 읽기) - 모델 이름 앞부분으로 찾음
+PRICES = {
+    'claude-opus-4': (15.0, 75.0, 18.75, 1.50),
+    'claude-sonnet-4': (3.0, 15.0, 3.75, 0.30),
+    'claude-3-7-sonnet': (3.0, 15.0, 3.75, 0.30),
+    'claude-3-5-sonnet': (3.0, 15.0, 3.75, 0.30),
+    'claude-3-5-haiku': (0.80, 4.0, 1.0, 0.08),
+    'claude-3-haiku': (0.25, 1.25, 0.30, 0.03),
+}
+DEFAULT_PRICE = PRICES['claude-sonnet-4']  # 모르는 모델은 sonnet 가격으로 셈
+
+GROUPS = ('type', 'model', 'run', 'day', 'passage')
+
+
+def price_for(model):
+    matches = [prefix for prefix in PRICES if (model or '').startswith(prefix)]
+    return PRICES[max(matches, key=len)] if matches else DEFAULT_PRICE
+
+
+def cost(model, input_tokens, output_tokens, cache_write=0, cache_read=0):
+    """토큰 수 → 달러"""
+    prices = price_for(model)
+    tokens = (input_tokens, output_tokens, cache_write, cache_read)
+    return sum(n * p for n, p in zip(tokens, prices)) / 1_000_000
+
+
+def billed_tokens(record):
+    """예산에 세는 토큰 (캐시 읽기는 입력 가격의 1/10이라 제외)"""
+    return record['input'] + record['output'] + record['cache_write']
+
+
+def passage_hash(passage):
+    """정규화한 지문의 SHA-256 앞 16자 (지문 내용은 장부에 남기지 않음)"""
+    return hashlib.sha256(normalize_passage(passage).encode('utf-8')).hexdigest()[:16]
+
+
+# 이 프로세스의 실행 id (장부를 실행별로 묶을 때 사용)
+RUN_ID = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+
+def make_record(question_type, model, usage, seconds=None, stop_reason=None, passage=None, status=None):
+    """응답 usage(input_tokens 등 속성) → 장부 기록 dict (status: 결과를 쓰지 않은 시도면 'hedge' / 'aborted')"""
+    record = {
+        'ts': datetime.now().isoformat(timespec='seconds'),
+        'run': RUN_ID,
+        'passage': passage_hash(passage) if passage else None,
+        'type': question_type,
+        'model': model,
+        'input': getattr(usage, 'input_tokens', 0) or 0,
+        'output': getattr(usage, 'output_tokens', 0) or 0,
+        'cache_read': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+        'cache_write': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+        'seconds': round(seconds, 3) if seconds is not None else None,
+        'stop_reason': stop_reason,
+        'status': status,
+    }
+    record['cost'] = round(cost(model, record['input'], record['output'],
+                                record['cache_write'], record['cache_read']), 6)
+    return record
+
+
+class UsageLedger:
+    """추가 전용 JSONL 장부 (스레드 안전, 기록마다 파일을 열어 한 줄 덧붙임)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+def read_records(path, since=None):
+    """장부 → 기록 목록 (since: 'YYYY-MM-DD' 이후만, 깨진 줄은 건너뜀)"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 중단된 실행이 남긴 반쪽 줄
+            if since and record.get('ts', '') < since:
+                continue
+            records.append(record)
+    return records
+
+
+def summarize(records, by='type'):
+    """기록 목록 → 묶음 키별 합계 (by: type / model / run / day / passage)"""
+    totals = defaultdict(lambda: {'calls': 0, 'input': 0, 'output': 0, 'cache_read': 0,
+                                  'cache_write': 0, 'seconds': 0.0, 'cost': 0.0, 'truncated': 0,
+                                  'wasted': 0})
+    for record in records:
+        key = record.get('ts', '')[:10] if by == 'day' else record.get(by) or '-'
+        total = totals[key]
+        total['calls'] += 1
+        for name in ('input', 'output', 'cache_read', 'cache_write'):
+            total[name] += record.get(name, 0)
+        total['seconds'] += record.get('seconds') or 0.0
+        total['cost'] += record.get('cost', 0.0)
+        total['truncated'] += record.get('stop_reason') == 'max_tokens'
+        total['wasted'] += record.get('status') is not None
+    for total in totals.values():
+        total['seconds'] = round(total['seconds'], 2)
+        total['cost'] = round(total['cost'], 4)
+    return dict(totals)
+
+
+class BudgetExceeded(Exception):
+    """실행 예산(토큰 / 비용)을 다 씀 - 새 호출을 시작하지 않음"""
+
+
+class Budget:
+    """실행 하나의 토큰 / 비용 한도 (None이면 제한 없음)
+
+    이미 보낸 호출은 끝까지 받으므로 동시 호출 수만큼 한도를 조금 넘을 수 있다.
+    """
+
+    def __init__(self, max_tokens=None, max_cost=None):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.tokens = 0
+        self.cost = 0.0
+        self.refused = 0
+        self.lock = threading.Lock()
+
+    def charge(self, record):
+        with self.lock:
+            self.tokens += billed_tokens(record)
+            self.cost += record['cost']
+
+    def exhausted(self):
+        with self.lock:
+            return ((self.max_tokens is not None and self.tokens >= self.max_tokens) or
+                    (self.max_cost is not None and self.cost >= self.max_cost))
+
+    def check(self):
+        """한도를 넘었으면 BudgetExceeded"""
+        if not self.exhausted():
+            return
+        with self.lock:
+            self.refused += 1
+        raise BudgetExceeded(f'예산 초과 (토큰 {self.tokens}/{self.max_tokens}, '
+                             f'비용 ${self.cost:.4f}/{self.max_cost})')
+
+    def summary(self):
+        with self.lock:
+            return {'max_tokens': self.max_tokens, 'max_cost': self.max_cost, 'tokens': self.tokens,
+                    'cost': round(self.cost, 4), 'refused': self.refused}
+
+
+def print_summary(path, by='type', since=None):
+    records = read_records(path, since)
+    if not records:
+        print(f"기록 없음: {path}")
+        return {}
+    totals = summarize(records, by)
+    print(f"{by:<20} {'호출':>6} {'입력':>10} {'캐시읽기':>10} {'캐시쓰기':>10} {'출력':>10} {'잘림':>5} {'버림':>5} {'비용($)':>10}")
+    for key, t in sorted(totals.items()):
+        print(f"{str(key):<20} {t['calls']:>6} {t['input']:>10} {t['cache_read']:>10} {t['cache_write']:>10} "
+              f"{t['output']:>10} {t['truncated']:>5} {t['wasted']:>5} {t['cost']:>10.4f}")
+    calls = sum(t['calls'] for t in totals.values())
+    spent = sum(t['cost'] for t in totals.values())
+    print(f"합계: 호출 {calls} · 비용 ${spent:.4f} ({records[0]['ts']} ~ {records[-1]['ts']})")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="토큰 / 비용 장부 요약")
+    parser.add_argument('path', nargs='?', default='사용량_장부.jsonl', help="장부 파일 (기본 사용량_장부.jsonl)")
+    parser.add_argument('--by', choices=GROUPS, default='type', help="묶음 기준 (기본 type)")
+    parser.add_argument('--since', help="이 날짜(YYYY-MM-DD) 이후 기록만")
+    args = parser.parse_args(argv)
+    print_summary(args.path, args.by, args.since)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,104 @@
 # -*- coding: utf-8 -*-
 """
 국어 문제 자동 생성 + 한글 자동화 통합 (강력한 프롬프트)
+
+    python 문제생성_자동화_통합.py                          대화형 (지문 입력 → 한글 입력)
+    python 문제생성_자동화_통합.py 지문들/ "시/*.txt" 묶음.jsonl -o 결과 -j 4    배치
+    python 문제생성_자동화_통합.py 지문.txt --type -y         지문 하나를 생성해서 바로 한글에 입력
+    python 문제생성_자동화_통합.py --help                     전체 옵션
+
+pyautogui / bs4는 한글 입력·HTML 읽기 경로에서만 불러온다 (배치는 화면 없는 환경에서도 실행).
 """
 
 import anthropic
+import argparse
+import httpx
+import glob
 import os
+import json
+import threading
+import queue
+import socket
 from datetime import datetime
-import pyautogui
+from concurrent.futures import ThreadPoolExecutor
 import time
-import pyperclip
-import re
-from bs4 import BeautifulSoup
+from response_cache import ResponseCache, make_key
+from hwpx_writer import STYLE_NAMES, build_paragraphs, write_hwpx
+from hwp_keystroke_plan import PlanCompiler, PyAutoGuiExecutor, RecordingExecutor, run_actions
+from hwp_pacing import Pacer, wait_for_window
+from question_schema import TOOL_NAME, TYPE_SHAPES, parse_tool_input, render_tags, tool_for
+from question_validator import from_questions, parse_tagged, validate
+from request_scheduler import RequestScheduler, run_with_retry_queue
+from hedging import Cancelled, HedgeBudget, LatencyTracker, run_hedged
+from long_passage import allocate, merge, split_sections
+from passage_packing import join_passages, misattributed, pack, split_output
+from tracing import configure as 추적_설정, span, traced
+from typing_journal import TypingJournal, describe as 기록_설명, is_failsafe
+from usage_ledger import Budget, BudgetExceeded, UsageLedger, make_record, print_summary as 장부_요약_출력
+from tag_tokenizer import GENERATOR_TAGS, make_token, repair_line, repair_text, split_tag, tokenize
 
 # ========== 설정 ==========
 API_KEY = "sk-ant-REDACTED"
 MODEL = "claude-sonnet-4-20250514"
+종료_표시 = "[끝]"  # 요청한 문제를 다 쓰면 모델이 쓰는 표시 (stop sequence로 거기서 생성 종료)
+# 유형별 모델 / 출력 길이 (없는 항목은 MODEL, 16000 - 모델별_최대출력을 넘으면 거기에 맞춤) - 유형별 지연 시간·출력 토큰은 실행 끝에 출력
+유형별_설정 = {
+    "보기형": {"max_tokens": 4000},
+    "OX": {"model": "claude-3-5-haiku-20241022", "max_tokens": 4000},  # 짧고 쉬운 유형은 빠른 모델로
+    "최다선지": {"max_tokens": 5000},
+}
+# 모델별 출력 토큰 상한 (모델 이름 앞부분으로 찾음, 없으면 16000) - 넘는 max_tokens는 400으로 거절됨
+모델별_최대출력 = {
+    "claude-3-5-haiku": 8192,
+    "claude-3-haiku": 4096,
+    "claude-3-5-sonnet": 8192,
+}
+BASE_URL = os.environ.get("ANTHROPIC_BASE_URL")  # 로컬 테스트 서버 주소 (없으면 기본값)
+최대_동시호출 = 3  # 동시에 실행할 API 호출 수 (1이면 순차 실행)
+TEMPERATURE = 0  # 일관성 강화
+응답캐시_사용 = True  # False면 캐시를 건너뛰고 항상 API 호출
+응답캐시_경로 = "응답캐시.sqlite3"
+응답캐시_최대용량 = 200 * 1024 * 1024  # 바이트
+응답캐시_보관일수 = 30
+스트리밍_모드 = False  # True면 생성 중인 문제를 바로 한글에 입력
+구조화_출력 = False  # True면 태그 텍스트 대신 JSON 스키마(도구 입력)로 받음 (question_schema.py)
+연결풀_크기 = 10  # 공유 클라이언트의 HTTP 연결 수 (keep-alive)
+출력_방식 = "한글자동화"  # "한글자동화" (키 입력) 또는 "hwpx" (파일 직접 생성)
+HWPX_템플릿 = None  # 스타일을 가져올 .hwpx 파일 (오늘 스타일.hwp를 HWPX로 저장한 것)
+HTML_저장 = True  # 결과 HTML 파일도 남길지 (입력과 별개로 백그라운드에서 저장)
+결과_폴더 = "."  # 대화형 실행의 HTML / HWPX 저장 위치
+드라이런 = False  # True면 한글에 입력하지 않고 키 입력 횟수 / 예상 시간만 출력
+적응형_속도 = True  # 고정 sleep 대신 붙여넣기 성공 여부에 따라 대기 시간 조절 (hwp_pacing.py)
+스타일_이어받기 = False  # True면 앞 문단과 같은 스타일은 다시 누르지 않음 (템플릿의 '다음 스타일'이 같은 스타일일 때만)
+검증_사용 = True  # 유형별 문제 수/선택지 모양 검사 후 모자란 문제만 다시 요청 (question_validator.py)
+최대_보완횟수 = 2  # 모자란 문제를 다시 요청하는 최대 횟수
+분당_요청_한도 = 50  # 처음 값 (응답의 anthropic-ratelimit-* 헤더를 받으면 실제 한도로 맞춤)
+분당_입력토큰_한도 = 30000
+분당_출력토큰_한도 = 8000
+최대_재시도 = 5  # 429 / 과부하 / 연결 오류 재시도 횟수 (지터 지수 백오프)
+재시도_큐_횟수 = 1  # 재시도를 다 쓴 작업을 나머지 작업이 끝난 뒤 다시 실행하는 횟수
+헤지_사용 = True  # 첫 토큰이 늦으면 같은 요청을 하나 더 보내고 먼저 끝난 쪽 사용 (hedging.py)
+헤지_백분위 = 90  # 최근 첫 토큰 시간의 이 백분위까지 첫 토큰이 없으면 헤지
+헤지_예산_비율 = 0.1  # 추가 요청은 전체 호출의 10%까지
+호출_마감_초 = 60  # 호출 하나의 기본 마감 시간 (+ max_tokens를 마감_출력속도로 다 쓰는 시간, 넘으면 취소 후 재시도)
+마감_출력속도 = 30  # 마감 계산에 쓰는 느리지만 정상인 출력 속도 (토큰/초) - max_tokens 4000이면 약 3분
+긴지문_분할 = True  # 긴 지문은 문단 경계에서 나눠 구간별로 동시에 생성한 뒤 합침 (long_passage.py)
+분할_기준_길이 = 4000  # 이보다 긴 지문(글자 수)만 나눔
+구간_최대길이 = 2000  # 구간 하나의 최대 글자 수
+짧은지문_묶음 = True  # 배치에서 짧은 지문 여러 개를 한 요청으로 묶음 (passage_packing.py)
+묶음_기준_길이 = 1000  # 이보다 짧은 지문(글자 수)만 묶음
+묶음_최대글자 = 3000  # 묶음 하나에 들어가는 지문 글자 수 합
+묶음_최대개수 = 4  # 묶음 하나의 최대 지문 수 (출력이 max_tokens를 넘지 않게)
+사용량_장부_경로 = "사용량_장부.jsonl"  # 호출마다 토큰/비용 기록을 덧붙이는 장부 (None이면 기록 안 함, usage_ledger.py)
+예산_토큰 = None  # 이 실행에서 쓸 최대 토큰 (입력 + 캐시쓰기 + 출력), 넘으면 새 호출을 시작하지 않음
+예산_달러 = None  # 이 실행에서 쓸 최대 비용 (달러)
+추적_파일 = None  # 단계별 시간 기록 파일 (.jsonl: 한 줄씩, .json: Chrome trace), None이면 기록 안 함 (tracing.py)
+프로파일_단계 = None  # 이 단계(span 이름, 예: "태그_수정", "api")만 cProfile로 측정
+입력_기록_경로 = "한글입력_기록.json"  # 한글 입력 체크포인트 (중단되면 --resume으로 이어서 입력, None이면 안 남김)
 # ============================
 
+문제_유형 = ["보기형", "OX", "최다선지"]
+
 # ========== 강력한 프롬프트 (Few-shot Examples) ==========
 보기형_프롬프트 = """
 <중요한_출력_규칙>
@@ -157,123 +239,746 @@ OX_프롬프트 = """
 
 
 # ========== API 함수 (System Prompt 추가) ==========
-def claude_호출(지문, 프롬프트_종류):
-    """Claude API 호출 (강력한 제약 조건)"""
-    
-    프롬프트_맵 = {
-        "보기형": 보기형_프롬프트,
-        "OX": OX_프롬프트,
-        "최다선지": 최다선지_프롬프트
-    }
-    
-    try:
-        client = anthropic.Anthropic(api_key=API_KEY)
-        print(f"\n[{프롬프트_종류} 문제 생성 중...]")
-        
-        message = client.messages.create(
-            model=MODEL,
-            max_tokens=16000,
-            temperature=0,  # 일관성 강화
-            system="""당신은 한글 자동화 태그 형식을 정확히 준수하는 문제 출제 전문가입니다.
+시스템_프롬프트 = """당신은 한글 자동화 태그 형식을 정확히 준수하는 문제 출제 전문가입니다.
 
 **절대 규칙:**
 1. [문제], [선택지], [보기], [교사용정답] 태그를 정확히 사용
 2. 문제 번호(1., 2., 3.)를 절대 붙이지 않음
 3. [Odyssey], 특수문자(󰂼, 󰃛) 등 불필요한 내용 절대 금지
-4. 제시된 예시 형식을 정확히 따름""",
-            messages=[{
-                "role": "user", 
-                "content": f"{프롬프트_맵[프롬프트_종류]}\n\n===지문===\n{지문}"
-            }]
+4. 제시된 예시 형식을 정확히 따름
+5. 요청한 문제를 모두 출제했으면 마지막 줄에 [끝]만 쓰고 멈춤"""
+
+프롬프트_맵 = {
+    "보기형": 보기형_프롬프트,
+    "OX": OX_프롬프트,
+    "최다선지": 최다선지_프롬프트
+}
+
+# 호출별 토큰 사용량 누적 (동시 호출 대비 잠금)
+토큰_사용량 = {'input': 0, 'output': 0, 'cache_read': 0, 'cache_write': 0, 'calls': 0, 'wasted': 0}
+_사용량_잠금 = threading.Lock()
+
+
+# 프로세스 전체에서 하나의 클라이언트(연결 풀)를 공유
+_클라이언트 = None
+_클라이언트_잠금 = threading.Lock()
+연결_통계 = {'requests': 0, 'connections': 0}
+
+
+def _연결_추적(event_name, info):
+    if event_name == 'connection.connect_tcp.complete':
+        with _사용량_잠금:
+            연결_통계['connections'] += 1
+
+
+def _요청_추적(request):
+    request.extensions['trace'] = _연결_추적
+    with _사용량_잠금:
+        연결_통계['requests'] += 1
+
+
+def 클라이언트_가져오기():
+    """공유 Anthropic 클라이언트 (처음 사용할 때 생성)"""
+    
+    global _클라이언트
+    with _클라이언트_잠금:
+        if _클라이언트 is None:
+            http_client = anthropic.DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=연결풀_크기,
+                    max_keepalive_connections=연결풀_크기,
+                    keepalive_expiry=120,
+                ),
+                event_hooks={'request': [_요청_추적]},
+            )
+            # 재시도는 스케줄러가 한도와 함께 관리 (SDK 자체 재시도와 겹치지 않게)
+            _클라이언트 = anthropic.Anthropic(
+                api_key=API_KEY, base_url=BASE_URL, http_client=http_client, max_retries=0
+            )
+    return _클라이언트
+
+
+def 클라이언트_예열():
+    """백그라운드에서 클라이언트 생성 + TLS 연결 미리 열기"""
+    
+    def 예열():
+        try:
+            클라이언트_가져오기().models.list(limit=1)
+        except Exception:
+            pass  # 예열 실패는 무시 (실제 호출 때 다시 연결)
+    
+    threading.Thread(target=예열, daemon=True).start()
+
+
+def 연결_재사용_통계():
+    with _사용량_잠금:
+        요청 = 연결_통계['requests']
+        연결 = 연결_통계['connections']
+    return {'requests': 요청, 'connections': 연결, 'reused': max(0, 요청 - 연결)}
+
+
+def 요청_구성(지문, 프롬프트_종류, 추가지시=None):
+    """system / messages 구성 - 고정 부분(시스템 + 예시)은 캐시 가능한 앞부분에 둠
+    
+    추가지시(부족한 문제만 다시 요청할 때 등)는 지문 뒤에 붙여서 캐시 앞부분을 건드리지 않음
+    """
+    
+    system = [{"type": "text", "text": 시스템_프롬프트}]
+    messages = [{
+        "role": "user",
+        "content": [
+            {
+                "type": "text",
+                "text": 프롬프트_맵[프롬프트_종류],
+                # 시스템 프롬프트 + 예시 블록까지가 캐시 대상
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": f"===지문===\n{지문}"},
+        ]
+    }]
+    if 추가지시:
+        messages[0]["content"].append({"type": "text", "text": 추가지시})
+    return system, messages
+
+
+def 최대출력(model):
+    """모델의 출력 토큰 상한 (모르는 모델은 16000)"""
+    맞는것 = [앞부분 for 앞부분 in 모델별_최대출력 if model.startswith(앞부분)]
+    return 모델별_최대출력[max(맞는것, key=len)] if 맞는것 else 16000
+
+
+def 유형_설정(프롬프트_종류):
+    """유형별 model / max_tokens / stop_sequences (+ 모델의 출력 상한 max_output)"""
+    설정 = {"model": MODEL, "max_tokens": 16000, "stop_sequences": [종료_표시]}
+    설정.update(유형별_설정.get(프롬프트_종류, {}))
+    설정["max_output"] = min(16000, 최대출력(설정["model"]))
+    설정["max_tokens"] = min(설정["max_tokens"], 설정["max_output"])
+    return 설정
+
+
+# 유형별 지연 시간 / 출력 토큰 (설정 조정용)
+유형별_통계 = {}
+
+
+_장부 = None
+_예산 = None
+
+
+def 장부_가져오기():
+    """공유 사용량 장부 (사용량_장부_경로가 없으면 None)"""
+    global _장부
+    with _사용량_잠금:
+        if _장부 is None and 사용량_장부_경로:
+            _장부 = UsageLedger(사용량_장부_경로)
+    return _장부
+
+
+def 예산_가져오기():
+    """이 실행의 토큰 / 비용 예산"""
+    global _예산
+    with _사용량_잠금:
+        if _예산 is None:
+            _예산 = Budget(예산_토큰, 예산_달러)
+    return _예산
+
+
+def 예산_확인():
+    """예산을 다 썼으면 BudgetExceeded (새 호출 / 새 지문을 시작하기 전에)"""
+    예산_가져오기().check()
+
+
+def 사용량_기록(프롬프트_종류, usage, 초=None, stop_reason=None, 지문=None, 상태=None):
+    """응답 usage 누적 + 출력 + 장부 기록 / 예산 차감
+    
+    상태: 결과를 쓰지 않은 시도('hedge' / 'aborted') - 과금되므로 장부·예산·합계에는 넣고 유형별 통계에서는 뺌
+    """
+    
+    장부 = 장부_가져오기()
+    기록 = make_record(프롬프트_종류, 유형_설정(프롬프트_종류)['model'], usage, 초, stop_reason, 지문, 상태)
+    if 장부:
+        장부.append(기록)
+    예산_가져오기().charge(기록)
+    
+    읽기 = getattr(usage, 'cache_read_input_tokens', 0) or 0
+    쓰기 = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+    
+    with _사용량_잠금:
+        토큰_사용량['input'] += usage.input_tokens
+        토큰_사용량['output'] += usage.output_tokens
+        토큰_사용량['cache_read'] += 읽기
+        토큰_사용량['cache_write'] += 쓰기
+        if 상태:
+            토큰_사용량['wasted'] += 1
+        else:
+            토큰_사용량['calls'] += 1
+            
+            통계 = 유형별_통계.setdefault(프롬프트_종류, {
+                'model': 유형_설정(프롬프트_종류)['model'], 'calls': 0, 'seconds': 0.0,
+                'output': 0, 'max_output': 0, 'truncated': 0,
+            })
+            통계['calls'] += 1
+            통계['seconds'] += 초 or 0.0
+            통계['output'] += usage.output_tokens
+            통계['max_output'] = max(통계['max_output'], usage.output_tokens)
+            if stop_reason == 'max_tokens':
+                통계['truncated'] += 1
+    
+    print(f"   ({프롬프트_종류}{f' {상태}' if 상태 else ''} 토큰: 입력 {usage.input_tokens} · 캐시읽기 {읽기} · "
+          f"캐시쓰기 {쓰기} · 출력 {usage.output_tokens})")
+    if stop_reason == 'max_tokens':
+        print(f"⚠️ [{프롬프트_종류}] max_tokens({유형_설정(프롬프트_종류)['max_tokens']})에서 잘림 - 유형별_설정 확인")
+
+
+def 중단_사용량_기록(프롬프트_종류, stream, 받은_출력, 초, 상태, 지문=None):
+    """끝까지 받지 않은 스트림의 사용량 기록 (message_delta 전이면 출력 토큰은 받은 만큼으로 추정)"""
+    try:
+        message = stream.current_message_snapshot
+    except Exception:
+        return  # message_start 전 (과금 전)
+    message.usage.output_tokens = max(message.usage.output_tokens, 출력토큰_추정(''.join(받은_출력)))
+    사용량_기록(프롬프트_종류, message.usage, 초, message.stop_reason, 지문, 상태)
+
+
+def 유형별_통계_요약():
+    """유형별 평균 지연 시간 / 출력 토큰"""
+    with _사용량_잠금:
+        return {
+            종류: {
+                'model': t['model'],
+                'calls': t['calls'],
+                'avg_seconds': round(t['seconds'] / t['calls'], 2),
+                'avg_output': round(t['output'] / t['calls']),
+                'max_output': t['max_output'],
+                'max_tokens': 유형_설정(종류)['max_tokens'],
+                'truncated': t['truncated'],
+            }
+            for 종류, t in 유형별_통계.items() if t['calls']
+        }
+
+
+def 유형별_통계_출력():
+    for 종류, t in 유형별_통계_요약().items():
+        print(f"   {종류:<5} {t['model']}: {t['calls']}회 · 평균 {t['avg_seconds']}초 · "
+              f"출력 평균 {t['avg_output']} / 최대 {t['max_output']} (max_tokens {t['max_tokens']})")
+
+
+_응답캐시 = None
+_캐시_잠금 = threading.Lock()
+
+
+def 응답캐시_가져오기():
+    """응답 캐시 (처음 사용할 때 생성)"""
+    
+    global _응답캐시
+    with _캐시_잠금:
+        if _응답캐시 is None:
+            _응답캐시 = ResponseCache(응답캐시_경로, 응답캐시_최대용량, 응답캐시_보관일수)
+    return _응답캐시
+
+
+_스케줄러 = None
+
+
+def 스케줄러_가져오기():
+    """공유 요청 스케줄러 (분당 한도 + 재시도)"""
+    global _스케줄러
+    with _클라이언트_잠금:
+        if _스케줄러 is None:
+            _스케줄러 = RequestScheduler(
+                rpm=분당_요청_한도,
+                input_tpm=분당_입력토큰_한도,
+                output_tpm=분당_출력토큰_한도,
+                max_retries=최대_재시도,
+            )
+    return _스케줄러
+
+
+def 호출_마감(max_tokens):
+    """호출 하나의 마감 시간 (초) - 긴 출력(묶음 요청 등)도 정상 속도면 끝낼 수 있게 max_tokens에 비례"""
+    return 호출_마감_초 + max_tokens / 마감_출력속도
+
+
+def 스트림_끊기(stream):
+    """다른 스레드에서 읽고 있는 스트림을 바로 끊음 (소켓 shutdown으로 읽기를 깨운 뒤 응답을 닫아 연결 반환)"""
+    network_stream = stream.response.extensions.get('network_stream')
+    sock = network_stream.get_extra_info('socket') if network_stream is not None else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    stream.close()
+
+
+첫토큰_기록 = LatencyTracker()
+헤지_예산 = HedgeBudget(헤지_예산_비율)
+헤지_통계 = {'calls': 0, 'hedged': 0, 'hedge_won': 0}
+
+
+def 헤지_요청(프롬프트_종류, 입력토큰, 지문=None, **요청_인자):
+    """스트림으로 요청 → 최종 메시지 (첫 토큰이 늦으면 같은 요청을 하나 더, 호출_마감() 넘으면 취소)
+    
+    text / tool_use 모두 스트림 이벤트로 첫 토큰을 확인한 뒤 get_final_message()로 받음.
+    쓰지 않은 시도(헤지에서 진 쪽, 마감 초과·오류로 중단)도 받은 만큼 장부 / 예산에 기록
+    """
+    
+    client = 클라이언트_가져오기()
+    스케줄러 = 스케줄러_가져오기()
+    
+    def 시도(첫토큰, 취소):
+        시작 = time.perf_counter()
+        받은_출력 = []
+        with client.messages.stream(**요청_인자) as stream:
+            try:
+                # 지거나 마감을 넘기면 다음 이벤트를 기다리지 않고 바로 닫아서 연결을 풀에 돌려줌
+                취소.on_cancel(lambda: 스트림_끊기(stream))
+                스케줄러.observe(stream.response.headers)
+                for event in stream:
+                    if 취소.is_set():
+                        raise Cancelled()  # 스트림을 닫아서 남은 생성도 멈춤
+                    if event.type == 'content_block_delta':
+                        if not 첫토큰.is_set():
+                            첫토큰_기록.record(프롬프트_종류, time.perf_counter() - 시작)
+                            첫토큰.set()
+                        받은_출력.append(getattr(event.delta, 'text', None) or
+                                     getattr(event.delta, 'partial_json', None) or '')
+                return stream.get_final_message(), time.perf_counter() - 시작
+            except BaseException:
+                상태 = 'hedge' if getattr(취소, 'reason', None) == 'lost' else 'aborted'
+                중단_사용량_기록(프롬프트_종류, stream, 받은_출력, time.perf_counter() - 시작, 상태, 지문)
+                raise
+    
+    def 버림(결과, 이유):
+        # 다른 쪽이 먼저 끝났거나 마감 뒤에 끝난 결과
+        message, 초 = 결과
+        사용량_기록(프롬프트_종류, message.usage, 초, message.stop_reason, 지문,
+                  'hedge' if 이유 == 'lost' else 'aborted')
+    
+    def 헤지_허용():
+        # 예산 안이고, 기다리지 않고 한도를 확보할 수 있을 때만
+        if not 헤지_예산.try_spend():
+            return False
+        if not 스케줄러.try_acquire(입력토큰, 스케줄러.estimate_output(프롬프트_종류)):
+            return False
+        print(f"   [{프롬프트_종류}] 첫 토큰 지연 → 같은 요청 하나 더 (헤지)")
+        return True
+    
+    헤지_예산.count_call()
+    (message, _), 헤지함, 헤지승리 = run_hedged(
+        시도,
+        hedge_after=첫토큰_기록.percentile(프롬프트_종류, 헤지_백분위) if 헤지_사용 else None,
+        deadline=호출_마감(요청_인자['max_tokens']),
+        allow_hedge=헤지_허용,
+        discard=버림,
+    )
+    with _사용량_잠금:
+        헤지_통계['calls'] += 1
+        헤지_통계['hedged'] += 헤지함
+        헤지_통계['hedge_won'] += 헤지승리
+    return message
+
+
+def 입력토큰_추정(지문, 추가지시=None):
+    """캐시되지 않는 부분(지문 + 추가지시)의 대략적인 토큰 수 (한글은 글자당 약 1토큰)"""
+    return len(지문) + len(추가지시 or '')
+
+
+def 출력토큰_추정(텍스트):
+    """받은 출력의 대략적인 토큰 수 (스트림을 중간에 끊어서 최종 usage가 없을 때)"""
+    return len(텍스트)
+
+
+class 문제생성오류(Exception):
+    """재시도 후에도 생성하지 못한 유형이 있음"""
+
+
+def 캐시_키(지문, 프롬프트_종류, 추가지시=None):
+    return make_key(지문, 프롬프트_종류, 유형_설정(프롬프트_종류)['model'], 프롬프트_맵[프롬프트_종류] + (추가지시 or ''),
+                    TEMPERATURE, 시스템_프롬프트)
+
+
+def claude_호출(지문, 프롬프트_종류, 캐시_사용=None, 추가지시=None, max_tokens=None):
+    """Claude API 호출 (강력한 제약 조건, 모델/출력 길이는 유형별_설정)"""
+    
+    if 캐시_사용 is None:
+        캐시_사용 = 응답캐시_사용
+    
+    if 캐시_사용:
+        키 = 캐시_키(지문, 프롬프트_종류, 추가지시)
+        저장된_결과 = 응답캐시_가져오기().get(키)
+        if 저장된_결과 is not None:
+            print(f"\n[{프롬프트_종류} 캐시 사용]")
+            return 저장된_결과
+    
+    예산_확인()  # 예산을 다 썼으면 새 호출을 보내지 않음
+    스케줄러 = 스케줄러_가져오기()
+    print(f"\n[{프롬프트_종류} 문제 생성 중...]")
+    
+    system, messages = 요청_구성(지문, 프롬프트_종류, 추가지시)
+    설정 = 유형_설정(프롬프트_종류)
+    입력토큰 = 입력토큰_추정(지문, 추가지시)
+    
+    def 요청():
+        return 헤지_요청(
+            프롬프트_종류, 입력토큰, 지문,
+            model=설정["model"],
+            max_tokens=max_tokens or 설정["max_tokens"],
+            temperature=TEMPERATURE,
+            system=system,
+            messages=messages,
+            stop_sequences=설정["stop_sequences"]
         )
-        
-        결과 = message.content[0].text
-        print(f"[{프롬프트_종류} 완료!]")
-        return 결과
-        
-    except Exception as e:
-        print(f"오류: {str(e)}")
-        return ""
+    
+    # 한도 대기 + 재시도는 스케줄러가 처리, 끝내 실패하면 예외 (빈 결과로 넘어가지 않음)
+    시작 = time.perf_counter()
+    with span(f'api:{프롬프트_종류}', chars=len(지문)) as 정보:
+        message = 스케줄러.call(요청, 프롬프트_종류, 입력토큰)
+        정보.update(output_tokens=message.usage.output_tokens, stop_reason=message.stop_reason)
+    
+    결과 = message.content[0].text
+    print(f"[{프롬프트_종류} 완료!]")
+    사용량_기록(프롬프트_종류, message.usage, time.perf_counter() - 시작, message.stop_reason, 지문)
+    
+    if 캐시_사용 and message.stop_reason != 'max_tokens':
+        응답캐시_가져오기().put(키, 결과, 프롬프트_종류)
+    return 결과
 
 
-# ========== 텍스트 처리 함수 ==========
-def 지문_문단별_태그(지문):
-    """지문을 문단별로 태그 적용"""
-    문단들 = [p.strip() for p in 지문.split('\n\n') if p.strip()]
+def claude_스트리밍_호출(지문, 프롬프트_종류, 줄_처리, 캐시_사용=None):
+    """스트리밍 호출 - 완성된 줄마다 줄_처리(줄) 호출
     
-    if len(문단들) <= 1:
-        문단들 = [p.strip() for p in 지문.split('\n') if p.strip()]
+    반환: (전체 결과, 첫 토큰까지 걸린 초)
+    """
     
-    결과 = []
-    for 문단 in 문단들:
-        if 문단:
-            결과.append(f'[지문또는문단] {문단}')
+    if 캐시_사용 is None:
+        캐시_사용 = 응답캐시_사용
     
-    return '\n\n'.join(결과)
+    시작 = time.perf_counter()
+    
+    if 캐시_사용:
+        키 = 캐시_키(지문, 프롬프트_종류)
+        저장된_결과 = 응답캐시_가져오기().get(키)
+        if 저장된_결과 is not None:
+            print(f"\n[{프롬프트_종류} 캐시 사용]")
+            for line in 저장된_결과.split('\n'):
+                줄_처리(line)
+            return 저장된_결과, time.perf_counter() - 시작
+    
+    client = 클라이언트_가져오기()
+    예산_확인()  # 예산을 다 썼으면 새 호출을 보내지 않음
+    스케줄러 = 스케줄러_가져오기()
+    print(f"\n[{프롬프트_종류} 문제 생성 중... (스트리밍)]")
+    
+    system, messages = 요청_구성(지문, 프롬프트_종류)
+    설정 = 유형_설정(프롬프트_종류)
+    요청_문제수 = TYPE_SHAPES[프롬프트_종류][0]
+    첫토큰 = None
+    조각들 = []
+    남은줄 = ""
+    
+    def 요청():
+        nonlocal 첫토큰, 남은줄
+        정답_수 = 0
+        with client.messages.stream(
+            model=설정["model"],
+            max_tokens=설정["max_tokens"],
+            temperature=TEMPERATURE,
+            system=system,
+            messages=messages,
+            stop_sequences=설정["stop_sequences"]
+        ) as stream:
+            받은_조각 = len(조각들)  # 이번 시도에서 받은 조각부터
+            try:
+                스케줄러.observe(stream.response.headers)
+                for 조각 in stream.text_stream:
+                    if 첫토큰 is None:
+                        첫토큰 = time.perf_counter() - 시작
+                    조각들.append(조각)
+                    남은줄 += 조각
+                    # 완성된 줄만 내보냄
+                    while '\n' in 남은줄:
+                        line, 남은줄 = 남은줄.split('\n', 1)
+                        줄_처리(line)
+                        if line.lstrip().startswith('[교사용정답]'):
+                            정답_수 += 1
+                    if 정답_수 >= 요청_문제수:
+                        # 요청한 문제 수를 다 받았으면 나머지(군말 등)는 받지 않고 끊음
+                        # message_delta 전이라 usage.output_tokens는 message_start 값 → 받은 만큼으로 추정
+                        message = stream.current_message_snapshot
+                        message.usage.output_tokens = max(message.usage.output_tokens,
+                                                          출력토큰_추정(''.join(조각들)))
+                        조각들[-1] = 조각들[-1][:len(조각들[-1]) - len(남은줄)]
+                        남은줄 = ""
+                        return message
+                return stream.get_final_message()
+            except BaseException:
+                # 중간에 끊긴 시도도 받은 만큼 과금됨
+                중단_사용량_기록(프롬프트_종류, stream, 조각들[받은_조각:], time.perf_counter() - 시작,
+                             'aborted', 지문)
+                raise
+    
+    # 이미 내보낸 줄이 있으면 다시 시도하지 않음 (한글에 중복 입력 방지)
+    with span(f'api:{프롬프트_종류}', chars=len(지문), stream=True) as 정보:
+        message = 스케줄러.call(요청, 프롬프트_종류, 입력토큰_추정(지문), can_retry=lambda: not 조각들)
+        정보.update(output_tokens=message.usage.output_tokens, stop_reason=message.stop_reason)
+    
+    if 남은줄:
+        줄_처리(남은줄)
+    
+    결과 = ''.join(조각들)
+    print(f"[{프롬프트_종류} 완료! 첫 토큰 {첫토큰 or 0:.2f}초]")
+    사용량_기록(프롬프트_종류, message.usage, time.perf_counter() - 시작, message.stop_reason, 지문)
+    
+    if 캐시_사용 and message.stop_reason != 'max_tokens':
+        응답캐시_가져오기().put(키, 결과, 프롬프트_종류)
+    return 결과, 첫토큰
 
 
-def 문제번호_제거(텍스트):
-    """문제 번호 제거"""
-    lines = 텍스트.split('\n')
-    결과 = []
+구조화_지시 = f"""
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+**출력 방식 변경:** 위 예시의 문제 구성과 수준을 따르되, 결과는 태그 텍스트가 아니라
+{TOOL_NAME} 도구의 입력으로만 제출하세요.
+- stem: 발문 (문제 번호 없이)
+- bogi: <보기> 내용 줄 목록
+- choices: 선택지 내용 목록 (①② 같은 번호 없이)
+- answer: 정답만, explanation: 해설 (한 줄)"""
+
+
+def claude_구조화_호출(지문, 프롬프트_종류, 캐시_사용=None, 추가지시=None, 문제수=None):
+    """JSON 스키마(도구 사용) 모드 호출 → Question 목록 (문제수: 스키마의 문제 수 변경)"""
     
-    for line in lines:
-        if line.strip().startswith('[문제]'):
-            line = re.sub(r'^\[문제\]\s*\d+\.\s*', '[문제] ', line)
-        결과.append(line)
+    if 캐시_사용 is None:
+        캐시_사용 = 응답캐시_사용
+    
+    tool = tool_for(프롬프트_종류, 문제수)
+    지시 = 구조화_지시 + (f"\n\n{추가지시}" if 추가지시 else "")
+    설정 = 유형_설정(프롬프트_종류)
+    
+    if 캐시_사용:
+        키 = make_key(지문, 프롬프트_종류, 설정["model"],
+                     프롬프트_맵[프롬프트_종류] + 지시 + json.dumps(tool, ensure_ascii=False),
+                     TEMPERATURE, 시스템_프롬프트)
+        저장된_결과 = 응답캐시_가져오기().get(키)
+        if 저장된_결과 is not None:
+            print(f"\n[{프롬프트_종류} 캐시 사용]")
+            return parse_tool_input(json.loads(저장된_결과))
     
-    return '\n'.join(결과)
+    예산_확인()  # 예산을 다 썼으면 새 호출을 보내지 않음
+    스케줄러 = 스케줄러_가져오기()
+    print(f"\n[{프롬프트_종류} 문제 생성 중... (구조화)]")
+    
+    system, messages = 요청_구성(지문, 프롬프트_종류, 지시)
+    
+    입력토큰 = 입력토큰_추정(지문, 지시)
+    
+    def 요청():
+        # 도구 입력(JSON) 안에서 끊기지 않도록 stop sequence는 쓰지 않음
+        return 헤지_요청(
+            프롬프트_종류, 입력토큰, 지문,
+            model=설정["model"],
+            max_tokens=설정["max_tokens"],
+            temperature=TEMPERATURE,
+            system=system,
+            messages=messages,
+            tools=[tool],
+            tool_choice={"type": "tool", "name": TOOL_NAME}
+        )
+    
+    시작 = time.perf_counter()
+    with span(f'api:{프롬프트_종류}', chars=len(지문), structured=True) as 정보:
+        message = 스케줄러.call(요청, 프롬프트_종류, 입력토큰)
+        정보.update(output_tokens=message.usage.output_tokens, stop_reason=message.stop_reason)
+    
+    입력 = next(block.input for block in message.content if block.type == "tool_use")
+    문항들 = parse_tool_input(입력)
+    print(f"[{프롬프트_종류} 완료! {len(문항들)}문항]")
+    사용량_기록(프롬프트_종류, message.usage, time.perf_counter() - 시작, message.stop_reason, 지문)
+    
+    if 캐시_사용 and message.stop_reason != 'max_tokens':
+        응답캐시_가져오기().put(키, json.dumps(입력, ensure_ascii=False), 프롬프트_종류)
+    return 문항들
 
 
-def 태그_수정(텍스트):
-    """잘못된 태그 구조 수정"""
+def 문항_생성(지문, 프롬프트_종류, 추가지시=None, 문제수=None):
+    """한 번 호출해서 검증용 문항 목록(ParsedQuestion)으로"""
+    if 구조화_출력:
+        return from_questions(claude_구조화_호출(지문, 프롬프트_종류, 추가지시=추가지시, 문제수=문제수))
+    return parse_tagged(태그_수정(claude_호출(지문, 프롬프트_종류, 추가지시=추가지시)))
+
+
+def 보완_지시(프롬프트_종류, 부족, 문항들):
+    """모자란 문제만 추가로 요청하는 지시문 (이미 나온 발문과 겹치지 않게)"""
+    지시 = f"""━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+**추가 요청:** 위 예시와 같은 형식으로 {프롬프트_종류} 문제를 **정확히 {부족}개만** 출제하세요."""
+    if 문항들:
+        지시 += "\n아래 이미 출제된 문제와 발문·정답 근거가 겹치지 않아야 합니다.\n"
+        지시 += '\n'.join(f'- {q.stem}' for q in 문항들)
+    return 지시
+
+
+def 검증_요약(보고, 최대=3):
+    문제점 = 보고.problems[:최대]
+    if len(보고.problems) > 최대:
+        문제점.append(f'외 {len(보고.problems) - 최대}건')
+    return ' / '.join(문제점)
+
+
+def 검증_후_보완(지문, 프롬프트_종류, 문항들):
+    """유형별 검증 → 모자란 개수만큼만 다시 요청 (최대 최대_보완횟수번)
     
-    lines = 텍스트.split('\n')
-    결과 = []
+    반환: 통과한 Question 목록
+    """
+    보고 = validate(프롬프트_종류, 문항들)
+    통과 = 보고.valid
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # 쓰레기 문자 제거
-        if any(x in line for x in ['[Odyssey]', '󰂼', '󰃛', '[세부 정보', '[세부 내용']):
+    for 회차 in range(1, 최대_보완횟수 + 1):
+        if not 보고.missing:
+            break
+        print(f"[{프롬프트_종류} 검증] {검증_요약(보고)} → {보고.missing}문제 보완 요청 ({회차}회)")
+        try:
+            추가 = 문항_생성(지문, 프롬프트_종류, 보완_지시(프롬프트_종류, 보고.missing, 통과), 보고.missing)
+        except Exception as e:
+            print(f"⚠️ [{프롬프트_종류} 보완 실패] {e}")
+            break
+        보고 = validate(프롬프트_종류, 추가, expected=보고.missing)
+        통과 = 통과 + 보고.valid
+    
+    if not 통과:
+        # 통과한 문제가 하나도 없으면 버리지 않고 처음 결과를 그대로 사용
+        print(f"⚠️ [{프롬프트_종류} 검증] 통과한 문제 없음 - 검증 전 결과 사용")
+        return [parsed.question for parsed in 문항들]
+    if 보고.missing:
+        print(f"⚠️ [{프롬프트_종류} 검증] {검증_요약(보고)} (보완 실패, {len(통과)}문제만 사용)")
+    return 통과
+
+
+def 구간_지시(프롬프트_종류, 번호, 구간수, 개수):
+    """긴 지문의 한 구간만 보낼 때 붙이는 지시 (최다선지는 선택지 수를 나눔)"""
+    if 프롬프트_종류 == "최다선지":
+        요청 = f"최다선지 문제 1개를 출제하되 선택지는 **정확히 {개수}개**(①부터)만 만드세요."
+    else:
+        요청 = f"{프롬프트_종류} 문제를 **정확히 {개수}개만** 출제하세요."
+    return f"""━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+**나누어 출제:** 위 지문은 긴 글의 {번호}/{구간수} 부분입니다. 이 부분의 내용만으로 {요청}"""
+
+
+def 지문_구간들(지문):
+    """문단 경계에서 구간_최대길이 이하로 나눈 구간 목록"""
+    return ['\n\n'.join(문단들) for 문단들 in split_sections(지문_문단들(지문), 구간_최대길이)]
+
+
+def 분할_생성(지문, 구간들, 최대동시):
+    """긴 지문 → 구간별 생성(동시) → 유형별로 합침 (반환은 문제유형별_생성과 같은 모양)"""
+    
+    print(f"\n[긴 지문 분할] {len(지문)}자 → {len(구간들)}개 구간")
+    길이 = [len(구간) for 구간 in 구간들]
+    
+    작업들 = []
+    for 종류 in 문제_유형:
+        문제수, _, 선택지수 = TYPE_SHAPES[종류]
+        if 종류 == "최다선지" and 구조화_출력:
+            # 스키마가 선택지 20개를 강제하므로 나누지 않음
+            작업들.append(((종류, 0), lambda 종류=종류: 문항_생성(지문, 종류)))
             continue
-        
-        # [지문또는문단] [문제] → [문제]
-        if '[지문또는문단]' in line and '[문제]' in line:
-            line = line.replace('[지문또는문단]', '').strip()
-        
-        # [지문또는문단] [선택지] → [선택지]
-        elif '[지문또는문단]' in line and '[선택지]' in line:
-            line = line.replace('[지문또는문단]', '').strip()
-        
-        # [지문또는문단] [보기] → [보기]
-        elif '[지문또는문단]' in line and '[보기]' in line:
-            line = line.replace('[지문또는문단]', '').strip()
-        
-        # [지문또는문단] [교사용정답] → [교사용정답]
-        elif '[지문또는문단]' in line and ('[교사용정답]' in line or '[해설]' in line):
-            line = line.replace('[지문또는문단]', '').replace('[해설]', '[교사용정답]').strip()
-        
-        # [지문또는문단] ① → [선택지] ①
-        elif '[지문또는문단]' in line and re.search(r'[①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳]', line):
-            line = line.replace('[지문또는문단]', '[선택지]')
-        
-        # 실제 지문 문단만 유지
-        elif line.startswith('[지문또는문단]'):
-            내용 = line.replace('[지문또는문단]', '').strip()
-            if len(내용) > 30:  # 충분히 긴 경우만
-                결과.append(line)
-                continue
-            else:
+        개수들 = allocate(선택지수 if 종류 == "최다선지" else 문제수, 길이)
+        for 번호, (구간, 개수) in enumerate(zip(구간들, 개수들)):
+            if not 개수:
                 continue
-        
-        결과.append(line)
+            지시 = 구간_지시(종류, 번호 + 1, len(구간들), 개수)
+            작업들.append(((종류, 번호), lambda 구간=구간, 종류=종류, 지시=지시, 개수=개수:
+                          문항_생성(구간, 종류, 지시, 개수)))
+    
+    시작 = time.perf_counter()
+    완료, 오류 = run_with_retry_queue(작업들, workers=최대동시, retry_rounds=재시도_큐_횟수)
     
-    return '\n'.join(결과)
+    결과 = {}
+    for 종류 in 문제_유형:
+        구간별 = [[p.question for p in 문항들] for (k, _), 문항들 in 완료.items() if k == 종류]
+        실패 = [f"{번호 + 1}구간: {e}" for (k, 번호), e in 오류.items() if k == 종류]
+        if 실패 and not 구간별:
+            예산_확인()  # 예산 때문에 실패했으면 예산 초과로 알림
+            raise 문제생성오류(f"{종류}: " + ', '.join(실패))
+        if 실패:
+            print(f"⚠️ [{종류}] 일부 구간 실패 - {', '.join(실패)}")
+        문항들 = merge(종류, 구간별)
+        if 검증_사용:
+            # 모자란 문제는 전체 지문으로 보완
+            문항들 = 검증_후_보완(지문, 종류, from_questions(문항들))
+        결과[종류] = render_tags(문항들)
+    
+    print(f"\n✓ 문제 생성 완료 ({time.perf_counter() - 시작:.1f}초, 구간 {len(구간들)}개 × 유형 {len(문제_유형)}개)")
+    return 결과
+
 
+def 유형_생성(지문, 프롬프트_종류):
+    """지문 하나, 유형 하나 생성 → 태그 텍스트"""
+    with span(f'생성:{프롬프트_종류}', chars=len(지문)):
+        if 검증_사용:
+            # 모양이 맞는 문제만 남기고, 모자란 문제만 다시 요청
+            return render_tags(검증_후_보완(지문, 프롬프트_종류, 문항_생성(지문, 프롬프트_종류)))
+        if 구조화_출력:
+            # 태그는 렌더링 때만 붙이므로 태그 수정이 필요 없음
+            return render_tags(claude_구조화_호출(지문, 프롬프트_종류))
+        return 태그_수정(claude_호출(지문, 프롬프트_종류))
 
+
+@traced('문제_생성')
+def 문제유형별_생성(지문, 최대동시=None):
+    """세 유형 문제를 동시에 생성 (결과는 유형 순서 유지)"""
+    
+    if 최대동시 is None:
+        최대동시 = 최대_동시호출
+    
+    if 긴지문_분할 and len(지문) > 분할_기준_길이:
+        구간들 = 지문_구간들(지문)
+        if len(구간들) > 1:
+            return 분할_생성(지문, 구간들, 최대동시)
+    
+    시작 = time.perf_counter()
+    # 재시도를 다 쓴 유형은 재시도 큐로 → 나머지가 끝난 뒤 다시 실행
+    결과, 오류 = run_with_retry_queue(
+        [(종류, lambda 종류=종류: 유형_생성(지문, 종류)) for 종류 in 문제_유형],
+        workers=최대동시, retry_rounds=재시도_큐_횟수,
+    )
+    if 오류:
+        예산_확인()
+        raise 문제생성오류(', '.join(f"{종류}: {e}" for 종류, e in 오류.items()))
+    print(f"\n✓ 문제 생성 완료 ({time.perf_counter() - 시작:.1f}초, 동시 {최대동시}개)")
+    return 결과
+
+
+# ========== 텍스트 처리 함수 ==========
+def 지문_문단들(지문):
+    """지문 → 문단 목록 (빈 줄 기준, 빈 줄이 없으면 줄 기준)"""
+    문단들 = [p.strip() for p in 지문.split('\n\n') if p.strip()]
+    
+    if len(문단들) <= 1:
+        문단들 = [p.strip() for p in 지문.split('\n') if p.strip()]
+    
+    return 문단들
+
+
+def 지문_문단별_태그(지문):
+    """지문을 문단별로 태그 적용"""
+    결과 = []
+    for 문단 in 지문_문단들(지문):
+        if 문단:
+            결과.append(f'[지문또는문단] {문단}')
+    
+    return '\n\n'.join(결과)
+
+
+@traced('태그_수정')
+def 태그_수정(텍스트):
+    """잘못된 태그 구조 수정 (문제 번호 제거 포함, tag_tokenizer.repair_line)"""
+    return repair_text(텍스트)
+
+
+@traced('HTML_변환')
 def 태그텍스트를_HTML로_변환(태그텍스트):
     """태그 텍스트 → HTML"""
     
@@ -294,11 +999,45 @@ def 태그텍스트를_HTML로_변환(태그텍스트):
     return '\n'.join(html_lines)
 
 
+def 전체내용_조립(지문, 결과):
+    """지문 + 유형별 결과 → 전체 태그 텍스트"""
+    
+    태그_지문 = 지문_문단별_태그(지문)
+    
+    return f"""{태그_지문}
+
+━━━━━━━━━━━━━━━━━━━━━━
+
+▣ 보기형 문제
+
+{결과["보기형"]}
+
+━━━━━━━━━━━━━━━━━━━━━━
+
+▣ OX 문제
+
+{결과["OX"]}
+
+━━━━━━━━━━━━━━━━━━━━━━
+
+▣ 최다선지 문제
+
+{결과["최다선지"]}
+"""
+
+
+def 결과파일_이름(파일명):
+    """시각을 붙인 결과 파일 이름"""
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(결과_폴더, f"{timestamp}_{파일명}")
+
+
+@traced('HTML파일_저장')
 def HTML파일_저장(html_내용, 파일명):
     """HTML 파일 저장"""
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    전체파일명 = f"{timestamp}_{파일명}"
+    전체파일명 = 결과파일_이름(파일명)
     
     with open(전체파일명, 'w', encoding='utf-8') as f:
         f.write(html_내용)
@@ -307,98 +1046,73 @@ def HTML파일_저장(html_내용, 파일명):
     return 전체파일명
 
 
+def HTML파일_비동기_저장(태그텍스트, 파일명):
+    """HTML 변환 + 저장을 백그라운드 스레드에서 (입력 단계를 막지 않음)"""
+    
+    thread = threading.Thread(
+        target=lambda: HTML파일_저장(태그텍스트를_HTML로_변환(태그텍스트), 파일명),
+        daemon=False,
+    )
+    thread.start()
+    return thread
+
+
+@traced('HWPX파일_저장')
+def HWPX파일_저장(토큰들, 파일명):
+    """Token 목록 → HWPX 파일 (키 입력 없이)"""
+    
+    entries = [(token.text, token.type, STYLE_NAMES[token.style]) for token in 토큰들]
+    
+    없는_스타일 = write_hwpx(build_paragraphs(entries), 파일명, HWPX_템플릿)
+    if 없는_스타일:
+        print(f"⚠️  템플릿에 없는 스타일 (바탕글로 대체): {', '.join(sorted(없는_스타일))}")
+    print(f"✓ HWPX 저장: {파일명}")
+    return 파일명
+
+
 # ========== 한글 자동화 함수 ==========
 def get_style_shortcut(text):
     """태그에 따라 단축키 반환"""
-    if text.startswith('[문제]'):
-        return 'ctrl+3'
-    elif text.startswith('[교사용정답]'):
-        return 'ctrl+5'
-    elif text.startswith('[선택지]'):
-        return 'ctrl+4'
-    elif text.startswith('[보기]'):
-        return 'ctrl+7'
-    elif text.startswith('[지문또는문단]'):
-        return 'ctrl+2'
-    else:
-        return 'ctrl+1'
+    return GENERATOR_TAGS.lookup(split_tag(text)[0])[1]
 
 
 def clean_text_content(text):
     """태그 제거"""
-    cleaned = re.sub(r'^\[[^\]]+\]\s*', '', text)
-    return cleaned.strip()
+    return split_tag(text)[1]
 
 
 def get_content_type(text):
     """내용 유형 판단"""
-    if text.startswith('[지문또는문단]'):
-        return 'content'
-    elif text.startswith('[문제]'):
-        return 'question'
-    elif text.startswith('[보기]'):
-        return 'choice'
-    elif text.startswith('[선택지]'):
-        return 'option'
-    elif text.startswith('[교사용정답]'):
-        return 'answer'
-    else:
-        return 'other'
+    return GENERATOR_TAGS.lookup(split_tag(text)[0])[0]
+
 
+# 공백줄 상태(prev_type, choice_started, option_started)는 컴파일러가 관리
+서식_컴파일러 = PlanCompiler()
+_서식_실행기 = None
 
+
+def 서식_실행기():
+    """pyautogui 실행기 (처음 사용할 때 생성)"""
+    
+    global _서식_실행기
+    if _서식_실행기 is None:
+        _서식_실행기 = PyAutoGuiExecutor(pacer=Pacer.load() if 적응형_속도 else None)
+        _서식_실행기.pyautogui.FAILSAFE = True  # 마우스를 화면 모서리로 옮기면 중단
+    return _서식_실행기
+
+
+def 서식_항목(text):
+    """태그 텍스트 → (내용, 유형, 단축키)"""
+    token = make_token(text, GENERATOR_TAGS)
+    return token.text, token.type, token.style
+
+
+@traced('apply_hwp_formatting')
 def apply_hwp_formatting(text):
     """한글에 서식 적용"""
     
     try:
-        clean_content = clean_text_content(text)
-        current_type = get_content_type(text)
-        
-        if current_type == 'question':
-            apply_hwp_formatting.choice_started = False
-            apply_hwp_formatting.option_started = False
-        
-        if hasattr(apply_hwp_formatting, 'prev_type') and apply_hwp_formatting.prev_type:
-            prev_type = apply_hwp_formatting.prev_type
-            need_blank = False
-            
-            if prev_type == 'content' and current_type == 'question':
-                need_blank = True
-            elif prev_type == 'question' and current_type == 'choice' and not apply_hwp_formatting.choice_started:
-                need_blank = True
-                apply_hwp_formatting.choice_started = True
-            elif prev_type == 'choice' and current_type == 'option' and not apply_hwp_formatting.option_started:
-                need_blank = True
-                apply_hwp_formatting.option_started = True
-            
-            if need_blank:
-                pyautogui.hotkey('ctrl', '5')
-                time.sleep(0.1)
-                pyautogui.press('enter')
-                time.sleep(0.1)
-        
-        pyperclip.copy(clean_content)
-        time.sleep(0.1)
-        pyautogui.hotkey('ctrl', 'v')
-        time.sleep(0.4)
-        
-        pyautogui.hotkey('shift', 'home')
-        time.sleep(0.1)
-        
-        style = get_style_shortcut(text)
-        keys = style.split('+')
-        pyautogui.hotkey(*keys)
-        time.sleep(0.3)
-        
-        pyautogui.press('end')
-        
-        if current_type in ['choice', 'option']:
-            pyautogui.press('enter', presses=1)
-        else:
-            pyautogui.press('enter', presses=2)
-        
-        time.sleep(0.1)
-        
-        apply_hwp_formatting.prev_type = current_type
+        run_actions(서식_컴파일러.compile_item(*서식_항목(text)), 서식_실행기())
         return True
         
     except Exception as e:
@@ -406,8 +1120,10 @@ def apply_hwp_formatting(text):
         return False
 
 
+@traced('analyze_html_content')
 def analyze_html_content(html_content):
     """HTML 파싱"""
+    from bs4 import BeautifulSoup
     
     soup = BeautifulSoup(html_content, 'html.parser')
     items = []
@@ -422,58 +1138,236 @@ def analyze_html_content(html_content):
     return items
 
 
-def 한글자동화_실행(html_파일경로):
-    """한글 자동화 실행"""
+@traced('한글창_준비')
+def 한글창_준비():
+    """한글 창 활성화 대기 (최대 5초) + 서식 상태 초기화"""
     
-    print("\n[한글 자동화 시작]")
+    print("→ 한글 창이 활성화되면 자동 입력 시작 (최대 5초)...")
+    print("   (한글 창을 활성화하세요)")
     
-    with open(html_파일경로, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    if 적응형_속도:
+        wait_for_window('한글', timeout=5)
+    else:
+        import pyautogui
+        try:
+            windows = pyautogui.getWindowsWithTitle('한글')
+            if windows:
+                windows[0].activate()
+        except:
+            pass
+        
+        for i in range(5, 0, -1):
+            print(f"   {i}초...")
+            time.sleep(1)
     
-    items = analyze_html_content(html_content)
-    print(f"→ {len(items)}개 항목 감지")
+    print("→ 시작!")
     
-    print("→ 5초 후 한글에 자동 입력 시작...")
-    print("   (한글 창을 활성화하세요)")
+    서식_컴파일러.inherit_style = 스타일_이어받기
+    서식_컴파일러.reset()
+
+
+def 키입력_계획(토큰들):
+    """Token 목록 → 항목별 키 입력 동작 목록"""
+    return PlanCompiler(스타일_이어받기).compile([(t.text, t.type, t.style) for t in 토큰들])
+
+
+def 드라이런_보고(토큰들):
+    """키 입력 없이 동작 수 / 예상 시간 출력"""
     
-    try:
-        windows = pyautogui.getWindowsWithTitle('한글')
-        if windows:
-            windows[0].activate()
-    except:
-        pass
+    계획 = 키입력_계획(토큰들)
+    실행기 = RecordingExecutor()
+    for 동작들 in 계획:
+        run_actions(동작들, 실행기)
+    
+    보고 = 실행기.report(len(토큰들))
+    print(f"→ [드라이런] 동작 {보고['actions']}개 · 호출 {보고['round_trips']}회 · "
+          f"예상 {보고['projected_seconds']}초 (항목당 {보고.get('seconds_per_item', 0)}초)")
+    print(f"   {보고['counts']}")
+    return 보고
+
+
+def 토큰_자동화_실행(토큰들, dry_run=None, 출처=None):
+    """Token 목록을 한글에 바로 입력 (파일을 거치지 않음)"""
     
-    for i in range(5, 0, -1):
-        print(f"   {i}초...")
-        time.sleep(1)
+    if dry_run is None:
+        dry_run = 드라이런
     
-    print("→ 시작!")
+    print(f"→ {len(토큰들)}개 항목")
     
-    apply_hwp_formatting.prev_type = None
-    apply_hwp_formatting.choice_started = False
-    apply_hwp_formatting.option_started = False
+    if dry_run:
+        return 드라이런_보고(토큰들)
+    
+    return 항목_입력([(t.text, t.type, t.style) for t in 토큰들], 출처=출처)
+
+
+def 항목_입력(항목들, 재개=None, 출처=None):
+    """(내용, 유형, 단축키) 목록을 한글에 입력 + 항목마다 체크포인트 (재개: 남은 기록이면 그 다음 항목부터)"""
+    
+    # 공백줄 상태가 앞 항목들에 따라 정해지므로 계획은 항상 처음부터 만들고, 입력한 항목만 건너뜀
+    상태들 = []
+    계획 = PlanCompiler(스타일_이어받기).compile(항목들, 상태들)
+    시작 = 재개['done'] if 재개 else 0
+    if 시작 and 상태들[시작 - 1] != 재개['state']:
+        print("⚠️  기록된 공백줄 상태와 다시 계산한 상태가 다릅니다 - 다시 계산한 상태로 이어서 입력")
+    
+    기록 = TypingJournal(입력_기록_경로) if 입력_기록_경로 else None
+    if 기록 and 재개:
+        기록.resume(재개)
+    elif 기록:
+        기록.begin(항목들, 출처)
+    
+    한글창_준비()
+    실행기 = 서식_실행기()
     
     success = 0
-    for i, item in enumerate(items, 1):
+    중단 = False
+    for i in range(시작, len(계획)):
+        번호 = i + 1
+        실패 = False
         try:
-            if apply_hwp_formatting(item['text']):
-                success += 1
+            with span('apply_hwp_formatting', item=번호):
+                run_actions(계획[i], 실행기)
+            success += 1
             
-            if i % 10 == 0:
-                print(f"   진행: {i}/{len(items)}")
+            if 번호 % 10 == 0:
+                print(f"   진행: {번호}/{len(항목들)}")
             
         except KeyboardInterrupt:
             print("\n중단됨")
+            중단 = True
             break
         except Exception as e:
+            if is_failsafe(e):
+                # 마우스를 화면 모서리로 옮김 → 남은 항목도 모두 실패하므로 멈춤
+                print("\n중단됨 (FAILSAFE)")
+                중단 = True
+                break
             print(f"오류: {e}")
+            실패 = True
+        if 기록:
+            기록.confirm(번호, 상태들[i], 실패)
+    
+    print(f"✓ 완료: {success}/{len(항목들) - 시작} 성공")
+    if 기록 and 중단:
+        print(f"→ {기록_설명(기록.data)} - 마지막 항목이 일부만 입력됐으면 지운 뒤 --resume으로 이어서 입력")
+    elif 기록:
+        기록.finish()
+    if 실행기.pacer:
+        실행기.pacer.print_summary()
+
+
+def 입력_재개(확인=True):
+    """남은 체크포인트에서 이어서 한글 입력"""
+    
+    재개 = TypingJournal.load(입력_기록_경로) if 입력_기록_경로 else None
+    if 재개 is None:
+        print(f"이어서 입력할 기록이 없습니다: {입력_기록_경로}")
+        return
+    print(f"[이어서 입력] {재개.get('source') or '생성 결과'} - {기록_설명(재개)}")
+    if 확인:
+        input("한글 문서에서 일부만 입력된 항목을 지우고, 입력이 멈춘 빈 줄에 커서를 둔 채 Enter를 누르세요...")
+    항목_입력(재개['entries'], 재개)
+
+
+def 한글자동화_실행(html_파일경로, dry_run=None):
+    """HTML 파일을 읽어서 한글 자동화 실행"""
+    
+    print("\n[한글 자동화 시작]")
+    
+    with open(html_파일경로, 'r', encoding='utf-8') as f:
+        html_content = f.read()
     
-    print(f"✓ 완료: {success}/{len(items)} 성공")
+    items = analyze_html_content(html_content)
+    return 토큰_자동화_실행([make_token(item['text'], GENERATOR_TAGS) for item in items], dry_run, html_파일경로)
+
+
+def 스트리밍_자동화_실행(지문):
+    """생성과 한글 입력을 겹쳐서 실행 (줄 단위 큐)"""
+    
+    print("\n[스트리밍 생성 + 한글 자동화 시작]")
+    시작 = time.perf_counter()
+    
+    큐 = {종류: queue.Queue() for 종류 in 문제_유형}
+    결과 = {}
+    첫토큰 = {}
+    실패 = []
+    
+    def 생성(종류):
+        def 줄_처리(line):
+            line = repair_line(line)
+            if line:
+                큐[종류].put(line)
+        
+        try:
+            원문, 첫토큰[종류] = claude_스트리밍_호출(지문, 종류, 줄_처리)
+            결과[종류] = 태그_수정(원문)
+        except Exception as e:
+            print(f"❌ 오류 ({종류}): {e}")
+            결과[종류] = ""
+            실패.append(종류)
+        finally:
+            큐[종류].put(None)
+    
+    pool = ThreadPoolExecutor(max_workers=max(1, 최대_동시호출))
+    for 종류 in 문제_유형:
+        pool.submit(생성, 종류)
+    
+    def 입력할_항목():
+        for line in 지문_문단별_태그(지문).split('\n'):
+            if line.strip():
+                yield line.strip()
+        for 종류 in 문제_유형:
+            yield "━" * 22
+            yield f"▣ {종류} 문제"
+            while True:
+                line = 큐[종류].get()
+                if line is None:
+                    break
+                yield line
+    
+    첫항목 = None
+    success = 0
+    total = 0
+    try:
+        # 생성이 진행되는 동안 카운트다운 (여기서 실패해도 아래 finally에서 생성 작업을 정리)
+        한글창_준비()
+        for item in 입력할_항목():
+            total += 1
+            if apply_hwp_formatting(item):
+                success += 1
+            if 첫항목 is None:
+                첫항목 = time.perf_counter() - 시작
+            if total % 10 == 0:
+                print(f"   진행: {total}")
+    except KeyboardInterrupt:
+        print("\n중단됨")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    print(f"✓ 완료: {success}/{total} 성공")
+    if 실패:
+        print(f"❌ 생성 실패 (재시도 후): {', '.join(실패)} - 해당 섹션이 비어 있습니다")
+    if 적응형_속도 and _서식_실행기 is not None:
+        _서식_실행기.pacer.print_summary()
+    for 종류 in 문제_유형:
+        if 첫토큰.get(종류) is not None:
+            print(f"   {종류} 첫 토큰: {첫토큰[종류]:.2f}초")
+    if 첫항목 is not None:
+        print(f"   첫 항목 입력까지: {첫항목:.2f}초 / 전체 {time.perf_counter() - 시작:.1f}초")
+    
+    if HTML_저장 and len(결과) == len(문제_유형):
+        HTML파일_비동기_저장(전체내용_조립(지문, 결과), "문제.html").join()
+    return 결과
 
 
 # ========== 메인 함수 ==========
-def 메인실행():
-    """통합 메인"""
+def 종료_대기(대기=True):
+    if 대기:
+        input("\nEnter를 눌러 종료...")
+
+
+def 메인실행(지문=None, 대기=True):
+    """통합 메인 (지문을 주면 입력 단계 생략, 대기=False면 Enter 대기 없이 끝냄)"""
     
     print("=" * 60)
     print("     국어 문제 자동 생성 + 한글 자동화 통합")
@@ -481,23 +1375,27 @@ def 메인실행():
     
     if API_KEY == "여기에_실제_API_키_입력":
         print("⚠️  API 키를 설정하세요")
-        input("\nEnter...")
+        종료_대기(대기)
         return
     
-    print("\n지문을 입력하세요 (Enter 3번):")
-    print("-" * 60)
+    클라이언트_예열()
     
-    lines = []
-    empty = 0
-    while empty < 2:
-        line = input()
-        if line == "":
-            empty += 1
-        else:
+    if 지문 is None:
+        print("\n지문을 입력하세요 (Enter 3번):")
+        print("-" * 60)
+        
+        with span('지문_입력'):
+            lines = []
             empty = 0
-            lines.append(line)
-    
-    지문 = "\n".join(lines)
+            while empty < 2:
+                line = input()
+                if line == "":
+                    empty += 1
+                else:
+                    empty = 0
+                    lines.append(line)
+            
+            지문 = "\n".join(lines)
     
     if not 지문.strip():
         print("지문 없음")
@@ -505,62 +1403,411 @@ def 메인실행():
     
     print(f"\n✓ 지문 입력 완료 ({len(지문)}자)")
     
+    # 스트리밍은 한글에 바로 입력할 때만 (드라이런 / HWPX 저장은 아래 일반 경로)
+    if 스트리밍_모드 and not 드라이런 and 출력_방식 != "hwpx":
+        print("\n" + "=" * 60)
+        스트리밍_자동화_실행(지문)
+        유형별_통계_출력()
+        print("\n" + "=" * 60)
+        print("     🎉 모든 작업 완료!")
+        print("=" * 60)
+        종료_대기(대기)
+        return
+    
     print("\n" + "=" * 60)
     print("문제 생성 중...")
     print("=" * 60)
     
-    결과 = {}
-    for 종류 in ["보기형", "OX", "최다선지"]:
-        결과[종류] = claude_호출(지문, 종류)
-        결과[종류] = 문제번호_제거(결과[종류])
-        결과[종류] = 태그_수정(결과[종류])
+    try:
+        결과 = 문제유형별_생성(지문)
+    except (문제생성오류, BudgetExceeded) as e:
+        # 빈 섹션이 있는 문서를 만들지 않고 중단
+        print(f"\n❌ 문제 생성 실패 - {e}")
+        종료_대기(대기)
+        return
+    유형별_통계_출력()
     
-    태그_지문 = 지문_문단별_태그(지문)
+    전체내용 = 전체내용_조립(지문, 결과)
+    토큰들 = tokenize(전체내용, GENERATOR_TAGS)
+    
+    # HTML은 기록용 - 한글 입력과 별개로 백그라운드에서 저장
+    html_저장_작업 = HTML파일_비동기_저장(전체내용, "문제.html") if HTML_저장 else None
+    
+    print("\n" + "=" * 60)
+    if 출력_방식 == "hwpx":
+        HWPX파일_저장(토큰들, 결과파일_이름("문제.hwpx"))
+    else:
+        print("\n[한글 자동화 시작]")
+        토큰_자동화_실행(토큰들)
     
-    전체내용 = f"""{태그_지문}
+    if html_저장_작업:
+        html_저장_작업.join()
+    
+    print("\n" + "=" * 60)
+    print("     🎉 모든 작업 완료!")
+    print("=" * 60)
+    종료_대기(대기)
 
-━━━━━━━━━━━━━━━━━━━━━━
 
-▣ 보기형 문제
+# ========== 배치 실행 ==========
+def 배치_지문_읽기(입력경로):
+    """폴더(*.txt), JSONL 파일 또는 텍스트 파일 하나에서 (id, 지문) 목록 읽기"""
+    
+    지문목록 = []
+    
+    if not 입력경로.endswith('.jsonl') and os.path.isfile(입력경로):
+        with open(입력경로, 'r', encoding='utf-8') as f:
+            지문목록.append((os.path.splitext(os.path.basename(입력경로))[0], f.read()))
+    elif os.path.isdir(입력경로):
+        for 파일명 in sorted(os.listdir(입력경로)):
+            if not 파일명.endswith('.txt'):
+                continue
+            with open(os.path.join(입력경로, 파일명), 'r', encoding='utf-8') as f:
+                지문목록.append((os.path.splitext(파일명)[0], f.read()))
+    else:
+        with open(입력경로, 'r', encoding='utf-8') as f:
+            for 번호, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                항목 = json.loads(line)
+                지문 = 항목.get('지문') or 항목.get('passage') or 항목.get('text') or ''
+                지문목록.append((str(항목.get('id', 번호)), 지문))
+    
+    return 지문목록
 
-{결과["보기형"]}
 
-━━━━━━━━━━━━━━━━━━━━━━
+묶음_통계 = {'packs': 0, 'packed': 0, 'rerun': 0}
 
-▣ OX 문제
 
-{결과["OX"]}
+def 묶음_지시(프롬프트_종류, 개수):
+    return f"""━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-━━━━━━━━━━━━━━━━━━━━━━
+**여러 지문 묶음:** 위에는 지문 {개수}개가 [[지문 P1]], [[지문 P2]] … 구분줄로 나뉘어 있습니다.
+- 지문마다 따로, 위 형식대로 {프롬프트_종류} 문제를 출제하세요 (문제 수도 지문마다 예시와 같게).
+- 각 지문의 문제 앞에 그 지문의 구분줄(예: [[지문 P1]])을 한 줄로 그대로 쓰세요.
+- 한 지문의 문제에 다른 지문의 내용을 섞지 마세요.
+- [끝]은 마지막 지문의 문제까지 모두 쓴 뒤 한 번만 쓰세요."""
 
-▣ 최다선지 문제
 
-{결과["최다선지"]}
-"""
+def 묶음_생성(지문들, 최대동시=None):
+    """짧은 지문 여러 개 → 유형마다 한 번만 호출 → 지문별 결과 목록 (각각 문제유형별_생성과 같은 모양)
     
-    print("\n" + "=" * 60)
-    print("HTML 변환 중...")
-    print("-" * 60)
+    구분줄이 깨졌거나 다른 지문 내용으로 보이는 결과는 그 지문만 따로 다시 생성
+    """
     
-    html내용 = 태그텍스트를_HTML로_변환(전체내용)
-    html파일 = HTML파일_저장(html내용, "문제.html")
+    if 최대동시 is None:
+        최대동시 = 최대_동시호출
     
-    print("\n" + "=" * 60)
-    한글자동화_실행(html파일)
+    묶은_지문 = join_passages(지문들)
     
-    print("\n" + "=" * 60)
-    print("     🎉 모든 작업 완료!")
-    print("=" * 60)
-    input("\nEnter를 눌러 종료...")
+    def 생성(종류):
+        # 출력 길이는 지문 수만큼 늘림 (모델의 출력 상한 이하, 넘쳐서 빠진 지문은 아래에서 따로 다시 생성)
+        설정 = 유형_설정(종류)
+        원문 = claude_호출(묶은_지문, 종류, 추가지시=묶음_지시(종류, len(지문들)),
+                        max_tokens=min(설정["max_output"], 설정["max_tokens"] * len(지문들)))
+        텍스트들, 깨짐 = split_output(원문, len(지문들))
+        다시 = 깨짐 | misattributed(텍스트들, 지문들)
+        
+        결과 = []
+        for 번호, (지문, 텍스트) in enumerate(zip(지문들, 텍스트들)):
+            if 번호 in 다시:
+                print(f"[{종류} 묶음] {번호 + 1}번 지문 결과가 없거나 다른 지문 내용 → 이 지문만 다시 생성")
+                with _사용량_잠금:
+                    묶음_통계['rerun'] += 1
+                결과.append(유형_생성(지문, 종류))
+            elif 검증_사용:
+                결과.append(render_tags(검증_후_보완(지문, 종류, parse_tagged(태그_수정(텍스트)))))
+            else:
+                결과.append(태그_수정(텍스트))
+        return 결과
+    
+    완료, 오류 = run_with_retry_queue(
+        [(종류, lambda 종류=종류: 생성(종류)) for 종류 in 문제_유형],
+        workers=최대동시, retry_rounds=재시도_큐_횟수,
+    )
+    if 오류:
+        예산_확인()
+        raise 문제생성오류(', '.join(f"{종류}: {e}" for 종류, e in 오류.items()))
+    
+    with _사용량_잠금:
+        묶음_통계['packs'] += 1
+        묶음_통계['packed'] += len(지문들)
+    return [{종류: 완료[종류][번호] for 종류 in 문제_유형} for 번호 in range(len(지문들))]
+
+
+def 입력_목록_읽기(입력들):
+    """파일 / 폴더 / glob 패턴 목록 → (id, 지문) 목록"""
+    
+    지문목록 = []
+    for 입력 in 입력들:
+        경로들 = sorted(glob.glob(입력)) if glob.has_magic(입력) else [입력]
+        if not 경로들:
+            print(f"⚠️  일치하는 파일 없음: {입력}")
+        for 경로 in 경로들:
+            지문목록.extend(배치_지문_읽기(경로))
+    return 고유_id(지문목록)
+
+
+def 고유_id(지문목록):
+    """겹치는 id에 -2, -3 … 을 붙임 (a/1.txt와 b/1.txt가 같은 1.html에 덮어쓰지 않게)"""
+    
+    쓴_id = {지문_id for 지문_id, _ in 지문목록}
+    본_id = set()
+    결과 = []
+    for 지문_id, 지문 in 지문목록:
+        새_id = 지문_id
+        if 지문_id in 본_id:
+            번호 = 2
+            while f"{지문_id}-{번호}" in 쓴_id:
+                번호 += 1
+            새_id = f"{지문_id}-{번호}"
+            쓴_id.add(새_id)
+            print(f"⚠️  지문 id 중복: {지문_id} → {새_id}")
+        본_id.add(새_id)
+        결과.append((새_id, 지문))
+    return 결과
+
+
+def 지문_처리(지문, 결과=None):
+    """지문 하나 → HTML (생성 → 번호 제거 → 태그 수정 → HTML 변환, 결과가 있으면 생성 생략)"""
+    
+    if 결과 is None:
+        결과 = 문제유형별_생성(지문)
+    빈_유형 = [종류 for 종류 in 문제_유형 if not 결과[종류].strip()]
+    html내용 = 태그텍스트를_HTML로_변환(전체내용_조립(지문, 결과))
+    return html내용, 결과, 빈_유형
+
+
+def 배치실행(입력경로, 출력폴더, 작업자수=4):
+    """여러 지문을 한 번에 처리 (지문별 HTML + manifest.json, 입력경로는 경로 하나 또는 목록)"""
+    
+    지문목록 = 입력_목록_읽기([입력경로] if isinstance(입력경로, str) else 입력경로)
+    os.makedirs(출력폴더, exist_ok=True)
+    
+    print(f"\n[배치 시작] 지문 {len(지문목록)}개, 작업자 {작업자수}명")
+    클라이언트_예열()
+    
+    def 처리(지문_id, 지문, 결과=None):
+        """지문 하나 처리 → 기록 (실패하면 예외, 재시도 큐로 감)"""
+        시작 = time.perf_counter()
+        기록 = {'id': 지문_id, 'chars': len(지문)}
+        
+        try:
+            with span('지문', id=지문_id, chars=len(지문)):
+                html내용, 결과, 빈_유형 = 지문_처리(지문, 결과)
+        except Exception as e:
+            print(f"   [failed] {지문_id} ({time.perf_counter() - 시작:.2f}초) {e}")
+            raise
+        
+        출력파일 = os.path.join(출력폴더, f"{지문_id}.html")
+        with open(출력파일, 'w', encoding='utf-8') as f:
+            f.write(html내용)
+        토큰들 = tokenize(전체내용_조립(지문, 결과), GENERATOR_TAGS)
+        if 출력_방식 == "hwpx":
+            HWPX파일_저장(토큰들, os.path.join(출력폴더, f"{지문_id}.hwpx"))
+        if 드라이런:
+            # 한글에 입력한다면 걸릴 키 입력 수 / 시간
+            기록['keystrokes'] = 드라이런_보고(토큰들)
+        
+        기록.update(
+            status='failed' if 빈_유형 else 'ok',
+            output=출력파일,
+            types={종류: len(결과[종류]) for 종류 in 문제_유형},
+        )
+        if 빈_유형:
+            기록['error'] = f"빈 결과: {', '.join(빈_유형)}"
+        
+        기록['seconds'] = round(time.perf_counter() - 시작, 2)
+        print(f"   [{기록['status']}] {지문_id} ({기록['seconds']}초)")
+        return 기록
+    
+    def 묶음_처리(묶음):
+        """짧은 지문 묶음 → 기록 목록"""
+        결과들 = 묶음_생성([지문 for _, 지문 in 묶음])
+        return [처리(지문목록[번호][0], 지문, 결과) for (번호, 지문), 결과 in zip(묶음, 결과들)]
+    
+    # 짧은 지문은 묶어서 한 요청으로 (구조화 출력은 도구 스키마가 지문 하나 기준이라 제외)
+    묶음들 = []
+    if 짧은지문_묶음 and not 구조화_출력:
+        짧은_지문 = [(번호, 지문) for 번호, (_, 지문) in enumerate(지문목록)
+                   if 지문.strip() and len(지문) <= 묶음_기준_길이]
+        묶음들 = [묶음 for 묶음 in pack(짧은_지문, 묶음_최대글자, 묶음_최대개수) if len(묶음) > 1]
+        if 묶음들:
+            print(f"[묶음] 짧은 지문 {sum(len(묶음) for 묶음 in 묶음들)}개 → 요청 묶음 {len(묶음들)}개")
+    묶인_번호 = {번호 for 묶음 in 묶음들 for 번호, _ in 묶음}
+    
+    시작 = time.perf_counter()
+    작업들 = [((번호,), lambda 지문_id=지문_id, 지문=지문: [처리(지문_id, 지문)])
+             for 번호, (지문_id, 지문) in enumerate(지문목록) if 지문.strip() and 번호 not in 묶인_번호]
+    작업들 += [(tuple(번호 for 번호, _ in 묶음), lambda 묶음=묶음: 묶음_처리(묶음)) for 묶음 in 묶음들]
+    완료, 오류 = run_with_retry_queue(작업들, workers=작업자수, retry_rounds=재시도_큐_횟수)
+    
+    번호별_기록 = {}
+    for 번호들, 기록_목록 in 완료.items():
+        번호별_기록.update(zip(번호들, 기록_목록))
+    for 번호들, e in 오류.items():
+        for 번호 in 번호들:
+            # 예산 초과로 시작하지 못한 지문은 실패가 아니라 건너뜀
+            번호별_기록[번호] = {'id': 지문목록[번호][0], 'chars': len(지문목록[번호][1]),
+                            'status': 'skipped' if isinstance(e, BudgetExceeded) else 'failed',
+                            'error': str(e)}
+    
+    기록들 = []
+    for 번호, (지문_id, 지문) in enumerate(지문목록):
+        기록들.append(번호별_기록.get(번호) or
+                    {'id': 지문_id, 'chars': len(지문), 'status': 'skipped', 'error': '지문 없음'})
+    
+    manifest = {
+        'input': 입력경로,
+        'model': MODEL,
+        'models': {종류: 유형_설정(종류)['model'] for 종류 in 문제_유형},
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'seconds': round(time.perf_counter() - 시작, 2),
+        'total': len(기록들),
+        'ok': sum(1 for r in 기록들 if r['status'] == 'ok'),
+        'failed': sum(1 for r in 기록들 if r['status'] == 'failed'),
+        'skipped': sum(1 for r in 기록들 if r['status'] == 'skipped'),
+        'usage': dict(토큰_사용량),
+        'budget': 예산_가져오기().summary(),
+        'ledger': 사용량_장부_경로,
+        'cache': 응답캐시_가져오기().stats() if 응답캐시_사용 else None,
+        'connections': 연결_재사용_통계(),
+        'scheduler': 스케줄러_가져오기().summary(),
+        'hedging': dict(헤지_통계),
+        'packing': dict(묶음_통계),
+        'per_type': 유형별_통계_요약(),
+        'passages': 기록들,
+    }
+    
+    manifest파일 = os.path.join(출력폴더, 'manifest.json')
+    with open(manifest파일, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    
+    print(f"✓ 배치 완료: {manifest['ok']}/{manifest['total']} 성공 ({manifest['seconds']}초)")
+    print(f"✓ 토큰: 입력 {토큰_사용량['input']} · 캐시읽기 {토큰_사용량['cache_read']} · "
+          f"캐시쓰기 {토큰_사용량['cache_write']} · 출력 {토큰_사용량['output']}")
+    예산 = manifest['budget']
+    print(f"✓ 비용: ${예산['cost']:.4f}" + (f" · 예산 초과 → 건너뜀 {manifest['skipped']}개" if 예산_가져오기().exhausted() else ""))
+    if manifest['cache']:
+        print(f"✓ 캐시: 적중 {manifest['cache']['hits']} · 실패 {manifest['cache']['misses']}")
+    print(f"✓ 연결: 요청 {manifest['connections']['requests']} · "
+          f"새 연결 {manifest['connections']['connections']} · 재사용 {manifest['connections']['reused']}")
+    스케줄 = manifest['scheduler']
+    print(f"✓ 스케줄러: 호출 {스케줄['calls']} · 재시도 {스케줄['retries']} · "
+          f"429 {스케줄['rate_limited']} · 한도 대기 {스케줄['waited']}초")
+    print(f"✓ 헤지: 호출 {헤지_통계['calls']} · 추가 요청 {헤지_통계['hedged']} · 헤지가 이김 {헤지_통계['hedge_won']}")
+    유형별_통계_출력()
+    print(f"✓ manifest: {manifest파일}")
+    return manifest
+
+
+# ========== 명령행 ==========
+def 명령행_파서():
+    parser = argparse.ArgumentParser(
+        description="국어 문제 자동 생성 (인자 없이 실행하면 대화형)",
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="지문 파일(.txt) / 폴더(*.txt) / JSONL / glob 패턴 (\"시/*.txt\")")
+    parser.add_argument('-o', '--output-dir', help="결과 폴더 (배치 기본: 배치_결과)")
+    parser.add_argument('-j', '--workers', type=int, default=4, help="동시에 처리할 지문 수 (배치)")
+    parser.add_argument('-c', '--concurrency', type=int,
+                        help=f"지문 하나의 유형별 동시 호출 수 (기본 {최대_동시호출})")
+    parser.add_argument('--no-cache', action='store_true', help="응답 캐시 사용 안 함")
+    parser.add_argument('--cache-path', help=f"응답 캐시 파일 (기본 {응답캐시_경로})")
+    parser.add_argument('--hwpx', action='store_true', help="키 입력 대신 / HTML과 함께 HWPX 파일 저장")
+    parser.add_argument('--template', help="HWPX 스타일 템플릿 (.hwpx)")
+    parser.add_argument('--dry-run', action='store_true', help="한글에 입력하지 않고 키 입력 수 / 예상 시간만")
+    parser.add_argument('--type', action='store_true', help="지문 파일 하나를 생성해서 바로 한글에 입력")
+    parser.add_argument('--stream', action='store_true', help="생성 중인 문제를 바로 한글에 입력 (--type)")
+    parser.add_argument('--structured', action='store_true', help="JSON 스키마(도구 사용) 출력")
+    parser.add_argument('-y', '--yes', action='store_true', help="확인 / 종료 Enter 대기 없이 진행")
+    parser.add_argument('--ledger', help=f"토큰/비용 장부 파일 (기본 {사용량_장부_경로})")
+    parser.add_argument('--budget-tokens', type=int, help="이 실행의 최대 토큰 (입력 + 캐시쓰기 + 출력)")
+    parser.add_argument('--budget-usd', type=float, help="이 실행의 최대 비용 (달러)")
+    parser.add_argument('--trace', help="단계별 시간 기록 파일 (.jsonl 또는 Chrome trace .json)")
+    parser.add_argument('--profile', metavar='STAGE',
+                        help="이 단계만 cProfile로 측정 (지문_입력, 문제_생성, 생성, api, 태그_수정, HTML_변환, "
+                             "HTML파일_저장, analyze_html_content, 한글창_준비, apply_hwp_formatting …)")
+    parser.add_argument('--profile-out', help="프로파일 결과 파일 (기본 profile_<STAGE>.prof)")
+    parser.add_argument('--resume', action='store_true', help="중단된 한글 입력을 체크포인트 다음 항목부터 이어서")
+    parser.add_argument('--journal', help=f"한글 입력 체크포인트 파일 (기본 {입력_기록_경로})")
+    parser.add_argument('--usage-summary', nargs='?', const='type', choices=('type', 'model', 'run', 'day', 'passage'),
+                        help="생성하지 않고 장부 요약만 출력 (묶음 기준, 기본 type)")
+    return parser
+
+
+def 설정_적용(args):
+    """명령행 옵션 → 설정 값"""
+    global 최대_동시호출, 응답캐시_사용, 응답캐시_경로, 출력_방식, HWPX_템플릿
+    global 드라이런, 스트리밍_모드, 구조화_출력, 결과_폴더, 사용량_장부_경로, 예산_토큰, 예산_달러
+    global 추적_파일, 프로파일_단계, 입력_기록_경로
+    
+    if args.concurrency:
+        최대_동시호출 = args.concurrency
+    if args.no_cache:
+        응답캐시_사용 = False
+    if args.cache_path:
+        응답캐시_경로 = args.cache_path
+    if args.hwpx:
+        출력_방식 = "hwpx"
+    if args.template:
+        HWPX_템플릿 = args.template
+    드라이런 = 드라이런 or args.dry_run
+    스트리밍_모드 = 스트리밍_모드 or args.stream
+    구조화_출력 = 구조화_출력 or args.structured
+    if args.type and args.output_dir:
+        결과_폴더 = args.output_dir
+        os.makedirs(결과_폴더, exist_ok=True)
+    if args.ledger:
+        사용량_장부_경로 = args.ledger
+    if args.budget_tokens is not None:
+        예산_토큰 = args.budget_tokens
+    if args.budget_usd is not None:
+        예산_달러 = args.budget_usd
+    if args.journal:
+        입력_기록_경로 = args.journal
+    추적_파일 = args.trace or 추적_파일
+    프로파일_단계 = args.profile or 프로파일_단계
+    if 추적_파일 or 프로파일_단계:
+        추적_설정(추적_파일, 프로파일_단계, args.profile_out)
+
+
+def 명령행_실행(argv=None):
+    parser = 명령행_파서()
+    args = parser.parse_args(argv)
+    if args.stream and (args.dry_run or args.hwpx):
+        parser.error("--stream은 한글에 바로 입력할 때만 씁니다 (--dry-run / --hwpx와 함께 쓸 수 없음)")
+    설정_적용(args)
+    
+    if args.usage_summary:
+        장부_요약_출력(사용량_장부_경로, args.usage_summary)
+        return
+    
+    if args.resume:
+        입력_재개(확인=not args.yes)
+        return
+    
+    if not args.inputs:
+        메인실행(대기=not args.yes)
+        return
+    
+    if args.type:
+        지문목록 = 입력_목록_읽기(args.inputs)
+        if len(지문목록) != 1:
+            parser.error(f"--type은 지문 하나만 받습니다 ({len(지문목록)}개)")
+        if not (args.yes or 드라이런 or 출력_방식 == "hwpx"):
+            input("한글 문서를 열어 두고 Enter를 누르세요...")
+        메인실행(지문목록[0][1], 대기=False)
+        return
+    
+    배치실행(args.inputs, args.output_dir or "배치_결과", args.workers)
 
 
 # ========== 프로그램 시작 ==========
 if __name__ == "__main__":
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.1
-    
     try:
-        메인실행()
+        명령행_실행()
     except KeyboardInterrupt:
         print("\n중단됨")
     except Exception as e: